@@ -0,0 +1,85 @@
+"""Benchmark of the check of imported members in inspect_object.get_object_members.
+Compares ModuleOwnership with calling inspect.getmodule for every member (what get_object_members did before)
+on a module that imports thousands of names.
+Run it from the repository root:
+	python benchmarks/module_ownership.py
+"""
+import os
+import sys
+import inspect
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyapireference.inspect_object import get_object_members, get_module_from_path, ModuleOwnership
+
+# Modules whose public names are imported with *
+IMPORTED_MODULES = (
+	"os", "os.path", "sys", "re", "json", "math", "cmath", "string", "typing", "types", "collections", "collections.abc", 
+	"itertools", "functools", "operator", "inspect", "ast", "socket", "ssl", "decimal", "fractions", "datetime", "logging", 
+	"argparse", "pathlib", "shutil", "subprocess", "threading", "multiprocessing", "asyncio", "email", "http.client", 
+	"urllib.request", "xml.dom.minidom", "unittest", "tkinter", "curses", "sqlite3", "zipfile", "tarfile", "csv", "pickle", 
+	"stat", "errno", "signal", "select", "selectors", "codecs", "locale", "calendar", "statistics", "random", "secrets", 
+)
+DEFINED_MEMBERS = 200
+REPEAT = 5
+
+
+class GetModuleOwnership:
+	"""Same interface as ModuleOwnership but using inspect.getmodule.
+	"""
+	def get_module_name(self, member: object) -> str:
+		module = inspect.getmodule(member)
+		return module.__name__ if module is not None else None
+
+
+def create_module(directory: str) -> str:
+	source = ""
+
+	for module_name in IMPORTED_MODULES:
+		source += f"try:\n\tfrom {module_name} import *\nexcept ImportError:\n\tpass\n"
+
+	for index in range(DEFINED_MEMBERS):
+		source += f"def function_{index}(a, b=1):\n\tpass\n"
+		source += f"class Class_{index}:\n\tpass\n"
+
+	path = os.path.join(directory, "many_imports.py")
+
+	with open(path, "w") as file:
+		file.write(source)
+
+	return path
+
+def count_members(module, module_ownership_class) -> int:
+	return len(tuple(get_object_members(module, exclude_types=(), module_ownership=module_ownership_class())))
+
+def find_modules(module, module_ownership_class) -> None:
+	module_ownership = module_ownership_class()
+
+	for member in vars(module).values():
+		module_ownership.get_module_name(member)
+
+def main():
+	with tempfile.TemporaryDirectory() as directory:
+		module, error = get_module_from_path(create_module(directory))
+
+		if module is None:
+			print(error, file=sys.stderr)
+			return 1
+
+		names = len(vars(module))
+		members = count_members(module, ModuleOwnership)
+		assert members == count_members(module, GetModuleOwnership), "Both checks must keep the same members"
+
+		print(f"{names} names in the module, {members} defined in it")
+
+		for label, module_ownership_class in (("inspect.getmodule", GetModuleOwnership), ("ModuleOwnership", ModuleOwnership)):
+			members_seconds = min(timeit.repeat(lambda: count_members(module, module_ownership_class), number=1, repeat=REPEAT))
+			check_seconds = min(timeit.repeat(lambda: find_modules(module, module_ownership_class), number=1, repeat=REPEAT))
+			print(f"{label}: get_object_members {members_seconds * 1000:.2f} ms, ownership check only {check_seconds * 1000:.2f} ms")
+
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
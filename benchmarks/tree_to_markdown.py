@@ -0,0 +1,81 @@
+"""Benchmark of tree_to_markdown on synthetic trees of up to 50,000 members.
+The time per member should stay the same as the tree grows (the Markdown is written in fragments, never copying the document),
+and writing straight into a file should not keep the document in memory.
+Run it from the repository root:
+	python benchmarks/tree_to_markdown.py
+"""
+import os
+import sys
+import tempfile
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyapireference.tree_to_markdown import convert_tree_to_markdown, write_tree_markdown
+
+MEMBERS = (12_500, 25_000, 50_000)
+METHODS_PER_CLASS = 49 # Each class and it's methods are 50 members
+REPEAT = 3
+
+
+def create_tree(members: int) -> dict:
+	"""Return a tree like the ones generated by inspect_object with members classes and methods (with parameters and docstrings).
+	"""
+	content = {}
+
+	for class_index in range(members // (METHODS_PER_CLASS + 1)):
+		class_content = {}
+
+		for method_index in range(METHODS_PER_CLASS):
+			class_content[f"method_{method_index}"] = {
+				"type": "function",
+				"docstring": f"Method {method_index} of Class_{class_index}.\nIt has a docstring with two lines.",
+				"parameters": {
+					"self": {"annotation": None, "default": None, "kind": "positional or keyword"},
+					"a": {"annotation": "int", "default": None, "kind": "positional or keyword"},
+					"b": {"annotation": "str", "default": "'b'", "kind": "positional or keyword"},
+				},
+			}
+
+		content[f"Class_{class_index}"] = {"type": "class", "docstring": f"Class {class_index}.", "inherits": ["object"], "content": class_content}
+
+	return {"synthetic": {"type": "module", "docstring": "Synthetic module.", "content": content}}
+
+def write_to_file(tree: dict, path: str) -> None:
+	with open(path, "w") as file:
+		write_tree_markdown(tree, file)
+
+def get_peak_memory(function: callable) -> int:
+	tracemalloc.start()
+	function()
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+
+	return peak
+
+def main():
+	with tempfile.TemporaryDirectory() as directory:
+		path = os.path.join(directory, "synthetic.md")
+
+		for members in MEMBERS:
+			tree = create_tree(members)
+			markdown_text = convert_tree_to_markdown(tree)
+			write_to_file(tree, path)
+
+			with open(path) as file:
+				assert file.read() == markdown_text, "Both must write the same Markdown"
+
+			string_seconds = min(timeit.repeat(lambda: convert_tree_to_markdown(tree), number=1, repeat=REPEAT))
+			file_seconds = min(timeit.repeat(lambda: write_to_file(tree, path), number=1, repeat=REPEAT))
+			string_peak = get_peak_memory(lambda: convert_tree_to_markdown(tree))
+			file_peak = get_peak_memory(lambda: write_to_file(tree, path))
+
+			print(f"{members} members, {len(markdown_text) / 1024 / 1024:.1f} MiB of Markdown")
+			print(f"\tconvert_tree_to_markdown: {string_seconds * 1000:.1f} ms ({string_seconds / members * 1e6:.2f} µs per member), peak memory {string_peak / 1024 / 1024:.1f} MiB")
+			print(f"\twrite_tree_markdown (file): {file_seconds * 1000:.1f} ms ({file_seconds / members * 1e6:.2f} µs per member), peak memory {file_peak / 1024 / 1024:.1f} MiB")
+
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -7,15 +7,11 @@ import inspect
 import sys
 import os
 import types
-import time
+import threading
 import traceback
-import json
-import yaml
 from enum import Enum, auto
 
 import PREFS
-import markdown # Markdown to HTML converter
-import m2r2 # Markdown to ReStructuredText converter
 import platform
 
 # PyQt5
@@ -30,63 +26,82 @@ from PyQt5.QtWidgets import (
 	QMenu, QDesktopWidget, 
 	QTabWidget, QTextEdit, 
 	QShortcut, QMenuBar, 
-	QSplitter
+	QSplitter, QProgressBar
 )
 
 from PyQt5.QtGui import QIcon, QPixmap, QFontDatabase, QFont, QKeySequence, QGuiApplication, QHoverEvent
 from PyQt5.QtCore import Qt, QObject, QThread, pyqtSignal, QTimer, QEvent
 
 # Dependencies
-from pyapireference.ui.collapsible_widget import CollapsibleWidget, CheckBoxCollapseButton, CollapseButton
-from pyapireference.ui.scrollarea import ScrollArea
+from pyapireference.ui.tree_model import TreeModel, TreeView
 from pyapireference.ui.settings_dialog import SettingsDialog
 from pyapireference.ui.markdownhighlighter import MarkdownHighlighter
 from pyapireference.ui.warning_dialog import WarningDialog
 from pyapireference.ui.button_with_extra_options import ButtonWithExtraOptions
 from pyapireference.ui.filter_dialog import FilterDialog
 from pyapireference.ui.bug_dialog import BugDialog
-from pyapireference.ui.markdown_previewer import MarkdownPreviewer
+from pyapireference.ui.markdown_previewer import MarkdownPreviewer, MarkdownConverter
 from pyapireference.ui.about_dialog import AboutDialog
 from pyapireference.ui.markdown_text_edit import MarkdownTextEdit
 from pyapireference.ui import resources # Qt resources GUI/resources.qrc
 
-from pyapireference.inspect_object import inspect_object, check_file
+from pyapireference.inspect_object import iter_object_events, get_module_from_path, interpret_type, type_to_string, InspectionCancelled, ProgressThrottle, build_tree
+from pyapireference.safety_check import check_file
+from pyapireference.sandbox import iter_sandboxed_events, InspectionServer, SandboxError, SANDBOX_AVAILABLE, SERVER_AVAILABLE
+from pyapireference.inspect_source import inspect_source
+from pyapireference.inspect_package import inspect_package
+from pyapireference.inspection_cache import InspectionCache, get_inspection_settings
+from pyapireference.session import SessionStore
 from pyapireference.extra import (
 	create_menu, convert_to_code_block, 
-	get_module_from_path, change_widget_stylesheet, 
-	add_text_to_text_edit, get_widgets_from_layout, 
-	HTML_TAB, interpret_type, 
+	change_widget_stylesheet, 
+	add_text_to_text_edit, 
+	HTML_TAB, 
 	HTML_SPACE
 )
+from pyapireference.export import TreeExportTypes, MarkdownExportTypes, export_tree, export_markdown
 
-from pyapireference.tree_to_markdown import convert_tree_to_markdown
+from pyapireference.tree_to_markdown import convert_tree_to_markdown, MarkdownCache
+from pyapireference.tree_to_html import write_tree_html
+from pyapireference.tree_to_rst import write_tree_rst
 
 
 THEME = PREFS.read_prefs_file(f"pyapireference{os.sep}ui{os.sep}theme.prefs")
 VERSION = "v0.1.50"
-
-
-class TreeExportTypes(Enum):
-	PREFS = ("PREFS", "prefs")
-	JSON = ("JSON", "json")
-	YAML = ("YAML", "yaml")
-
-
-class MarkdownExportTypes(Enum):
-	MARKDOWN = ("Markdown", "md")
-	HTML = ("HTML", "html")
-	RESTRUCTUREDTEXT = ("ReStructuredText", "rst")
+CACHE_DIRECTORY = f"Prefs{os.sep}inspection_cache"
+SESSION_PATH = f"Prefs{os.sep}session.sqlite" # The Markdown, the module's tree and the state of it's rows (see session.py)
+SESSION_KEYS = ("current_module", "current_markdown") # Stored in settings.prefs by previous versions
+INSPECTION_SERVER = InspectionServer() # Keeps the dependencies of the inspected modules imported (see sandbox.py)
+PROGRESS_INTERVAL = 0.1 # Minimum seconds between InspectModule.progress signals
 
 
 class InspectModule(QObject):
 	finished = pyqtSignal()
 	expection_found = pyqtSignal()
+	cancelled = pyqtSignal()
+	progress = pyqtSignal(int, str, float) # Members inspected, qualified name of the current one, elapsed seconds
 
 	def __init__(self, path, prefs):
 		super().__init__()
 		self.path = path
 		self.prefs = prefs
+		self.cache = InspectionCache(CACHE_DIRECTORY)
 		self.running = False
+		# Set from the GUI thread, checked between members (and by the sandbox watchdog, which stops the child)
+		self.cancel_event = threading.Event()
+		self.progress_throttle = ProgressThrottle(self.progress.emit, PROGRESS_INTERVAL)
+
+	def cancel(self):
+		"""Stop the inspection, cancelled is emitted instead of finished.
+		Safe to call from any thread, importing a module in this process or parsing it (static inspection) can't be interrupted so the worker stops when it ends.
+		"""
+		self.cancel_event.set()
+
+	def report_progress(self, members_inspected: int, qualified_name: str):
+		"""Emit progress at most every PROGRESS_INTERVAL seconds, a signal per member would flood the GUI thread.
+		"""
+		if not self.cancel_event.is_set():
+			self.progress_throttle(members_inspected, qualified_name)
 
 	def get_filter(self):
 		exclude_types = []
@@ -104,17 +119,50 @@ class InspectModule(QObject):
 
 	def generate_error_text(self, error: Exception):
 		result = ""
-		error = traceback.format_exc().replace('\n', '<br>').replace('\t', HTML_TAB).replace("    ", HTML_TAB).replace("  ", HTML_SPACE * 2).replace("   ", HTML_SPACE * 3)
+		error_text = traceback.format_exc().replace('\n', '<br>').replace('\t', HTML_TAB).replace("    ", HTML_TAB).replace("  ", HTML_SPACE * 2).replace("   ", HTML_SPACE * 3)
 
 		result = f"""An unexpected error ocurred: <br>
-		{self.convert_to_code_block(error)}<br>
+		{self.convert_to_code_block(error_text)}<br>
 		"""
 
-		if isinstance(error, RecursionError): result += "Try changing the <b>Recursion limit</b> on settings.<br>"
+		if isinstance(error, SyntaxError): result += "The module could not be parsed, check its syntax or disable <b>Static inspection</b> on settings.<br>"
 		result += f"If you think it is and issue, please report it at <a style='color: {THEME[self.prefs.file['theme']]['link_color']};' href='https://github.com/Patitotective/PyAPIReference/issues'>GitHub issues</a>."		
 
+		return result
+
 	def run(self):
 		self.running = True
+		self.progress_throttle.start()
+		self.settings = self.prefs.file["settings"]["inspect_module"]
+		self.cache_key = None
+
+		if os.path.isdir(self.path):
+			self.run_package()
+			return
+
+		if self.settings["cache_inspections"]["value"]:
+			exclude_types, kwargs = self.get_filter()
+			module_name = os.path.splitext(os.path.basename(self.path))[0]
+
+			inspection_settings = get_inspection_settings(module_name, exclude_types, max_depth=self.settings["max_depth"]["value"], static=self.settings["static_inspection"]["value"], **kwargs)
+			self.cache_key = self.cache.get_key(self.path, inspection_settings)
+
+			module_content = self.cache.get(self.cache_key)
+
+			if module_content is not None: # Means the module has not changed
+				self.module_content = module_content
+				self.finished.emit()
+				self.running = False
+				return
+
+		if self.settings["static_inspection"]["value"]:
+			self.run_static()
+			return
+
+		if self.settings["sandbox_inspection"]["value"] and SANDBOX_AVAILABLE:
+			self.run_sandboxed()
+			return
+
 		try:
 			module, error = get_module_from_path(self.path)
 		except Exception as error:
@@ -122,7 +170,8 @@ class InspectModule(QObject):
 
 			self.expection_found.emit()
 			self.running = False
-			
+			return
+
 		if module is None: # Means exception
 			error = error.replace('\n', '<br>').replace('    ', HTML_TAB)		
 
@@ -133,17 +182,130 @@ class InspectModule(QObject):
 			try:
 				exclude_types, kwargs = self.get_filter()
 
-				kwargs["recursion_limit"] = self.prefs.file["settings"]["inspect_module"]["recursion_limit"]["value"]
+				kwargs["max_depth"] = self.settings["max_depth"]["value"]
 
-				self.module_content = inspect_object(module, exclude_types=exclude_types, **kwargs)
+				self.module_content = self.build_tree(iter_object_events(module, exclude_types=exclude_types, **kwargs))
+			except InspectionCancelled:
+				self.inspection_cancelled()
 			except Exception as error:
 				self.exception_message = self.generate_error_text(error)
 
 				self.expection_found.emit()
 				self.running = False
 			else:
-				self.finished.emit()
-				self.running = False
+				self.inspection_finished()
+
+	def run_sandboxed(self):
+		"""Import and inspect the module in a child interpreter (see sandbox.py), if it loops forever, uses too much memory or crashes only the child is stopped.
+		"""
+		try:
+			exclude_types, kwargs = self.get_filter()
+
+			kwargs["max_depth"] = self.settings["max_depth"]["value"]
+			kwargs["timeout"] = self.settings["timeout"]["value"]
+			kwargs["memory_limit"] = self.settings["memory_limit"]["value"]
+			kwargs["cancel_event"] = self.cancel_event
+
+			# Types are sent by name to the child
+			exclude_types = tuple(type_to_string(type_) for type_ in exclude_types)
+
+			if self.settings["warm_server"]["value"] and SERVER_AVAILABLE:
+				events = INSPECTION_SERVER.iter_events(self.path, exclude_types=exclude_types, **kwargs)
+			else:
+				events = iter_sandboxed_events(self.path, exclude_types=exclude_types, **kwargs)
+
+			self.module_content = self.build_tree(events)
+		except InspectionCancelled:
+			self.inspection_cancelled()
+		except SandboxError as error:
+			error = str(error).replace('\n', '<br>').replace('    ', HTML_TAB)
+
+			self.exception_message = f"Couldn't load file. Exception found: <br>{self.convert_to_code_block(error)}" 
+			self.expection_found.emit()
+			self.running = False
+		except Exception as error:
+			self.exception_message = self.generate_error_text(error)
+
+			self.expection_found.emit()
+			self.running = False
+		else:
+			self.inspection_finished()
+
+	def build_tree(self, events) -> dict:
+		"""Build the tree from the inspection events reporting the progress (see inspect_object.build_tree).
+		Raises InspectionCancelled if cancel_event is set.
+		"""
+		return build_tree(events, self.cancel_event, self.report_progress)
+
+	def run_static(self):
+		"""Inspect the module parsing its source code (see inspect_source.py), the module is not executed.
+		"""
+		try:
+			exclude_types, kwargs = self.get_filter()
+
+			self.module_content = inspect_source(self.path, exclude_types=exclude_types, **kwargs)
+		except Exception as error:
+			self.exception_message = self.generate_error_text(error)
+
+			self.expection_found.emit()
+			self.running = False
+		else:
+			if self.cancel_event.is_set():
+				self.inspection_cancelled()
+			else:
+				self.inspection_finished()
+
+	def run_package(self):
+		"""Inspect all the modules inside the directory (package) at self.path in parallel (see inspect_package.py), each one in a child interpreter if sandbox inspection is enabled.
+		"""
+		modules_inspected = 0
+
+		def module_inspected(module_name: str):
+			nonlocal modules_inspected
+
+			modules_inspected += 1
+			self.report_progress(modules_inspected, module_name)
+
+		try:
+			exclude_types, kwargs = self.get_filter()
+
+			kwargs["max_depth"] = self.settings["max_depth"]["value"]
+			kwargs["static"] = self.settings["static_inspection"]["value"]
+			kwargs["max_workers"] = self.settings["workers"]["value"]
+
+			if self.settings["sandbox_inspection"]["value"] and SANDBOX_AVAILABLE: # Each module in a child interpreter, as single modules (see run_sandboxed)
+				kwargs["sandbox"] = True
+				kwargs["timeout"] = self.settings["timeout"]["value"]
+				kwargs["memory_limit"] = self.settings["memory_limit"]["value"]
+
+			kwargs["cache"] = self.cache if self.settings["cache_inspections"]["value"] else None
+			kwargs["cancel_event"] = self.cancel_event
+			kwargs["module_inspected"] = module_inspected
+
+			self.module_content = inspect_package(self.path, exclude_types=exclude_types, **kwargs)
+		except InspectionCancelled:
+			self.inspection_cancelled()
+		except Exception as error:
+			self.exception_message = self.generate_error_text(error)
+
+			self.expection_found.emit()
+			self.running = False
+		else:
+			self.finished.emit()
+			self.running = False
+
+	def inspection_finished(self):
+		"""Store the inspected module in the cache (if enabled) and emit finished.
+		"""
+		if self.cache_key is not None:
+			self.cache.set(self.cache_key, self.module_content)
+
+		self.finished.emit()
+		self.running = False
+
+	def inspection_cancelled(self):
+		self.cancelled.emit()
+		self.running = False
 
 	def convert_to_code_block(self, string):
 		background_color = THEME[self.prefs.file['theme']]["code_block"]["background_color"]
@@ -168,6 +330,9 @@ class MainWindow(QMainWindow):
 			"Export as YAML": {
 				"callback": lambda: self.main_widget.export_tree(TreeExportTypes.YAML), 
 			}, 
+			"Export as JSON Lines": {
+				"callback": lambda: self.main_widget.export_tree(TreeExportTypes.JSON_LINES), 
+			}, 
 		}
 
 		self.EXPORT_API_MENU = {
@@ -187,6 +352,10 @@ class MainWindow(QMainWindow):
 				"callback": lambda: self.main_widget.load_module_file() if self.main_widget.widgets["load_file_button"][-1].isEnabled() else QMessageBox.critical(self, "Cannot load file", "There is a file already loading, wait for it to load another."), 
 				"shortcut": "Ctrl+O", 
 			}, 
+			"Load Package": {
+				"callback": lambda: self.main_widget.load_package_directory() if self.main_widget.widgets["load_file_button"][-1].isEnabled() else QMessageBox.critical(self, "Cannot load package", "There is a file already loading, wait for it to load another."), 
+				"shortcut": "Ctrl+Shift+O", 
+			}, 
 			"Export Tree>": self.EXPORT_TREE_MENU, 
 			"Export API Reference>": self.EXPORT_API_MENU, 
 			"Close": {
@@ -203,7 +372,10 @@ class MainWindow(QMainWindow):
 			"&Settings": {
 				"callback": self.open_settings_dialog, 
 				"shortcut": "Ctrl+S",  
-			}
+			}, 
+			"Clear Inspection Cache": {
+				"callback": self.clear_inspection_cache, 
+			}, 
 		}
 
 		self.ABOUT_MENU = {
@@ -242,6 +414,12 @@ class MainWindow(QMainWindow):
 		menubar.addMenu(create_menu(self.EDIT_MENU, '&Edit', parent=self))
 		menubar.addMenu(create_menu(self.ABOUT_MENU, '&About', parent=self))
 		
+	def clear_inspection_cache(self):
+		"""Remove the cached trees and stop the inspection server, the dependencies of the modules are imported again (e.g.: after updating them).
+		"""
+		InspectionCache(CACHE_DIRECTORY).clear()
+		INSPECTION_SERVER.stop()
+
 	def open_settings_dialog(self):
 		settings_dialog = SettingsDialog(self.main_widget.prefs, parent=self)
 		preivous_theme = self.main_widget.current_theme
@@ -322,8 +500,12 @@ class MainWindow(QMainWindow):
 		if self.main_widget.save_geometry_at_end:
 			self.save_geometry()
 	
-		if self.main_widget.save_tree_at_end:
-			self.main_widget.prefs.write_prefs("current_module", self.main_widget.get_tree())
+		if self.main_widget.save_tree_at_end and len(self.main_widget.widgets["tree_view"]) > 0:
+			self.main_widget.session.set("tree_state", self.main_widget.widgets["tree_view"][-1].model().dump_state())
+
+		self.main_widget.markdown_converter.stop()
+		self.main_widget.save_markdown()
+		self.main_widget.session.close() # Writes the pending values
 
 	def closeEvent(self, event) -> None:
 		"""This will be called when the windows is closed."""		
@@ -346,12 +528,19 @@ class MainWidget(QWidget):
 			"module_tabs": [], 
 			"load_file_button": [], 
 			"retry_button": [], 
+			"cancel_button": [], 
 			"loading_label": [], 
+			"tree_view": [], 
 			"markdown_text_edit": [], 
 			"markdown_previewer": [], 
 		}
 
 		self.module_content = None
+		self.markdown_cache = MarkdownCache() # Only the members changed in the Tree tab are converted again
+		self.generated_reference = None # (tree, Markdown) of the last API reference generated, see get_reference_tree
+		self.markdown_converter = MarkdownConverter() # Converts the Markdown of the preview in it's thread
+		self.markdown_changed = False # The Markdown was edited and not stored in the session yet, see save_markdown
+		self.restore_markdown = None # Creates the text edit of the API Reference tab with the stored Markdown, see create_markdown_tab
 
 		self.save_tree_at_end = True
 		self.save_geometry_at_end = True
@@ -378,8 +567,6 @@ class MainWidget(QWidget):
 	def init_prefs(self):
 		default_prefs = {
 			"current_module_path": "", # The path when you open a file to restore it 
-			"current_module": {}, 
-			"current_markdown": "", 
 			"current_tab": 0, 
 			"theme": "dark", 
 			"state": {
@@ -390,10 +577,38 @@ class MainWidget(QWidget):
 			}, 
 			"settings": {
 				"inspect_module": {
-					"recursion_limit": {
-						"tooltip": "Recursion limit when inspecting module (when large modules it should be bigger).", 
-						"value": 10 ** 6, 
-						"min_val": 1500, 
+					"max_depth": {
+						"tooltip": "Maximum depth of nested classes inspected, deeper classes are marked as truncated and their members are not inspected.", 
+						"value": 100, 
+						"min_val": 1, 
+					}, 
+					"static_inspection": {
+						"tooltip": "Parse the module's source code instead of importing it (faster and the module's code is never run, but values are not evaluated).", 
+						"value": False, 
+					}, 
+					"sandbox_inspection": {
+						"tooltip": "Import and inspect modules in a separate process, if the module freezes, uses too much memory or crashes the application keeps working.", 
+						"value": True, 
+					}, 
+					"timeout": {
+						"tooltip": "Maximum seconds a module can take to be inspected in a separate process (0 means no limit).", 
+						"value": 60, 
+					}, 
+					"memory_limit": {
+						"tooltip": "Maximum megabytes of memory a module can use when inspected in a separate process, only on Linux and macOS (0 means no limit).", 
+						"value": 4096, 
+					}, 
+					"warm_server": {
+						"tooltip": "Keep the dependencies of the inspected modules imported in a background process, inspecting a module again only imports the module itself (needs sandbox inspection, only on Linux and macOS).", 
+						"value": True, 
+					}, 
+					"workers": {
+						"tooltip": "Number of processes used to inspect the modules of a package (0 means one per CPU core).", 
+						"value": 0, 
+					}, 
+					"cache_inspections": {
+						"tooltip": "Store inspected modules in a cache, unchanged modules are not inspected again.", 
+						"value": True, 
 					}, 
 				}, 
 				"preview_markdown": {
@@ -423,6 +638,40 @@ class MainWidget(QWidget):
 		}
 
 		self.prefs = PREFS.Prefs(default_prefs, filename=f"Prefs{os.sep}settings.prefs")
+		self.add_missing_settings(default_prefs["settings"])
+
+		self.session = SessionStore(SESSION_PATH)
+		self.move_session_prefs()
+
+	def move_session_prefs(self):
+		"""Move the Markdown and the tree stored in settings.prefs by previous versions to the session.
+		"""
+		if not any(key in self.prefs.file for key in SESSION_KEYS):
+			return
+
+		for key in SESSION_KEYS:
+			if key in self.prefs.file and self.session.get(key) is None:
+				self.session.set(key, self.prefs.file[key])
+
+		self.prefs.overwrite_prefs({key: value for key, value in self.prefs.file.items() if key not in SESSION_KEYS})
+
+	def add_missing_settings(self, default_settings: dict, path: str="settings"):
+		"""Write the default value of the settings that are not in the prefs file (added in a newer version)
+		and remove the settings that are not in default_settings (removed in a newer version).
+		"""
+		settings = self.prefs.file
+
+		for key in path.split("/"):
+			settings = settings[key]
+
+		for setting_name, setting_props in default_settings.items():
+			if setting_name not in settings:
+				self.prefs.write_prefs(f"{path}/{setting_name}", setting_props)
+			elif not "value" in setting_props: # Means is a section that contains other settings
+				self.add_missing_settings(setting_props, path=f"{path}/{setting_name}")
+
+		if any(setting_name not in default_settings for setting_name in settings):
+			self.prefs.write_prefs(path, {setting_name: setting_props for setting_name, setting_props in settings.items() if setting_name in default_settings})
 
 	def main_frame(self):
 		logo = QLabel()
@@ -435,6 +684,7 @@ class MainWidget(QWidget):
 
 		load_file_button = ButtonWithExtraOptions("Load Module", parent=self, 
 			actions=[
+				("Load Package", self.load_package_directory), 
 				("Reload Module", self.load_last_module), 
 				("Unload Module", self.unload_file), 
 				("Filter", self.create_filter_dialog)
@@ -468,9 +718,9 @@ class MainWidget(QWidget):
 		"""Restore tree if tree available else load last module.
 		"""
 		self.timer = QTimer()
-		if not self.prefs.file["current_module"] == {}: # Means it's not empty
+		if self.session.get("current_module", {}) != {}: # Means it's not empty
 			self.timer.timeout.connect(self.restore_tree)		
-		elif os.path.isfile(self.prefs.file["current_module_path"]): # Means the path really exist
+		elif os.path.exists(self.prefs.file["current_module_path"]): # Means the path really exist (a module file or a package directory)
 			self.timer.timeout.connect(lambda: self.load_last_module(warning=False))
 		else:
 			return
@@ -500,12 +750,25 @@ class MainWidget(QWidget):
 
 		return path
 
+	def load_directory(self, caption="Select a package", directory=None):
+		if directory is None:
+			directory = self.prefs.file["current_module_path"]
+
+		path = QFileDialog.getExistingDirectory(
+			parent=self, 
+			caption=caption, 
+			directory=directory)
+
+		return path
+
 	def unload_file(self):
 		if self.prefs.file["current_module_path"] == "":
 			QMessageBox.warning(self, "No Module to Unload", "You must load a module first to unload it.")
 			return
 
-		if self.prefs.file['current_markdown'] != "":
+		self.save_markdown()
+
+		if self.session.get("current_markdown", "") != "":
 			warning = WarningDialog(
 				"Lose Markdown", 
 				"If you unload this module, this module's Markdown will be lost.\nExport it to preserve.", 
@@ -518,9 +781,9 @@ class MainWidget(QWidget):
 
 		self.clear_widgets(to_clear=["module_tabs", "markdown_text_edit", "markdown_previewer"])
 
-		self.prefs.write_prefs("current_markdown", "")
+		self.session.set("current_markdown", "")
 		self.prefs.write_prefs("current_module_path", "")
-		self.prefs.write_prefs("current_module", {})
+		self.set_session_tree({})
 
 	def clear_widgets(self, to_clear: list=None):
 		for widget_name, widget_list in self.widgets.items():
@@ -530,12 +793,21 @@ class MainWidget(QWidget):
 				self.widgets[widget_name].pop()
 
 	def load_module_file(self):
+		self.load_module_path(lambda: self.load_file("Python files (*.py)"))
+
+	def load_package_directory(self):
+		self.load_module_path(self.load_directory)
+
+	def load_module_path(self, get_path: callable):
+		"""Ask for a path calling get_path and inspect it.
+		"""
 		if len(self.widgets["markdown_previewer"]) > 0:
 			self.widgets["markdown_previewer"].pop()
 
 		markdown_warning = True
+		self.save_markdown()
 
-		if self.prefs.file['current_markdown'] != "": # If the markdown is not emtpy
+		if self.session.get("current_markdown", "") != "": # If the markdown is not emtpy
 			markdown_warning = WarningDialog(
 				"Lose Markdown", 
 				"If you load another module this module's Markdown will be lost.\nExport it to preserve.", 
@@ -546,13 +818,13 @@ class MainWidget(QWidget):
 			if not markdown_warning:
 				return
 
-		path = self.load_file("Python files (*.py)")
+		path = get_path()
 		
 		if path == '':
 			return
 
 		if markdown_warning:
-			self.prefs.write_prefs("current_markdown", "")
+			self.session.set("current_markdown", "")
 
 		self.prefs.write_prefs("current_module_path", path)
 
@@ -564,14 +836,18 @@ class MainWidget(QWidget):
 			return
 
 		if not self.prefs.file["current_module_path"] == "":
-			if not os.path.isfile(self.prefs.file["current_module_path"]):
+			if not os.path.exists(self.prefs.file["current_module_path"]):
 				return # Ignore it because is not a valid path
 
 			self.create_inspect_module_thread(self.prefs.file["current_module_path"])		
 
 	def create_inspect_module_thread(self, module):
-		# Check if file is safe 
-		not_safe_lines, name_main = check_file(module)
+		# Check if file is safe (when inspecting statically the module is not executed so it's always safe)
+		# Packages are not checked, their modules are imported in other processes
+		if self.prefs.file["settings"]["inspect_module"]["static_inspection"]["value"] or os.path.isdir(module):
+			not_safe_lines, name_main = [], True
+		else:
+			not_safe_lines, name_main = check_file(module)
 		lines = ""
 
 		# If name main is present, file is safe. Otherwise enter here.
@@ -598,8 +874,16 @@ class MainWidget(QWidget):
 
 		loading_label = self.create_loading_label()
 
+		cancel_button = QPushButton("Cancel")
+		cancel_button.clicked.connect(self.cancel_inspect_object_worker)
+
+		self.widgets["cancel_button"].append(cancel_button)
+
+		# The button right below the label, row 3 takes the remaining space
 		self.layout().addWidget(loading_label, 2, 0)
-		self.layout().setRowStretch(2, 100)
+		self.layout().addWidget(cancel_button, 3, 0, Qt.AlignTop | Qt.AlignLeft)
+		self.layout().setRowStretch(2, 0)
+		self.layout().setRowStretch(3, 100)
 		
 		if len(self.widgets["retry_button"]) > 0:
 			self.widgets["retry_button"][-1].setParent(None)
@@ -617,19 +901,51 @@ class MainWidget(QWidget):
 		self.worker.finished.connect(lambda: loading_label.setParent(None))
 		self.worker.expection_found.connect(lambda: loading_label.setParent(None))		
 		self.worker.expection_found.connect(self.inspect_object_worker_exception)
+		self.worker.cancelled.connect(lambda: loading_label.setParent(None))
+		self.worker.cancelled.connect(self.inspect_object_worker_cancelled)
+		self.worker.progress.connect(lambda members_inspected, qualified_name, elapsed: loading_label.setText(f"Loading... {qualified_name}\n{members_inspected} inspected in {elapsed:.1f}s"))
 
 		self.timer = QTimer()
 		self.timer.timeout.connect(self.thread.start)
 		self.timer.timeout.connect(self.timer.stop)
 		self.timer.start(100)
 
+	def cancel_inspect_object_worker(self):
+		"""Ask the worker to stop, it emits cancelled when it does (see InspectModule.cancel).
+		"""
+		self.worker.cancel()
+
+		self.widgets["cancel_button"][-1].setEnabled(False)
+		self.widgets["loading_label"][-1].setText("Cancelling...")
+
+	def remove_cancel_button(self):
+		if len(self.widgets["cancel_button"]) > 0:
+			self.widgets["cancel_button"][-1].setParent(None)
+			self.widgets["cancel_button"].pop()
+
+		self.layout().setRowStretch(3, 0)
+
+	def inspect_object_worker_cancelled(self):
+		self.stop_inspect_object_worker()
+		self.remove_cancel_button()
+
+		self.widgets["load_file_button"][-1].setEnabled(True)
+
+		if len(self.widgets["loading_label"]) > 0:
+			self.widgets["loading_label"].pop()
+
+		# Back to the layout before loading (the previous module tabs or only the load button)
+		self.layout().setRowStretch(1, 0 if len(self.widgets["module_tabs"]) > 0 else 1)
+		self.layout().setRowStretch(2, 1 if len(self.widgets["module_tabs"]) > 0 else 0)
+
 	def inspect_object_worker_exception(self):
 		self.stop_inspect_object_worker()
+		self.remove_cancel_button()
 
 		self.widgets["load_file_button"][-1].setEnabled(True)
 
 		self.save_tree_at_end = False
-		self.prefs.write_prefs("current_module", {})
+		self.set_session_tree({})
 
 		exception_label = QLabel(self.worker.exception_message)
 		exception_label.setOpenExternalLinks(True)
@@ -658,11 +974,13 @@ class MainWidget(QWidget):
 
 	def stop_inspect_object_worker(self):
 		self.thread.quit()
+		self.thread.wait() # The worker has just emitted its last signal, deleting a running thread aborts the application
 		self.worker.deleteLater()
 		self.thread.deleteLater()		
 
 	def inspect_object_worker_finished(self):
 		self.stop_inspect_object_worker()
+		self.remove_cancel_button()
 
 		self.layout().setRowStretch(4, 0)
 
@@ -670,6 +988,7 @@ class MainWidget(QWidget):
 
 		self.widgets["load_file_button"][-1].setEnabled(True)
 		self.module_content = self.worker.module_content
+		self.set_session_tree(self.module_content)
 
 		self.create_module_tabs()
 		
@@ -677,6 +996,10 @@ class MainWidget(QWidget):
 		def tab_changed(index: int):
 			nonlocal first_time
 
+			if module_tabs.widget(index) is markdown_tab and self.restore_markdown is not None:
+				restore_markdown, self.restore_markdown = self.restore_markdown, None
+				QTimer.singleShot(0, restore_markdown) # Once the tab is shown
+
 			if first_time:
 				first_time = False
 				return
@@ -686,7 +1009,9 @@ class MainWidget(QWidget):
 		if len(self.widgets["module_tabs"]) > 0:	
 			self.widgets["module_tabs"][-1].setParent(None)
 			self.widgets["module_tabs"] = []
+			self.widgets["tree_view"] = []
 			self.widgets["markdown_text_edit"] = []
+			self.generated_reference = None
 		
 		first_time = True
 
@@ -700,8 +1025,10 @@ class MainWidget(QWidget):
 		self.layout().setRowStretch(2, 1)		
 		self.layout().setRowStretch(1, 0)
 
+		markdown_tab = self.create_markdown_tab()
+
 		module_tabs.addTab(self.create_tree_tab(), "Tree")		
-		module_tabs.addTab(self.create_markdown_tab(), "API Reference")		
+		module_tabs.addTab(markdown_tab, "API Reference")		
 
 		module_tabs.setCurrentIndex(self.prefs.file["current_tab"])
 
@@ -710,7 +1037,7 @@ class MainWidget(QWidget):
 	def create_markdown_tab(self):
 		def create_markdown_text_edit(text: str=None):
 			def text_edit_updated():
-				self.prefs.write_prefs("current_markdown", text_edit.toPlainText())
+				self.markdown_changed = True # Stored when the timer times out, copying the document on each key press would be slow
 				
 				if self.text_timer.isActive():
 					self.text_timer.setInterval(UPDATE_TIME)
@@ -719,14 +1046,22 @@ class MainWidget(QWidget):
 				self.text_timer.start(UPDATE_TIME)
 
 			def text_timeout():
+				markdown_text = text_edit.toPlainText()
+
+				if self.markdown_changed: # Not stored by save_markdown yet
+					self.markdown_changed = False
+					self.session.set("current_markdown", markdown_text) # Written to the disk in the background
+
 				if len(self.widgets["markdown_previewer"]) > 0:
-					self.widgets["markdown_previewer"][-1].update_markdown(text_edit.toPlainText())
+					self.widgets["markdown_previewer"][-1].update_markdown(markdown_text, tree=self.get_reference_tree(markdown_text))
 
 				self.text_timer.stop()
 			nonlocal markdown_edit_section
 
 			if text is None:
-				markdown_text = convert_tree_to_markdown(tree=self.filter_tree())
+				tree = self.filter_tree()
+				markdown_text = convert_tree_to_markdown(tree=tree, cache=self.markdown_cache)
+				self.generated_reference = (tree, markdown_text)
 			else:
 				markdown_text = text
 
@@ -822,7 +1157,9 @@ class MainWidget(QWidget):
 			
 			nonlocal markdown_edit_section
 
-			if self.prefs.file['current_markdown'] == "":
+			self.save_markdown()
+
+			if self.session.get("current_markdown", "") == "":
 				QMessageBox.critical(self, "No Markdown to preview", "You must generate the API Reference first to preview it.")
 				return
 
@@ -832,7 +1169,8 @@ class MainWidget(QWidget):
 
 			self.save_geometry_at_end = False
 
-			markdown_previewer = MarkdownPreviewer(self.prefs, self.prefs.file['current_markdown'], scroll_link=(self.widgets["markdown_text_edit"][-1].horizontalScrollBar(), self.widgets["markdown_text_edit"][-1].verticalScrollBar()), parent=self)			
+			markdown_text = self.session.get("current_markdown", "")
+			markdown_previewer = MarkdownPreviewer(self.prefs, markdown_text, tree=self.get_reference_tree(markdown_text), converter=self.markdown_converter, scroll_link=(self.widgets["markdown_text_edit"][-1].horizontalScrollBar(), self.widgets["markdown_text_edit"][-1].verticalScrollBar()), parent=self)			
 			markdown_previewer.page().scrollPositionChanged.connect(markdown_previewer_scrollbar_changed)
 			markdown_previewer.stop.connect(stop_previewing)
 
@@ -885,14 +1223,17 @@ class MainWidget(QWidget):
 		markdown_tab.layout().addWidget(convert_to_markdown_button, 0, 0)
 		markdown_tab.layout().setRowStretch(1, 1)
 
-		if self.prefs.file['current_markdown'] != "":
-			convert_to_markdown_button_clicked(text=self.prefs.file['current_markdown'])
+		self.restore_markdown = None
+
+		if self.session.get("current_markdown", "") != "":
+			# Laying out a big Markdown blocks the window, so it's done when the tab is first shown instead of while the module is loaded
+			self.restore_markdown = lambda: convert_to_markdown_button_clicked(text=self.session.get("current_markdown", ""))
 
 		return markdown_tab
 	
 	def restore_tree(self, tree=None):
 		if tree is None:
-			tree = self.prefs.file["current_module"]
+			tree = self.session.get("current_module", {})
 
 		if tree == {}:
 			return
@@ -900,81 +1241,24 @@ class MainWidget(QWidget):
 		self.module_content = tree
 		self.create_module_tabs()
 
-	def get_tree(self, tree: dict=None, collapsible_tree: dict=None):
-		"""Get the tree, add collapsed and checked key to restore it later. 
+	def save_markdown(self):
+		"""Store the Markdown being edited in the session now if it changed since the text timer last timed out (see create_markdown_tab).
 		"""
-		if collapsible_tree is None:
-			if len(self.widgets["module_tabs"]) < 1:
-				return {}
+		if self.markdown_changed and len(self.widgets["markdown_text_edit"]) > 0:
+			self.session.set("current_markdown", self.widgets["markdown_text_edit"][-1].toPlainText())
 
-			tree_scrollarea = self.widgets["module_tabs"][-1].widget(0) # Get the first tab from module_tabs
-			tree_widget_layout = tree_scrollarea.widget().layout() # Get the layout of the main widget in the tree scrollare
-			widgets_in_tree_widget = list(get_widgets_from_layout(tree_widget_layout)) # Get the widgets in the tree widget layout
-
-			if len(widgets_in_tree_widget) < 1:
-				return {}
-
-			tree_collapsible = widgets_in_tree_widget[0]
-			collapsible_tree = tree_collapsible.tree_to_dict()
-
-		if tree is None:
-			tree = self.module_content
-
-		result = {}
-
-		for key, val in tree.items():				
-			if isinstance(val, dict) and key in collapsible_tree:
-				result[key] = self.get_tree(val, collapsible_tree[key])	
-			
-				result[key]["collapsed"] = collapsible_tree[key]["collapsed"]
-				if "checked" in collapsible_tree[key]:
-					result[key]["checked"] = collapsible_tree[key]["checked"]
-				continue
-				
-			result[key] = val
-			continue
-
-		return result
+		self.markdown_changed = False
 
-	def filter_tree(self, tree: dict=None, collapsible_tree: dict=None, properties_to_ignore: tuple=("collapsed", "checked")):
-		"""With using the collapsible_tree and the tree, filter the tree with the checked checkbox on the collapsible_tree
+	def set_session_tree(self, tree: dict):
+		"""Store the tree of a new module in the session, it's rows start collapsed and checked (see TreeModel.dump_state).
 		"""
-		if collapsible_tree is None:
-			tree_scrollarea = self.widgets["module_tabs"][-1].widget(0) # Get the first tab from module_tabs
-			tree_widget_layout = tree_scrollarea.widget().layout() # Get the layout of the main widget in the tree scrollare
-			widgets_in_tree_widget = list(get_widgets_from_layout(tree_widget_layout)) # Get the widgets in the tree widget layout
+		self.session.set("current_module", tree)
+		self.session.set("tree_state", None)
 
-			tree_collapsible = widgets_in_tree_widget[0]
-
-			collapsible_tree = tree_collapsible.tree_to_dict()
-
-			# print(PREFS.convert_to_prefs(collapsible_tree))
-
-		if tree is None:
-			tree = self.module_content
-
-		result = {}
-
-		for property_name, property_val in tree.items():
-			if property_name in properties_to_ignore:
-				continue
-
-			# If the property_name is not in the filter means is not a collapsible widget (content, docstring, parameters, etc.) so it's a property (type, docstring, etc)
-			# Or if checked is not on the filter means it cannot be disabled
-			# Or if checked is in the filter and it's true (so if it's false do not include it)
-			if not property_name in collapsible_tree or not "checked" in collapsible_tree[property_name] or ("checked" in collapsible_tree[property_name] and collapsible_tree[property_name]["checked"] == True):
-				
-				if isinstance(property_val, dict) and property_name in collapsible_tree:
-					result[property_name] = self.filter_tree(property_val, collapsible_tree[property_name])	
-					continue
-					
-				result[property_name] = property_val
-				continue
-
-			elif "checked" in collapsible_tree[property_name] and collapsible_tree[property_name]["checked"] == False:
-				continue
-
-		return result
+	def filter_tree(self) -> dict:
+		"""Get the tree without the members and properties unchecked in the Tree tab (see TreeModel.filter_tree).
+		"""
+		return self.widgets["tree_view"][-1].model().filter_tree()
 
 	def create_filter_dialog(self):
 		filter_dialog = FilterDialog(self.prefs, parent=self)
@@ -996,165 +1280,75 @@ class MainWidget(QWidget):
 		self.create_inspect_module_thread(self.prefs.file["current_module_path"])
 
 	def create_tree_tab(self):
-		module_content_widget = QWidget()
-		module_content_widget.setLayout(QVBoxLayout())
-		
-		font = QFont()
-		module_content_widget.setStyleSheet(
-		f"""
-		*{{
-			font-family: {THEME['tree_font_family']};
-		}}
-		QToolTip {{
-			font-family: {font.defaultFamily()};
-		}}
-		""")
-
-		tree_collapsible = self.create_module_tree(self.module_content, collapse_button=CollapseButton)
-		
-		tree_collapsible.uncollapse()
-
-		module_content_widget.layout().addWidget(tree_collapsible)
-		module_content_widget.layout().addStretch(1)
-
-		module_content_scrollarea = ScrollArea(module_content_widget)
-
-		return module_content_scrollarea
-
-	def create_module_tree(self, object_content: dict, collapse_button=CheckBoxCollapseButton):
-		"""Generates a collapsible widget for a given object_content generated by inspect_object
-		"""
-
-		def create_property_collapsible(
-			property_name: str,
-			property_value: any,  
-			properties_to_ignore: tuple=("collapsed, checked"), 
-			properties_without_checkbox: tuple=("docstring", "inherits"), 
-			properties_disabled_by_default: tuple=("self"), 
-			parent: str=None
-			):
-			
-			"""Given a dicionary with {property_name: property_value}, where property_value could be a dictionary or a list
-			return a collapsible widget.
-			"""
-			if not not not property_value: # Means empty
-				return
-
-			if "type" in property_value and isinstance(property_value, dict):
-				color = self.find_object_type_color(property_value["type"])
-			else:
-				color = THEME[self.current_theme]["font_color"]
-
-			if property_name in properties_without_checkbox:
-				property_collapsible = self.create_collapsible_widget(property_name, color, collapse_button=CollapseButton)
-			else:
-				property_collapsible = self.create_collapsible_widget(property_name, color)
-
-			if property_name in properties_disabled_by_default:
-				property_collapsible.disable_checkbox()
-			
-			if isinstance(property_value, (list, tuple)):
-				for nested_property_value in property_value:
-					if not not not nested_property_value: # Means emtpy
-						continue
-
-					nested_property_label = QLabel(str(nested_property_value))
-
-					property_collapsible.addWidget(nested_property_label)
-			
-			elif isinstance(property_value, dict):				
-				add_object_properties_to_collapsible(property_value, property_collapsible, parent=property_name)
+		type_colors = {} # find_object_type_color reads the prefs, only once per type
 
-			elif isinstance(property_value, str):
-				property_value = property_value.strip()
+		def get_type_color(object_type: str) -> str:
+			if object_type not in type_colors:
+				type_colors[object_type] = self.find_object_type_color(object_type)
 
-				property_label = QLabel(self.convert_to_code_block(property_value))
-				property_label.setStyleSheet(f"color {color}")
+			return type_colors[object_type]
 
-				property_collapsible.addWidget(property_label)
+		object_name = tuple(self.module_content)[0]
 
-			# Add tooltips
-			if "type" in property_value and isinstance(property_value, dict): # Means is a variable (classes, strings, etc)
-				property_collapsible.title_frame.setToolTip(f"{property_name} {property_value['type']}")
-			elif "annotation" in property_value and isinstance(property_value, dict): # Means is a parameter
-				parameter_tooltip = property_name
-
-				if property_value["annotation"] is not None and property_value["default"] is not None:
-					parameter_tooltip += f" ({property_value['annotation']}={property_value['default']})"
-				elif property_value["annotation"] is not None and property_value["default"] is None:
-					parameter_tooltip += f" ({property_value['annotation']})"
-				elif property_value["default"] is not None:
-					parameter_tooltip += f"={property_value['default']}"
+		tree_model = TreeModel(
+			self.module_content, 
+			get_type_color, 
+			THEME[self.current_theme]["font_color"], 
+			THEME[self.current_theme]["code_block"], 
+			root_tooltip=f"{object_name} module at {self.prefs.file['current_module_path']}", 
+			state=self.session.get("tree_state"), 
+			parent=self
+		)
 
-				property_collapsible.title_frame.setToolTip(parameter_tooltip)
-			else:
-				if property_name == "inherits":
-					property_name = "inheritance"
+		# The state is stored once per event loop iteration, not once per row when many rows are checked or unchecked
+		state_timer = QTimer(tree_model)
+		state_timer.setSingleShot(True)
+		state_timer.timeout.connect(lambda: self.session.set("tree_state", tree_model.dump_state()))
+		tree_model.state_changed.connect(state_timer.start)
 
-				property_collapsible.title_frame.setToolTip(f"{parent}'s {property_name}")
-			
-			return property_collapsible
-
-		def add_object_properties_to_collapsible(object_properties: dict, collapsible: CollapsibleWidget, properties_to_ignore: tuple=("collapsed, checked"), parent: str=None):
-			"""Given a dictionary with the properties of an object an a collapsible, add widgest to the collapsible representing the properties.
-			"""
-			for property_name, property_value in object_properties.items():
-				if property_name in properties_to_ignore:
-					continue
-
-				multiple_line_string = "\n" in property_value if isinstance(property_value, str) else ""
-				if isinstance(property_value, (list, tuple, dict)) or multiple_line_string:
-					
-					property_collapsible = create_property_collapsible(property_name, property_value, parent=parent)
-
-					if property_collapsible is None:
-						continue
-					
-					if isinstance(property_value, dict):
-						if "collapsed" in property_value:
-							property_collapsible.collapse() if property_value["collapsed"] else property_collapsible.uncollapse()
-						if "checked" in property_value:
-							property_collapsible.enable_checkbox() if property_value["checked"] else property_collapsible.disable_checkbox()
-
-					collapsible.addWidget(property_collapsible)
-					continue
-				
-				property_label = QLabel(f"{property_name}: {self.convert_to_code_block(property_value)}")
-
-				collapsible.addWidget(property_label)
-		
-		object_name = tuple(object_content)[0]
-		object_properties = object_content[object_name]
+		tree_view = TreeView(tree_model)
 
-		# print(PREFS.convert_to_prefs(object_properties))
+		# Shown while the expanded rows are restored, if it takes more than one step (see TreeView.restore_expanded)
+		restore_progress_bar = QProgressBar()
+		restore_progress_bar.setVisible(False)
+		restore_progress_bar.setFormat("Restoring tree... %p%")
 
-		color = self.find_object_type_color(object_properties["type"])
+		def restore_progress(rows_expanded: int, rows_to_expand: int):
+			if rows_expanded < rows_to_expand:
+				restore_progress_bar.setVisible(True)
 
-		collapsible_object = self.create_collapsible_widget(object_name, color, collapse_button=collapse_button)
-		collapsible_object.title_frame.setToolTip(f"{object_name} module at {self.prefs.file['current_module_path']}")
+			restore_progress_bar.setMaximum(rows_to_expand)
+			restore_progress_bar.setValue(rows_expanded)
 
-		if "collapsed" in object_properties:
-			if object_properties["collapsed"]: collapsible_object.collapse()
-		if "checked" in object_properties:
-			collapsible_object.enable_checkbox() if object_properties["checked"] else collapsible_object.disable_checkbox()
+		tree_view.restore_progress.connect(restore_progress)
+		tree_view.restore_finished.connect(lambda: restore_progress_bar.setVisible(False))
 
-		add_object_properties_to_collapsible(object_content[object_name], collapsible_object, parent=object_name)
+		font = QFont()
+		tree_view.setStyleSheet(
+		f"""
+		QTreeView {{
+			font-family: {THEME['tree_font_family']};
+			border: none;
+		}}
+		QTreeView::item {{
+			padding: 3px 5px 3px 5px;
+		}}
+		QToolTip {{
+			font-family: {font.defaultFamily()};
+		}}
+		""")
 
-		return collapsible_object
+		self.widgets["tree_view"].append(tree_view)
 
-	def create_collapsible_widget(self, title: str, color=None, collapse_button=CheckBoxCollapseButton, parent=None) -> QWidget:
-		if parent is None:
-			parent = self
-			
-		collapsible_widget = CollapsibleWidget(
-			title, 
-			color, 
-			collapse_button, 
-			parent)
+		tree_tab = QWidget()
+		tree_tab.setLayout(QVBoxLayout())
+		tree_tab.layout().setContentsMargins(0, 0, 0, 0)
+		tree_tab.layout().addWidget(restore_progress_bar)
+		tree_tab.layout().addWidget(tree_view)
 
-		return collapsible_widget
+		return tree_tab
 
-	def find_object_type_color(self, object_type: str, change_types_dict: dict={"class": "type"}) -> str:
+	def find_object_type_color(self, object_type: str, change_types_dict: dict={"class": "type", "package": "module"}) -> str:
 		if object_type in change_types_dict:
 			object_type = change_types_dict[object_type]
 
@@ -1187,21 +1381,15 @@ class MainWidget(QWidget):
 			return
 
 		with open(path, "w") as file:
-			if export_type == TreeExportTypes.PREFS:
-				file.write(PREFS.convert_to_prefs(self.filter_tree()))
-			
-			elif export_type == TreeExportTypes.JSON:
-				json.dump(self.filter_tree(), file, indent=4)
-			
-			elif export_type == TreeExportTypes.YAML:
-				yaml.dump(self.filter_tree(), file)
+			export_tree(self.filter_tree(), export_type, file)
 	
 	def export_markdown(self, export_type: MarkdownExportTypes):
-		if len(self.widgets["markdown_text_edit"]) < 1:
+		self.save_markdown()
+		markdown_text = self.session.get("current_markdown", "") # The text edit may not be created yet (see create_markdown_tab)
+
+		if len(self.widgets["module_tabs"]) < 1 or markdown_text == "":
 			QMessageBox.critical(self, "Cannot Export Markdown", "No Markdown to export.")
 			return
-
-		markdown_text = self.widgets["markdown_text_edit"][-1].toPlainText()
 	
 		default_filename = f"{tuple(self.module_content)[0]}.{export_type.value[1]}"
 		path, file_filter = QFileDialog.getSaveFileName(self, f"Export as {export_type.value[0]}", default_filename, f"{export_type.value[0]} Files (*.{export_type.value[1]})")
@@ -1209,15 +1397,24 @@ class MainWidget(QWidget):
 		if path == '':
 			return
 
+		tree = self.get_reference_tree(markdown_text)
+
 		with open(path, "w") as file:
-			if export_type == MarkdownExportTypes.MARKDOWN:
-				file.write(markdown_text)
-			
-			elif export_type == MarkdownExportTypes.HTML:
-				file.write(markdown.markdown(markdown_text))
-			
-			elif export_type == MarkdownExportTypes.RESTRUCTUREDTEXT:
-				file.write(m2r2.convert(markdown_text))
+			if export_type == MarkdownExportTypes.HTML and tree is not None:
+				write_tree_html(tree, file) # Straight from the tree, without parsing the Markdown
+			elif export_type == MarkdownExportTypes.RESTRUCTUREDTEXT and tree is not None:
+				write_tree_rst(tree, file) # Sphinx directives from the tree, without m2r2
+			else:
+				export_markdown(markdown_text, export_type, file)
+
+	def get_reference_tree(self, markdown_text: str) -> dict:
+		"""Return the tree the API reference was generated from if markdown_text is it's Markdown (it was not edited), None otherwise.
+		Then it can be converted straight to HTML or reStructuredText (see tree_to_html and tree_to_rst).
+		"""
+		if self.generated_reference is None or self.generated_reference[1] != markdown_text:
+			return None
+
+		return self.generated_reference[0]
 	
 
 def init_app():
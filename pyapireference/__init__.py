@@ -0,0 +1 @@
+"""PyAPIReference, generate API references for Python modules."""
@@ -0,0 +1,169 @@
+"""Command-line interface of PyAPIReference.
+Inspects Python modules and exports their tree or API reference without starting the GUI (no Qt required).
+Example:
+	pyapireference example.py --format json md html -o docs
+"""
+import os
+import sys
+import argparse
+
+from pyapireference.inspect_object import inspect_object, iter_object_events, get_module_from_path, interpret_type, MAX_DEPTH
+from pyapireference.inspect_source import inspect_source
+from pyapireference.inspect_package import inspect_package
+from pyapireference.inspection_cache import InspectionCache, get_inspection_settings
+from pyapireference.tree_to_markdown import write_tree_markdown, MarkdownWriter
+from pyapireference.tree_to_html import write_tree_html
+from pyapireference.tree_to_rst import write_tree_rst
+from pyapireference.export import TreeExportTypes, MarkdownExportTypes, export_tree, JSONLinesWriter
+
+EXPORT_TYPES = {export_type.value[1]: export_type for export_type in (*TreeExportTypes, *MarkdownExportTypes)}
+# Formats that can be written while the module is inspected (see stream_module)
+STREAM_WRITERS = {"jsonl": JSONLinesWriter, "md": MarkdownWriter}
+
+
+def create_parser() -> argparse.ArgumentParser:
+	parser = argparse.ArgumentParser(
+		prog="pyapireference",
+		description="Generate API references for Python modules without opening the GUI."
+	)
+
+	parser.add_argument("paths", nargs="+", metavar="path", help="Python modules (.py files) or packages (directories) to inspect.")
+	parser.add_argument("-f", "--format", nargs="+", choices=tuple(EXPORT_TYPES), default=["md"], dest="formats",
+		help="Formats to export (default: md).")
+	parser.add_argument("-o", "--output-dir", default=".", help="Directory where the files are written (default: current directory).")
+	parser.add_argument("--exclude", nargs="*", default=["types.ModuleType"], metavar="TYPE",
+		help="Types of members to exclude, as in the filter dialog (default: types.ModuleType).")
+	parser.add_argument("--include-imported-members", action="store_true", help="Include members imported from other modules.")
+	parser.add_argument("--max-depth", type=int, default=MAX_DEPTH, help=f"Maximum depth of nested classes inspected, deeper classes are marked as truncated (default: {MAX_DEPTH}).")
+	parser.add_argument("--static", action="store_true", help="Parse the source code instead of importing the modules (their code is never run).")
+	parser.add_argument("-j", "--jobs", type=int, default=0, help="Number of processes used to inspect packages (default: one per CPU core).")
+	parser.add_argument("--timeout", type=float, default=60, help="Maximum seconds each module of a package can take to be inspected, 0 means no limit (default: 60).")
+	parser.add_argument("--memory-limit", type=int, default=4096, help="Maximum megabytes of memory each process inspecting a package can use, only on Unix, 0 means no limit (default: 4096).")
+	parser.add_argument("--cache-dir", default=None, help="Directory where inspected modules are cached, unchanged modules are not inspected again (default: no cache).")
+
+	return parser
+
+def export_module(tree: dict, formats: list, output_dir: str) -> list:
+	"""Write the tree of a module in each of the given formats, return the paths of the written files.
+	"""
+	module_name = tuple(tree)[0]
+	paths = []
+
+	for format_ in formats:
+		export_type = EXPORT_TYPES[format_]
+		path = os.path.join(output_dir, f"{module_name}.{format_}")
+
+		with open(path, "w") as file:
+			if isinstance(export_type, TreeExportTypes):
+				export_tree(tree, export_type, file)
+			elif export_type == MarkdownExportTypes.MARKDOWN:
+				write_tree_markdown(tree, file) # Straight into the file, without building the whole Markdown
+			elif export_type == MarkdownExportTypes.HTML:
+				write_tree_html(tree, file) # Straight from the tree, without parsing the Markdown
+			elif export_type == MarkdownExportTypes.RESTRUCTUREDTEXT:
+				write_tree_rst(tree, file) # Sphinx directives from the tree, without m2r2
+
+		paths.append(path)
+
+	return paths
+
+def stream_module(events, module_name: str, formats: list, output_dir: str) -> list:
+	"""Like export_module but writing the events of inspect_object.iter_object_events while they are generated, 
+	so the whole tree is never in memory. All formats must be in STREAM_WRITERS.
+	"""
+	paths = [os.path.join(output_dir, f"{module_name}.{format_}") for format_ in formats]
+	files = [open(path, "w") for path in paths]
+
+	try:
+		writers = [STREAM_WRITERS[format_](file) for format_, file in zip(formats, files)]
+
+		for event in events:
+			for writer in writers:
+				writer.handle_event(*event)
+
+		for writer in writers:
+			writer.close()
+	finally:
+		for file in files:
+			file.close()
+
+	return paths
+
+def main(argv: list=None) -> int:
+	args = create_parser().parse_args(argv)
+
+	try:
+		exclude_types = tuple(interpret_type(type_) for type_ in args.exclude)
+	except AttributeError as error:
+		print(f"pyapireference: invalid type to exclude: {error}", file=sys.stderr)
+		return 2
+
+	os.makedirs(args.output_dir, exist_ok=True)
+	cache = InspectionCache(args.cache_dir) if args.cache_dir is not None else None
+	exit_code = 0
+
+	for path in args.paths:
+		if os.path.isdir(path):
+			tree = inspect_package(path, exclude_types=exclude_types, include_imported_members=args.include_imported_members, max_depth=args.max_depth, static=args.static, max_workers=args.jobs, timeout=args.timeout, memory_limit=args.memory_limit, cache=cache)
+
+			# The modules that could not be inspected are exported with their error
+			for module_name, module_props in tuple(tree.values())[0]["content"].items():
+				if "error" in module_props:
+					print(f"pyapireference: couldn't inspect {module_name} in {path}. Exception found:\n{module_props['error']}", file=sys.stderr)
+					exit_code = 1
+
+			for exported_path in export_module(tree, args.formats, args.output_dir):
+				print(exported_path)
+			continue
+
+		if not os.path.isfile(path):
+			print(f"pyapireference: {path}: no such file or directory", file=sys.stderr)
+			exit_code = 1
+			continue
+
+		module_name = os.path.splitext(os.path.basename(path))[0]
+		cache_key = None
+
+		if cache is not None:
+			cache_key = cache.get_key(path, get_inspection_settings(module_name, exclude_types, args.include_imported_members, args.max_depth, args.static))
+			tree = cache.get(cache_key)
+
+			if tree is not None: # Means the module has not changed
+				for exported_path in export_module(tree, args.formats, args.output_dir):
+					print(exported_path)
+				continue
+
+		if args.static:
+			try:
+				tree = inspect_source(path, exclude_types=exclude_types, include_imported_members=args.include_imported_members)
+			except SyntaxError as error:
+				print(f"pyapireference: couldn't parse {path}: {error}", file=sys.stderr)
+				exit_code = 1
+				continue
+		else:
+			module, error = get_module_from_path(path)
+
+			if module is None: # Means exception
+				print(f"pyapireference: couldn't load {path}. Exception found:\n{error}", file=sys.stderr)
+				exit_code = 1
+				continue
+
+			if cache_key is None and all(format_ in STREAM_WRITERS for format_ in args.formats):
+				events = iter_object_events(module, exclude_types=exclude_types, include_imported_members=args.include_imported_members, max_depth=args.max_depth, object_name=module_name)
+
+				for exported_path in stream_module(events, module_name, args.formats, args.output_dir):
+					print(exported_path)
+				continue
+
+			tree = inspect_object(module, exclude_types=exclude_types, include_imported_members=args.include_imported_members, max_depth=args.max_depth)
+
+		if cache_key is not None:
+			cache.set(cache_key, tree)
+
+		for exported_path in export_module(tree, args.formats, args.output_dir):
+			print(exported_path)
+
+	return exit_code
+
+if __name__ == "__main__":
+	sys.exit(main())
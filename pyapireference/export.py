@@ -0,0 +1,72 @@
+"""Write inspection trees and API references to files.
+This module does not depend on Qt so it can be used by the GUI and by the command-line interface.
+"""
+import json
+import yaml
+from enum import Enum
+
+import PREFS
+import markdown # Markdown to HTML converter
+import m2r2 # Markdown to ReStructuredText converter
+
+from pyapireference.inspect_object import InspectEvents, iter_tree_events
+
+
+class TreeExportTypes(Enum):
+	PREFS = ("PREFS", "prefs")
+	JSON = ("JSON", "json")
+	YAML = ("YAML", "yaml")
+	JSON_LINES = ("JSON Lines", "jsonl")
+
+
+class MarkdownExportTypes(Enum):
+	MARKDOWN = ("Markdown", "md")
+	HTML = ("HTML", "html")
+	RESTRUCTUREDTEXT = ("ReStructuredText", "rst")
+
+
+class JSONLinesWriter:
+	"""Sink that writes each event of inspect_object.iter_object_events as a JSON object in a line of file, e.g.:
+		{"event": "enter_object", "name": "example", "value": null}
+		{"event": "property", "name": "type", "value": "module"}
+		...
+	"""
+	def __init__(self, file):
+		self.file = file
+
+	def handle_event(self, event: InspectEvents, name: str, value: any) -> None:
+		self.file.write(json.dumps({"event": event.value, "name": name, "value": value}) + "\n")
+
+	def close(self) -> None:
+		pass
+
+
+def export_tree(tree: dict, export_type: TreeExportTypes, file) -> None:
+	"""Write the tree (generated by inspect_object) into file (an opened text file) using export_type format.
+	"""
+	if export_type == TreeExportTypes.PREFS:
+		file.write(PREFS.convert_to_prefs(tree))
+
+	elif export_type == TreeExportTypes.JSON:
+		json.dump(tree, file, indent=4)
+
+	elif export_type == TreeExportTypes.YAML:
+		yaml.dump(tree, file)
+
+	elif export_type == TreeExportTypes.JSON_LINES:
+		json_lines_writer = JSONLinesWriter(file)
+
+		for event in iter_tree_events(tree):
+			json_lines_writer.handle_event(*event)
+
+def export_markdown(markdown_text: str, export_type: MarkdownExportTypes, file) -> None:
+	"""Write markdown_text into file (an opened text file) converting it to export_type format.
+	"""
+	if export_type == MarkdownExportTypes.MARKDOWN:
+		file.write(markdown_text)
+
+	elif export_type == MarkdownExportTypes.HTML:
+		file.write(markdown.markdown(markdown_text))
+
+	elif export_type == MarkdownExportTypes.RESTRUCTUREDTEXT:
+		file.write(m2r2.convert(markdown_text))
@@ -1,10 +1,6 @@
 import os
 import sys
 import inspect
-import traceback
-import builtins
-import types
-from importlib.util import spec_from_file_location, module_from_spec
 
 from PyQt5.QtWidgets import QAction, QDialog, QLabel, QVBoxLayout, QWidget, QTextEdit, QLayout, QMenu
 from PyQt5.QtGui import QFont, QFontMetrics
@@ -38,23 +34,6 @@ def get_text_size(text: str):
 
 	return QSize(font_metrics.width(text), font_metrics.height())
 
-def get_module_from_path(path: str):
-	"""Given a path of a Python module, returns it. If some exception when executing the module returns None, error
-	"""
-
-	filename = os.path.basename(path) # filename means only the filename without the path, e.g.: PyAPIReference/PyAPIReference/main.py -> main.py
-	filename_without_extension = os.path.splitext(filename)[0]
-
-	spec = spec_from_file_location(filename_without_extension, path)
-	module = module_from_spec(spec)
-	
-	try:
-		spec.loader.exec_module(module)
-	except Exception as error:
-		return None, traceback.format_exc()
-
-	return module, None
-
 def convert_to_code_block(string: str, stylesheet: str="background-color: #484848; color: white;") -> str:
 	if not isinstance(string, str):
 		return convert_to_code_block("None", stylesheet=stylesheet)
@@ -114,12 +93,6 @@ def get_widgets_from_layout(layout: QLayout, widget_type: QWidget=QWidget, exact
 
         yield widget
 
-def interpret_type(type_string: str):
-    if type_string.startswith("types."):
-        return getattr(types, type_string.removeprefix("types."))
-
-    return getattr(builtins, type_string)
-
 def remove_key_from_dict(my_dict: dict, key: str) -> dict:
 	return {k:v for k, v in my_dict.items() if k != key}
 
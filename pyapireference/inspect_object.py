@@ -1,99 +1,48 @@
+import os
 import inspect
 import PREFS
-import types
 import sys
-from difflib import SequenceMatcher
+import types
+import time
+import builtins
+import traceback
+from enum import Enum
+from importlib.util import spec_from_file_location, module_from_spec
+
+def get_module_from_path(path: str):
+	"""Given a path of a Python module, returns it. If some exception when executing the module returns None, error
+	"""
 
-def check_file(path):
-	"""Non-Safe Test Cases (add more as you think of some)
-	normal call: 
-		test()
-	
-	inside loop
-		for...
-			test()
-	reassignment:
-		x = test
-		x()
-	
-	nested reassignment:
-		x = test
-		y = x
-		y()
-	
-	classes:
-		class Test:
-			def test(self)
-				...
-		
-		t = Test()
-		t.run()
+	filename = os.path.basename(path) # filename means only the filename without the path, e.g.: PyAPIReference/PyAPIReference/main.py -> main.py
+	filename_without_extension = os.path.splitext(filename)[0]
+
+	spec = spec_from_file_location(filename_without_extension, path)
+	module = module_from_spec(spec)
 	
-	Imports:
-		from file import test
-		test()
+	try:
+		spec.loader.exec_module(module)
+	except Exception as error:
+		return None, traceback.format_exc()
 
-		Normal Import:
-			import test -> *Still testing*
-	"""
+	return module, None
 
-	name_main = False
-	main_line = 'if __name__ == "__main__"'
-	with open(fr"{path}", "r") as file:
-		lines = file.readlines()
+def interpret_type(type_string: str):
+	"""Given a type name as stored in the filter and colors preferences (e.g.: "str", "types.ModuleType") return the type.
+	"""
+	if type_string.startswith("types."):
+		return getattr(types, type_string.removeprefix("types."))
 
-	inside_func = False
-	function_names = []
-	not_safe_lines = []
+	return getattr(builtins, type_string)
 
-	for index, line in enumerate(lines, start=1):
-		if "from" in line and "import" in line:
-			s = line.split("import")[1].replace("\n", "").replace(",", "")[1:]
-			funcs = s.split(" ")
-			function_names.extend(funcs)
-		
-		if line[0:5] == "class":
-			if "(" in line:
-				i = line.index("(")
-				function_names.append(line[line.index("s")+2:i].strip())
-				inside_func = True
-			elif ":" in line:
-				i = line.index(":")
-				function_names.append(line[line.index("s")+2:i].strip())
-				inside_func = True
-			
-			continue
-		
-		if line[0:3] == "def" or line[0:9] == "async def":
-			# Inside a function
-			function_names.append(line[line.index("f")+1:line.index("(")].strip())
-			inside_func = True
-			continue
+def type_to_string(type_: type) -> str:
+	"""The opposite of interpret_type, e.g.: types.ModuleType -> "types.ModuleType", str -> "str".
+	Useful to send types to other processes (some of them, like types.ModuleType, can't be pickled).
+	"""
+	for name, value in vars(types).items():
+		if value is type_:
+			return f"types.{name}"
 
-		if inside_func and (line[0] not in [" ", "\n", "\t"]):
-			# Exited function (is not starting with space or new line)
-			inside_func = False
-		
-		if not name_main:
-			 # Check if they have if name == main condition
-			if line[0:2] == "if" and SequenceMatcher(None, line, main_line).ratio() > 0.8:
-				name_main = True
-
-		if not inside_func:
-			if name_main:
-				# Anything inside name main is safe
-				continue
-			for function in function_names:
-				if function in line and "(" in line and ")" in line:
-					# Function call outside function
-					not_safe_lines.append((index, line.replace("\n", "")))
-				
-				if "=" in line and function in line:
-					# Check for reassignment
-					function_names.append(line[0:line.index("=")].strip())
-					break
-
-	return not_safe_lines, name_main
+	return type_.__name__
 
 def prefs(func: callable):
 	"""This decorator will pass the result of the given func to PREFS.convert_to_prefs, 
@@ -124,7 +73,157 @@ def prefs(func: callable):
 
 	return wrapper_function # Return function to call
 
-def inspect_object(object_: object, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False, recursion_limit: int=10 ** 6):
+MAX_DEPTH = 100
+
+
+class InspectionCancelled(Exception):
+	"""Raised by the consumers of the inspection events when the inspection is cancelled (e.g.: with the Cancel button of the GUI).
+	"""
+
+
+class InspectEvents(Enum):
+	ENTER_OBJECT = "enter_object"
+	PROPERTY = "property"
+	LEAVE_OBJECT = "leave_object"
+
+
+class TreeBuilder:
+	"""Sink that builds the tree (as inspect_object returns it) from the events of iter_object_events.
+	Example:
+		tree_builder = TreeBuilder()
+
+		for event in iter_object_events(example):
+			tree_builder.handle_event(*event)
+
+		tree_builder.tree
+		>>> example=>
+			...
+	"""
+	def __init__(self):
+		self.tree = {}
+		# The properties of the objects entered and not left yet, the members are added to the content of the last one
+		self.stack = [{"content": self.tree}]
+
+	def handle_event(self, event: InspectEvents, name: str, value: any) -> None:
+		if event == InspectEvents.ENTER_OBJECT:
+			properties = {}
+			self.stack[-1]["content"][name] = properties
+			self.stack.append(properties)
+
+		elif event == InspectEvents.PROPERTY:
+			self.stack[-1][name] = value
+
+		elif event == InspectEvents.LEAVE_OBJECT:
+			self.stack.pop()
+
+	def close(self) -> None:
+		pass
+
+
+class ProgressThrottle:
+	"""Call callback(*args, elapsed seconds since start) at most every interval seconds, the calls in between are dropped.
+	Example:
+		report_progress = ProgressThrottle(print, 0.1)
+		report_progress(members_inspected, qualified_name)
+	"""
+	def __init__(self, callback: callable, interval: float, clock: callable=time.perf_counter):
+		self.callback = callback
+		self.interval = interval
+		self.clock = clock
+		self.start()
+
+	def start(self) -> None:
+		"""Measure the elapsed seconds from now, the next call is never dropped.
+		"""
+		self.start_time = self.clock()
+		self.last_call = None
+
+	def __call__(self, *args) -> None:
+		now = self.clock()
+
+		if self.last_call is None or now - self.last_call >= self.interval:
+			self.last_call = now
+			self.callback(*args, now - self.start_time)
+
+
+def build_tree(events, cancel_event=None, member_entered: callable=None) -> dict:
+	"""Build the tree from the events of iter_object_events (or sandbox.iter_sandboxed_events, etc.) with a TreeBuilder.
+	member_entered(members inspected, qualified name) is called for each member entered (e.g.: a ProgressThrottle).
+	Raises InspectionCancelled if cancel_event (a threading.Event) is set, events is closed either way (which stops the sandbox child).
+	"""
+	tree_builder = TreeBuilder()
+	names = [] # Names of the members entered and not left yet
+	members_inspected = 0
+
+	try:
+		for event, name, value in events:
+			if cancel_event is not None and cancel_event.is_set():
+				raise InspectionCancelled()
+
+			tree_builder.handle_event(event, name, value)
+
+			if event == InspectEvents.ENTER_OBJECT:
+				names.append(name)
+				members_inspected += 1
+
+				if member_entered is not None:
+					member_entered(members_inspected, ".".join(names))
+			elif event == InspectEvents.LEAVE_OBJECT:
+				names.pop()
+	finally:
+		if hasattr(events, "close"):
+			events.close()
+
+	return tree_builder.tree
+
+
+class ModuleOwnership:
+	"""Find the name of the module a member belongs to (where it was defined), as inspect.getmodule(member).__name__ does but in O(1):
+		modules -> their name
+		objects with __module__ (classes, functions, their instances, etc.) -> the name of that module if it is in sys.modules
+		code objects, frames and tracebacks -> the module with the same file, using a map of file to module name created only when needed and reused
+		other objects (e.g.: numbers and strings) -> None, without trying to find their file (which raises an exception for each of them)
+	Create one per inspection, the map is not updated if modules are imported later (except when a file is not found).
+	"""
+	def __init__(self):
+		self.file_modules = None
+
+	def get_module_name(self, member: object) -> str:
+		"""Return the name of the module member belongs to or None if unknown.
+		"""
+		if inspect.ismodule(member):
+			return member.__name__
+
+		if hasattr(member, "__module__"):
+			module = sys.modules.get(member.__module__)
+			return module.__name__ if module is not None else None
+
+		if not isinstance(member, (types.CodeType, types.FrameType, types.TracebackType)): # The only objects without __module__ that can have a file
+			return None
+
+		try:
+			file = inspect.getabsfile(member)
+		except TypeError: # Built-in code
+			return None
+
+		if self.file_modules is None or file not in self.file_modules:
+			self.file_modules = self.get_file_modules()
+
+		return self.file_modules.get(file)
+
+	def get_file_modules(self) -> dict:
+		result = {}
+
+		for module_name, module in tuple(sys.modules.items()):
+			module_file = getattr(module, "__file__", None)
+
+			if isinstance(module_file, str):
+				result[os.path.normcase(os.path.abspath(module_file))] = module.__name__
+
+		return result
+
+
+def inspect_object(object_: object, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False, max_depth: int=MAX_DEPTH):
 	"""Find all members of Python object.
 	Example:
 		def say_hi(name: str) -> str:
@@ -138,35 +237,29 @@ def inspect_object(object_: object, exclude_types: tuple=(types.ModuleType), inc
 				default=None
 				kind=POSITIONAL_OR_KEYWORD
 			return_annotation=<class 'str'>
+	Classes and modules nested deeper than max_depth are not inspected, see get_object_properties.
 	"""
-	previous_recursion_limit = sys.getrecursionlimit()
-	sys.setrecursionlimit(recursion_limit)
-
 	object_name = object_.__name__
-	result = {object_name: get_object_properties(object_, exclude_types=exclude_types, include_imported_members=include_imported_members)}	
-	
-	sys.setrecursionlimit(previous_recursion_limit)
+	result = {object_name: get_object_properties(object_, exclude_types=exclude_types, include_imported_members=include_imported_members, max_depth=max_depth, object_name=object_name)}
 
 	return result
 
-def get_object_members(object_: object, exclude_types: tuple=(types.ModuleType), dunder_methods_to_include_by_type={"type": ("__init__")}, include_imported_members: bool=False):
+def get_object_members(object_: object, exclude_types: tuple=(types.ModuleType), dunder_methods_to_include_by_type={"type": ("__init__")}, include_imported_members: bool=False, module_ownership: ModuleOwnership=None):
+	"""Return an iterator of (name, member) of the members of object_ that are not filtered.
+	module_ownership is used to exclude imported members, pass the same one to all the calls of an inspection to reuse it.
+	"""
 	def filter_member(member_name: str, member: object):
 		if isinstance(member, exclude_types):
 			return False
  
  		# If the object it's a module
-		if inspect.ismodule(object_) and not include_imported_members:
+		if exclude_imported_members:
 			# Get the module of the member (where it was defined or it belongs to)
 			# And check if the object name is the same as the member one.
 			# This will exclude all members that do not belong to the given module.
-			member_module = inspect.getmodule(member)
-			if member_module is not None:
-				return member_module.__name__ == object_.__name__
-
-		if type(object_).__name__ in dunder_methods_to_include_by_type:
-			dunder_methods_to_include = dunder_methods_to_include_by_type[type(object_).__name__]
-		else:
-			dunder_methods_to_include = ()
+			member_module_name = module_ownership.get_module_name(member)
+			if member_module_name is not None:
+				return member_module_name == object_.__name__
 
 		if (member_name.startswith("__") and member_name.endswith("__") 
 			and member_name not in dunder_methods_to_include):
@@ -175,6 +268,16 @@ def get_object_members(object_: object, exclude_types: tuple=(types.ModuleType),
 
 		return True
 
+	if module_ownership is None:
+		module_ownership = ModuleOwnership()
+
+	exclude_imported_members = inspect.ismodule(object_) and not include_imported_members
+
+	if type(object_).__name__ in dunder_methods_to_include_by_type:
+		dunder_methods_to_include = dunder_methods_to_include_by_type[type(object_).__name__]
+	else:
+		dunder_methods_to_include = ()
+
 	# Instead of using inspect.getmembers to keep the members in the order they were defined
 	# We are going to use vars(object_)
 	# result = inspect.getmembers(object_)
@@ -185,18 +288,20 @@ def get_object_members(object_: object, exclude_types: tuple=(types.ModuleType),
 
 	return result
 
-def get_object_content(object_: object, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False):
+def get_object_content(object_: object, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False, max_depth: int=MAX_DEPTH):
 	"""Given an object get attributes of all of it's members.
+	As in get_object_properties, classes and modules nested more than max_depth levels below object_ have truncated=True instead of content.
 	"""
-	result = {}
+	properties = get_object_properties(object_, exclude_types=exclude_types, include_imported_members=include_imported_members, max_depth=max_depth)
 
-	for member_name, member in get_object_members(object_, exclude_types=exclude_types, include_imported_members=include_imported_members):
-		result[member_name] = get_object_properties(member, exclude_types=exclude_types, include_imported_members=include_imported_members)
-
-	return result
+	return properties.get("content", {})
 
-def get_object_properties(object_: object, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False):
+def get_object_properties(object_: object, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False, max_depth: int=MAX_DEPTH, object_name: str=None):
 	"""Given an object return it's type and content.
+	Instead of recursion the members are inspected using a stack, so deep or wide objects don't overflow the stack.
+	Classes and modules nested more than max_depth levels below object_ have truncated=True instead of content.
+	Classes, modules and functions found more than once (aliases, a class referencing itself, etc.) are only inspected the first time,
+	the next times they have a reference (e.g.: example/Person/__init__) to the first one instead, see resolve_reference.
 	Example:
 		class Test2(Test1):
 			def __init__(self):
@@ -216,26 +321,116 @@ def get_object_properties(object_: object, exclude_types: tuple=(types.ModuleTyp
 			test_func=>
 				type=function
 				parameters ...
+	"""
+	tree_builder = TreeBuilder()
 
-	callable (function, lambda, methods) -> parameters (see get_callable_parameters), return_annotation 
+	for event in iter_object_events(object_, exclude_types=exclude_types, include_imported_members=include_imported_members, max_depth=max_depth, object_name=object_name):
+		tree_builder.handle_event(*event)
+
+	return next(iter(tree_builder.tree.values()))
+
+def iter_object_events(object_: object, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False, max_depth: int=MAX_DEPTH, object_name: str=None):
+	"""Walk object_ as get_object_properties does but yield (event, name, value) while the members are found instead of returning the whole tree:
+		(InspectEvents.ENTER_OBJECT, object name, None)
+		(InspectEvents.PROPERTY, property name, property value) for each property (type, docstring, parameters, etc.)
+		(InspectEvents.PROPERTY, "content", {}) followed by the events of each member (only classes and modules)
+		(InspectEvents.LEAVE_OBJECT, object name, None)
+	Only the members waiting to be walked are kept in memory, so the events can be written (see TreeBuilder, export.JSONLinesWriter, tree_to_markdown.MarkdownWriter) 
+	while the object is inspected.
 	"""
+	if object_name is None:
+		object_name = getattr(object_, "__name__", get_object_type(object_))
 
-	object_type = type(object_).__name__
+	# The path of the objects already found by their id
+	paths = {id(object_): object_name}
+	module_ownership = ModuleOwnership()
 
-	if object_type == "type":
-		object_type = "class"
+	# Each item is (event, name, object, depth, path, reference)
+	# The LEAVE_OBJECT item of an object is pushed before it's members so it's popped after them
+	stack = [(InspectEvents.ENTER_OBJECT, object_name, object_, 0, object_name, None)]
+
+	while stack:
+		event, member_name, member, depth, member_path, reference = stack.pop()
+		yield event, member_name, None
+
+		if event == InspectEvents.LEAVE_OBJECT:
+			continue
+
+		stack.append((InspectEvents.LEAVE_OBJECT, member_name, None, depth, member_path, None))
+
+		if reference is not None: # Already found, do not inspect it again
+			yield InspectEvents.PROPERTY, "type", get_object_type(member)
+			yield InspectEvents.PROPERTY, "docstring", None
+			yield InspectEvents.PROPERTY, "reference", reference
+			continue
+
+		for property_name, property_value in get_object_attributes(member).items():
+			yield InspectEvents.PROPERTY, property_name, property_value
+
+		if not (inspect.isclass(member) or inspect.ismodule(member)):
+			continue
+
+		if depth >= max_depth:
+			yield InspectEvents.PROPERTY, "truncated", True
+			continue
+
+		yield InspectEvents.PROPERTY, "content", {}
+		nested_members = []
+
+		for nested_member_name, nested_member in get_object_members(member, exclude_types=exclude_types, include_imported_members=include_imported_members, module_ownership=module_ownership):
+			if id(nested_member) in paths:
+				nested_members.append((InspectEvents.ENTER_OBJECT, nested_member_name, nested_member, depth + 1, None, paths[id(nested_member)]))
+				continue
+
+			nested_member_path = f"{member_path}/{nested_member_name}"
+
+			if inspect.isclass(nested_member) or inspect.ismodule(nested_member) or inspect.isfunction(nested_member) or inspect.ismethod(nested_member):
+				paths[id(nested_member)] = nested_member_path
+
+			nested_members.append((InspectEvents.ENTER_OBJECT, nested_member_name, nested_member, depth + 1, nested_member_path, None))
+
+		# Reversed so the members are popped in the order they were defined
+		stack.extend(reversed(nested_members))
+
+def iter_tree_events(tree: dict):
+	"""Yield the events (see iter_object_events) of a tree already generated, e.g.: to write a filtered tree with a sink.
+	"""
+	# Each item is (name, properties), properties is None when leaving the object
+	stack = list(reversed(tree.items()))
+
+	while stack:
+		name, properties = stack.pop()
+
+		if properties is None:
+			yield InspectEvents.LEAVE_OBJECT, name, None
+			continue
+
+		yield InspectEvents.ENTER_OBJECT, name, None
+		stack.append((name, None))
+
+		for property_name, property_value in properties.items():
+			if property_name == "content":
+				yield InspectEvents.PROPERTY, property_name, {}
+				stack.extend(reversed(property_value.items()))
+				continue
+
+			yield InspectEvents.PROPERTY, property_name, property_value
+
+def get_object_attributes(object_: object):
+	"""Given an object return it's type, docstring and the attributes that depend on it's type but not it's content (see get_object_properties).
+	class -> inherits
+	callable (function, lambda, methods) -> parameters (see get_callable_parameters), return_annotation 
+	anything else -> value
+	"""
+	object_type = get_object_type(object_)
 	
 	datatypes = {"str", "int", "float", "complex", "list", "tuple", "range", "dict", "set", "frozenset", "bool"}
 	
 	result = {"type": object_type, "docstring": str(object_.__doc__) if object_type not in datatypes else None}
 		
-	if inspect.isclass(object_) or inspect.ismodule(object_):
-		
-		if inspect.isclass(object_):
-			result["inherits"] = [i.__name__ for i in inspect.getmro(object_)[1:-1]]
-		
-		result["content"] = get_object_content(object_, exclude_types=exclude_types, include_imported_members=include_imported_members)
-	
+	if inspect.isclass(object_):
+		result["inherits"] = [i.__name__ for i in inspect.getmro(object_)[1:-1]]
+
 	elif inspect.isfunction(object_) or inspect.ismethod(object_):
 		
 		result["parameters"] = get_callable_parameters(object_)	
@@ -249,11 +444,38 @@ def get_object_properties(object_: object, exclude_types: tuple=(types.ModuleTyp
 			else:
 				result["return_annotation"] = str(object_.__annotations__["return"].__name__) if object_.__annotations__["return"] is not None else None 
 
-	else:
+	elif not inspect.ismodule(object_):
 		result["value"] = str(object_) if not isinstance(object_, str) else "'" + object_ +"'"
 	
 	return result
 
+def get_object_type(object_: object) -> str:
+	object_type = type(object_).__name__
+
+	if object_type == "type":
+		object_type = "class"
+
+	return object_type
+
+def resolve_reference(tree: dict, reference: str) -> dict:
+	"""Given a tree (or the content of a package tree) and a reference (see get_object_properties) return the properties of the referenced object.
+	Example:
+		resolve_reference(inspect_object(example), "example/Person/__init__")
+		>>>
+		type=function
+		docstring=...
+		parameters=>
+			...
+	Raises KeyError if the referenced object is not in the tree (e.g.: it was filtered).
+	"""
+	names = reference.split("/")
+	result = tree[names[0]]
+
+	for name in names[1:]:
+		result = result["content"][name]
+
+	return result
+
 def get_callable_parameters(callable_: callable):
 	"""Given a callable object (functions, lambda or methods) get all it's parameters, 
 	each parameter annotation (a: str, b: int), default value (a=1, b=2) and kind (positional, keyword, etc).
@@ -0,0 +1,266 @@
+"""Inspect all the modules of a package (a directory) in parallel, each module is inspected in a worker process.
+The result is a single tree where the content is keyed by the dotted path of each module:
+	package=>
+		type=package
+		docstring=...
+		content=>
+			package=> (package/__init__.py)
+				...
+			package.submodule=>
+				...
+"""
+import os
+import sys
+import time
+import types
+import importlib
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+	import resource # Only available on Unix
+except ImportError:
+	resource = None
+
+from pyapireference.inspect_object import inspect_object, interpret_type, type_to_string, InspectionCancelled, TreeBuilder, MAX_DEPTH
+from pyapireference.inspect_source import inspect_source_code
+from pyapireference.inspection_cache import InspectionCache, get_inspection_settings
+from pyapireference.sandbox import iter_sandboxed_events, SandboxError
+
+# Seconds between the checks of cancel_event while waiting for a module (see wait_module)
+CANCEL_CHECK_INTERVAL = 0.02
+
+
+def find_package_modules(path: str) -> list:
+	"""Return a list of (dotted module name, module path) with all the modules inside the directory at path
+	and the directory that must be in sys.path to import them.
+	If path is a package (contains __init__.py) only subpackages are searched, otherwise all subdirectories.
+	"""
+	path = os.path.abspath(path)
+	is_package = os.path.isfile(os.path.join(path, "__init__.py"))
+	root = os.path.dirname(path) if is_package else path
+
+	result = []
+
+	for dirpath, dirnames, filenames in os.walk(path):
+		dirnames[:] = sorted(
+			dirname for dirname in dirnames
+			if dirname.isidentifier() and (not is_package or os.path.isfile(os.path.join(dirpath, dirname, "__init__.py")))
+		)
+
+		for filename in sorted(filenames):
+			module_name, extension = os.path.splitext(filename)
+
+			if extension != ".py" or not module_name.isidentifier():
+				continue
+
+			module_path = os.path.join(dirpath, filename)
+			dotted_path = os.path.relpath(module_path, root)[:-len(extension)].split(os.sep)
+
+			if dotted_path[-1] == "__init__":
+				dotted_path.pop()
+
+			result.append((".".join(dotted_path), module_path))
+
+	return result, root
+
+def inspect_module_file(module_name: str, module_path: str, root: str, exclude_types: tuple=("types.ModuleType", ), include_imported_members: bool=False, max_depth: int=MAX_DEPTH, static: bool=False):
+	"""Inspect a single module of a package, this function runs in the worker processes.
+	exclude_types are the names of the types (see interpret_type) because not all types can be pickled.
+	Returns the properties of the module, if the module cannot be imported they include an "error" key with the traceback.
+	"""
+	exclude_types = tuple(interpret_type(type_) for type_ in exclude_types)
+
+	try:
+		if static:
+			with open(module_path, "r", encoding="utf-8") as file:
+				source = file.read()
+
+			return inspect_source_code(source, module_name, filename=module_path, exclude_types=exclude_types, include_imported_members=include_imported_members)[module_name]
+
+		if root not in sys.path:
+			sys.path.insert(0, root)
+
+		module = importlib.import_module(module_name)
+
+		return inspect_object(module, exclude_types=exclude_types, include_imported_members=include_imported_members, max_depth=max_depth)[module_name]
+
+	except (Exception, SystemExit): # A module calling sys.exit must not kill the worker
+		return get_error_properties(traceback.format_exc())
+
+def inspect_module_sandboxed(module_name: str, module_path: str, root: str, exclude_types: tuple=("types.ModuleType", ), include_imported_members: bool=False, max_depth: int=MAX_DEPTH, timeout: float=0, memory_limit: int=0, cancel_event=None):
+	"""Same as inspect_module_file but importing the module in a child interpreter (see sandbox.iter_sandboxed_events), this function runs in the threads of iter_sandboxed_modules.
+	Raises InspectionCancelled if cancel_event is set.
+	"""
+	tree_builder = TreeBuilder()
+
+	try:
+		for event in iter_sandboxed_events(module_path, exclude_types, include_imported_members, max_depth, timeout, memory_limit, cancel_event, module_name=module_name, root=root):
+			tree_builder.handle_event(*event)
+	except SandboxError as error: # The traceback or the reason the child stopped (timeout, memory, crash)
+		return get_error_properties(str(error))
+
+	return tree_builder.tree[module_name]
+
+def get_error_properties(error: str) -> dict:
+	"""Properties of a module that could not be inspected, error is the traceback or the reason.
+	"""
+	return {"type": "module", "docstring": None, "error": error}
+
+def limit_memory(memory_limit: int) -> None:
+	"""Initializer of the worker processes, memory_limit is the maximum megabytes of memory they can use (0 means no limit, only on Unix).
+	"""
+	if memory_limit > 0 and resource is not None:
+		memory_limit = memory_limit * 1024 ** 2
+		resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+def terminate_workers(executor: ProcessPoolExecutor) -> None:
+	"""Kill the processes of executor, they may be running a module that never ends.
+	"""
+	if hasattr(executor, "terminate_workers"): # Python 3.14+
+		executor.terminate_workers()
+		return
+
+	for process in tuple((executor._processes or {}).values()):
+		process.kill()
+
+def wait_module(future, timeout: float=0, cancel_event=None) -> dict:
+	"""Return the result of future, raise concurrent.futures.TimeoutError if it's not done in timeout seconds (0 means no limit)
+	or InspectionCancelled if cancel_event is set.
+	"""
+	deadline = time.monotonic() + timeout if timeout > 0 else None
+
+	while True:
+		wait_time = CANCEL_CHECK_INTERVAL if cancel_event is not None else None
+
+		if deadline is not None:
+			remaining = max(deadline - time.monotonic(), 0)
+			wait_time = remaining if wait_time is None else min(wait_time, remaining)
+
+		try:
+			return future.result(timeout=wait_time)
+		except FutureTimeoutError:
+			if cancel_event is not None and cancel_event.is_set():
+				raise InspectionCancelled()
+
+			if deadline is not None and time.monotonic() >= deadline:
+				raise
+
+def iter_pool_modules(modules: list, root: str, settings: tuple, max_workers: int=None, timeout: float=0, memory_limit: int=0, cancel_event=None):
+	"""Inspect modules (a list of (module name, module path)) with inspect_module_file(module_name, module_path, root, *settings) in a process pool,
+	yielding (module name, properties) in the same order.
+	The modules are waited in order, so each one runs at least timeout seconds before it's stopped.
+	A module that takes longer or stops it's worker (e.g.: a crash or using more than memory_limit megabytes outside Python)
+	gets an "error" key and the modules not inspected yet are submitted to a new pool.
+	"""
+	pending = list(modules)
+	workers = max_workers or None
+
+	while pending:
+		executor = ProcessPoolExecutor(max_workers=workers, initializer=limit_memory, initargs=(memory_limit, ))
+		restart_at = None # Index of the first module submitted again to a new pool
+
+		try:
+			futures = [executor.submit(inspect_module_file, module_name, module_path, root, *settings) for module_name, module_path in pending]
+
+			for index, ((module_name, _), future) in enumerate(zip(pending, futures)):
+				pool_stopped = False
+
+				try:
+					properties = wait_module(future, timeout, cancel_event)
+				except InspectionCancelled:
+					terminate_workers(executor) # Don't wait for the modules being inspected
+					raise
+				except FutureTimeoutError:
+					terminate_workers(executor)
+					properties = get_error_properties(f"The inspection took more than {timeout:g} seconds, the worker was stopped.")
+					pool_stopped = True
+				except BrokenProcessPool:
+					if workers != 1: # Any of the modules running may have stopped the pool, find it inspecting them one by one
+						workers = 1
+						restart_at = index
+						break
+
+					properties = get_error_properties("The worker stopped unexpectedly while inspecting this module (e.g.: it crashed or used too much memory).")
+					pool_stopped = True
+					workers = max_workers or None # Found it, the next modules are inspected in parallel again
+
+				yield module_name, properties
+
+				if pool_stopped:
+					restart_at = index + 1
+					break
+		finally:
+			executor.shutdown(cancel_futures=True)
+
+		if restart_at is None:
+			return
+
+		pending = pending[restart_at:]
+
+def iter_sandboxed_modules(modules: list, root: str, settings: tuple, max_workers: int=None, timeout: float=0, memory_limit: int=0, cancel_event=None):
+	"""Same as iter_pool_modules but each module is inspected in it's own child interpreter (started by a thread, max_workers at a time),
+	which stops itself after timeout seconds or when cancel_event is set.
+	"""
+	exclude_types, include_imported_members, max_depth, _ = settings # The modules are never inspected statically here
+	executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+
+	try:
+		futures = [
+			executor.submit(inspect_module_sandboxed, module_name, module_path, root, exclude_types, include_imported_members, max_depth, timeout, memory_limit, cancel_event)
+			for module_name, module_path in modules
+		]
+
+		for (module_name, _), future in zip(modules, futures):
+			yield module_name, wait_module(future, cancel_event=cancel_event)
+	finally:
+		executor.shutdown(cancel_futures=True) # The running children are stopped by their watchdog when cancelling
+
+def inspect_package(path: str, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False, max_depth: int=MAX_DEPTH, static: bool=False, max_workers: int=None, timeout: float=0, memory_limit: int=0, sandbox: bool=False, cache: InspectionCache=None, cancel_event=None, module_inspected: callable=None):
+	"""Find all members of all the modules inside the package (directory) at path using a process pool.
+	max_workers is the number of processes, if None or 0 one per CPU core.
+	If sandbox is True the modules are imported in child interpreters (see sandbox.py) instead of workers forked from this process (unless static is True, the code is not run).
+	timeout is the maximum seconds each module can take and memory_limit the maximum megabytes of memory each worker can use (only on Unix), 0 means no limit.
+	The modules that cannot be inspected have an "error" key with the traceback or the reason (see iter_pool_modules).
+	If cache is given, unchanged modules are taken from it and only the others are inspected.
+	module_inspected is called with the name of each module when it is inspected.
+	If cancel_event (a threading.Event) is set the pending modules are cancelled and InspectionCancelled is raised without waiting for the running ones.
+	"""
+	modules, root = find_package_modules(path)
+	package_name = os.path.basename(os.path.abspath(path))
+
+	if isinstance(exclude_types, type):
+		exclude_types = (exclude_types, )
+
+	exclude_types = tuple(type_to_string(type_) for type_ in exclude_types)
+
+	content = {module_name: None for module_name, _ in modules} # Keep the modules order
+	cache_keys = {}
+
+	if cache is not None:
+		for module_name, module_path in modules:
+			cache_keys[module_name] = cache.get_key(module_path, get_inspection_settings(module_name, exclude_types, include_imported_members, max_depth, static))
+			cached_tree = cache.get(cache_keys[module_name]) # {module name: properties}, as standalone modules are cached
+
+			if cached_tree is not None:
+				content[module_name] = cached_tree[module_name]
+
+	modules_to_inspect = [(module_name, module_path) for module_name, module_path in modules if content[module_name] is None]
+
+	settings = (exclude_types, include_imported_members, max_depth, static)
+
+	iter_modules = iter_sandboxed_modules if sandbox and not static else iter_pool_modules
+
+	for module_name, module_properties in iter_modules(modules_to_inspect, root, settings, max_workers, timeout, memory_limit, cancel_event):
+		content[module_name] = module_properties
+
+		if module_inspected is not None:
+			module_inspected(module_name)
+
+		if cache is not None and "error" not in module_properties:
+			cache.set(cache_keys[module_name], {module_name: module_properties})
+
+	docstring = content[package_name]["docstring"] if package_name in content else None
+
+	return {package_name: {"type": "package", "docstring": docstring, "content": content}}
@@ -0,0 +1,318 @@
+"""Static inspection engine: parses the source of a Python module with ast instead of importing it.
+The module's code is never executed, so it has no side effects and it is fast even for heavy packages.
+The generated tree has the same shape as the one generated by inspect_object.inspect_object.
+"""
+import os
+import ast
+import types
+
+DATATYPES = {"str", "int", "float", "complex", "list", "tuple", "range", "dict", "set", "frozenset", "bool"}
+
+PARAMETER_KINDS = {
+	"posonlyargs": "positional-only",
+	"args": "positional or keyword",
+	"vararg": "variadic positional",
+	"kwonlyargs": "keyword-only",
+	"kwarg": "variadic keyword",
+}
+
+DECORATOR_TYPES = ("staticmethod", "classmethod", "property")
+
+
+def inspect_source(path: str, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False):
+	"""Find all members of the Python module at path without executing it.
+	Example:
+		print(inspect_source("example.py"))
+		>>> example=>
+			type=module
+			docstring=...
+			content=>
+				...
+	Raises SyntaxError if the module cannot be parsed.
+	"""
+	filename = os.path.basename(path)
+	module_name = os.path.splitext(filename)[0]
+
+	with open(path, "r", encoding="utf-8") as file:
+		source = file.read()
+
+	return inspect_source_code(source, module_name, filename=path, exclude_types=exclude_types, include_imported_members=include_imported_members)
+
+def inspect_source_code(source: str, module_name: str, filename: str="<unknown>", exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False):
+	"""Same as inspect_source but given the source code of the module instead of its path.
+	"""
+	module_node = ast.parse(source, filename=filename)
+
+	return {module_name: get_node_properties(module_node, exclude_types=exclude_types, include_imported_members=include_imported_members)}
+
+def get_node_properties(node: ast.AST, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False, classes_bases: dict=None):
+	"""Given a module, class or function node return it's type and content (like inspect_object.get_object_properties).
+	classes_bases is used to resolve the inheritance of classes defined in the same module.
+	"""
+	if classes_bases is None:
+		classes_bases = {}
+
+	if isinstance(node, ast.Module):
+		return {
+			"type": "module",
+			"docstring": str(ast.get_docstring(node, clean=False)),
+			"content": get_node_content(node, exclude_types=exclude_types, include_imported_members=include_imported_members, classes_bases=classes_bases)
+		}
+
+	if isinstance(node, ast.ClassDef):
+		return {
+			"type": "class",
+			"docstring": str(ast.get_docstring(node, clean=False)),
+			"inherits": get_class_inheritance(node, classes_bases),
+			"content": get_node_content(node, exclude_types=exclude_types, include_imported_members=include_imported_members, classes_bases=classes_bases)
+		}
+
+	# Functions and lambdas
+	decorators = [get_expression_name(decorator) for decorator in getattr(node, "decorator_list", ())]
+	object_type = next((decorator for decorator in decorators if decorator in DECORATOR_TYPES), "function")
+
+	result = {
+		"type": object_type,
+		"docstring": str(ast.get_docstring(node, clean=False)) if not isinstance(node, ast.Lambda) else "None",
+		"parameters": get_node_parameters(node.args)
+	}
+
+	if getattr(node, "returns", None) is not None:
+		result["return_annotation"] = get_annotation(node.returns)
+
+	return result
+
+def get_node_content(node: ast.AST, exclude_types: tuple=(types.ModuleType), include_imported_members: bool=False, classes_bases: dict=None):
+	"""Given a module or class node get the properties of all of it's members in the order they are defined.
+	"""
+	def is_excluded(member_type: type) -> bool:
+		return member_type is not None and issubclass(member_type, exclude_types)
+
+	def add_member(member_name: str, member_properties: dict, member_type: type):
+		if member_name.startswith("__") and member_name.endswith("__") and member_name not in dunder_methods_to_include:
+			return
+
+		if is_excluded(member_type):
+			# A name defined again with an excluded type is not the old member anymore
+			result.pop(member_name, None)
+			return
+
+		result[member_name] = member_properties
+
+	dunder_methods_to_include = ("__init__",) if isinstance(node, ast.ClassDef) else ()
+	result = {}
+
+	for statement in iter_statements(node.body):
+		if isinstance(statement, ast.ClassDef):
+			if not is_excluded(type):
+				classes_bases[statement.name] = [get_expression_name(base) for base in statement.bases]
+
+			add_member(statement.name, get_node_properties(statement, exclude_types=exclude_types, include_imported_members=include_imported_members, classes_bases=classes_bases), type)
+
+		elif isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+			add_member(statement.name, get_node_properties(statement), types.FunctionType)
+
+		elif isinstance(statement, (ast.Import, ast.ImportFrom)):
+			if not include_imported_members:
+				continue
+
+			for alias in statement.names:
+				if alias.name == "*":
+					continue
+
+				if isinstance(statement, ast.Import):
+					member_name = alias.asname if alias.asname is not None else alias.name.split(".")[0]
+					add_member(member_name, {"type": "module", "docstring": None, "value": f"import {alias.name}"}, types.ModuleType)
+					continue
+
+				member_name = alias.asname if alias.asname is not None else alias.name
+				add_member(member_name, {"type": "import", "docstring": None, "value": f"from {'.' * statement.level}{statement.module or ''} import {alias.name}"}, None)
+
+		elif isinstance(statement, (ast.Assign, ast.AnnAssign)):
+			if statement.value is None: # Only annotated (e.g.: name: str), it's not a member
+				continue
+
+			targets = statement.targets if isinstance(statement, ast.Assign) else (statement.target, )
+
+			for target, value in iter_assignments(targets, statement.value):
+				if isinstance(value, ast.Lambda):
+					add_member(target, get_node_properties(value), types.FunctionType)
+					continue
+
+				add_member(target, *get_value_properties(value))
+
+	return result
+
+def iter_statements(body: list):
+	"""Yield the statements of body, including the ones inside if, try and with blocks (which are executed when importing)
+	but not the ones inside a if __name__ == "__main__" block.
+	"""
+	for statement in body:
+		if isinstance(statement, ast.If):
+			if is_name_main_condition(statement.test):
+				continue
+
+			yield from iter_statements(statement.body)
+			yield from iter_statements(statement.orelse)
+
+		elif isinstance(statement, ast.Try):
+			yield from iter_statements(statement.body)
+
+			for handler in statement.handlers:
+				yield from iter_statements(handler.body)
+
+			yield from iter_statements(statement.orelse)
+			yield from iter_statements(statement.finalbody)
+
+		elif isinstance(statement, ast.With):
+			yield from iter_statements(statement.body)
+
+		else:
+			yield statement
+
+def iter_assignments(targets: list, value: ast.AST):
+	"""Yield (name, value) for every name assigned, e.g.: a, b = 1, 2 -> (a, 1), (b, 2).
+	"""
+	for target in targets:
+		if isinstance(target, ast.Name):
+			yield target.id, value
+
+		elif isinstance(target, (ast.Tuple, ast.List)):
+			if isinstance(value, (ast.Tuple, ast.List)) and len(value.elts) == len(target.elts):
+				values = value.elts
+			else: # Unpacking something that is not a literal, the values are unknown
+				values = [None] * len(target.elts)
+
+			for element_target, element_value in zip(target.elts, values):
+				yield from iter_assignments((element_target, ), element_value)
+
+def is_name_main_condition(test: ast.AST) -> bool:
+	"""Check if test is __name__ == "__main__" (or "__main__" == __name__).
+	"""
+	if not isinstance(test, ast.Compare) or len(test.ops) != 1 or not isinstance(test.ops[0], ast.Eq):
+		return False
+
+	operands = {ast.unparse(test.left), ast.unparse(test.comparators[0])}
+
+	return operands == {"__name__", "'__main__'"}
+
+def get_value_properties(value: ast.AST):
+	"""Given the node of an assigned value return (properties, type) where type is the type of the value if it's a literal, else None.
+	"""
+	if value is None:
+		return {"type": "expression", "docstring": None, "value": None}, None
+
+	try:
+		object_ = ast.literal_eval(value)
+	except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+		return {"type": "expression", "docstring": None, "value": ast.unparse(value)}, None
+
+	object_type = type(object_).__name__
+
+	return {
+		"type": object_type,
+		"docstring": str(type(object_).__doc__) if object_type not in DATATYPES else None,
+		"value": str(object_) if not isinstance(object_, str) else "'" + object_ +"'"
+	}, type(object_)
+
+def get_node_parameters(arguments: ast.arguments):
+	"""Given the arguments node of a function get all it's parameters (like inspect_object.get_callable_parameters).
+	"""
+	result = {}
+
+	positional = arguments.posonlyargs + arguments.args
+	# Defaults belong to the last positional parameters
+	positional_defaults = [None] * (len(positional) - len(arguments.defaults)) + list(arguments.defaults)
+
+	parameters = [(argument, default, "posonlyargs") for argument, default in zip(arguments.posonlyargs, positional_defaults)]
+	parameters += [(argument, default, "args") for argument, default in zip(arguments.args, positional_defaults[len(arguments.posonlyargs):])]
+
+	if arguments.vararg is not None:
+		parameters.append((arguments.vararg, None, "vararg"))
+
+	parameters += [(argument, default, "kwonlyargs") for argument, default in zip(arguments.kwonlyargs, arguments.kw_defaults)]
+
+	if arguments.kwarg is not None:
+		parameters.append((arguments.kwarg, None, "kwarg"))
+
+	for argument, default, kind in parameters:
+		result[argument.arg] = {
+			"annotation": get_annotation(argument.annotation) if argument.annotation is not None else None,
+			"default": get_default(default) if default is not None else None,
+			"kind": PARAMETER_KINDS[kind]
+		}
+
+	return result
+
+def get_annotation(annotation: ast.AST):
+	"""Return the annotation as inspect_object does, the name of the type or the annotation as written.
+	"""
+	if isinstance(annotation, ast.Constant):
+		return None if annotation.value is None else str(annotation.value)
+
+	if isinstance(annotation, (ast.Name, ast.Attribute)):
+		return get_expression_name(annotation)
+
+	return ast.unparse(annotation)
+
+def get_default(default: ast.AST) -> str:
+	if isinstance(default, ast.Constant):
+		return str(default.value)
+
+	if isinstance(default, (ast.Name, ast.Attribute)):
+		return get_expression_name(default)
+
+	return ast.unparse(default)
+
+def get_expression_name(expression: ast.AST) -> str:
+	"""Return the name of expression as its __name__ would be, e.g.: types.ModuleType -> ModuleType, Generic[T] -> Generic.
+	"""
+	if isinstance(expression, ast.Name):
+		return expression.id
+
+	if isinstance(expression, ast.Attribute):
+		return expression.attr
+
+	if isinstance(expression, (ast.Subscript, ast.Call)):
+		return get_expression_name(expression.value if isinstance(expression, ast.Subscript) else expression.func)
+
+	return ast.unparse(expression)
+
+def get_class_inheritance(node: ast.ClassDef, classes_bases: dict) -> list:
+	"""Return the inheritance of the class (without itself and object) in method resolution order.
+	Classes defined in the same module are linearized using C3 (as Python does), the others are taken as they are.
+	"""
+	def merge(sequences: list) -> list:
+		result = []
+		sequences = [list(sequence) for sequence in sequences if sequence]
+
+		while sequences:
+			for sequence in sequences:
+				head = sequence[0]
+				if not any(head in other[1:] for other in sequences):
+					break
+			else:
+				raise ValueError("Cannot create a consistent method resolution order")
+
+			result.append(head)
+			sequences = [[i for i in sequence if i != head] for sequence in sequences]
+			sequences = [sequence for sequence in sequences if sequence]
+
+		return result
+
+	def linearize(class_name: str, bases: list, seen: tuple=()) -> list:
+		if class_name in seen: # Badly defined hierarchy, avoid infinite loop
+			return [class_name]
+
+		bases_mro = [linearize(base, classes_bases.get(base, []), seen + (class_name, )) for base in bases]
+
+		return [class_name] + merge(bases_mro + [bases])
+
+	bases = [get_expression_name(base) for base in node.bases]
+
+	try:
+		mro = linearize(node.name, bases)[1:]
+	except ValueError:
+		mro = bases
+
+	return [base for base in mro if base != "object"]
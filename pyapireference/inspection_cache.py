@@ -0,0 +1,88 @@
+"""On-disk cache of inspection trees.
+Each tree ({module name: properties}, also for the modules of packages) is stored as a JSON file named after a key made from the hash of the module's source code,
+the Python version and the settings used to inspect it (filter, engine, etc.), so unchanged modules don't need to be inspected again.
+Note: only the module's own file is hashed, if a module it imports changes the cached tree may be outdated (reload ignoring the cache).
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+
+from pyapireference.inspect_object import type_to_string, MAX_DEPTH
+
+# Increase it when the trees generated change, this way trees cached by older versions are not used
+CACHE_VERSION = 2
+
+
+def get_file_hash(path: str) -> str:
+	"""Return the sha256 hex digest of the content of the file at path.
+	"""
+	file_hash = hashlib.sha256()
+
+	with open(path, "rb") as file:
+		for chunk in iter(lambda: file.read(2 ** 16), b""):
+			file_hash.update(chunk)
+
+	return file_hash.hexdigest()
+
+
+def get_inspection_settings(module_name: str, exclude_types: tuple, include_imported_members: bool=False, max_depth: int=MAX_DEPTH, static: bool=False) -> dict:
+	"""Return the settings that change the tree generated for a module (used to create it's cache key).
+	exclude_types can be types or their names (see inspect_object.interpret_type).
+	"""
+	if isinstance(exclude_types, type):
+		exclude_types = (exclude_types, )
+
+	return {
+		"module_name": module_name,
+		"exclude_types": sorted(type_ if isinstance(type_, str) else type_to_string(type_) for type_ in exclude_types),
+		"include_imported_members": include_imported_members,
+		"max_depth": max_depth,
+		"static": static,
+	}
+
+
+class InspectionCache:
+	def __init__(self, directory: str):
+		self.directory = directory
+
+	def get_key(self, path: str, settings: dict) -> str:
+		"""Given the path of a module and the settings used to inspect it (must be JSON serializable) return it's cache key.
+		"""
+		key = {
+			"file_hash": get_file_hash(path),
+			"python_version": sys.version,
+			"cache_version": CACHE_VERSION,
+			"settings": settings,
+		}
+
+		return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+	def get_path(self, key: str) -> str:
+		return os.path.join(self.directory, key[:2], f"{key}.json")
+
+	def get(self, key: str):
+		"""Return the tree stored with key or None if it's not in the cache.
+		"""
+		try:
+			with open(self.get_path(key), "r") as file:
+				return json.load(file)
+		except (OSError, ValueError): # Not cached or a corrupted file
+			return None
+
+	def set(self, key: str, tree: dict) -> None:
+		path = self.get_path(key)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+
+		# Write to a temporary file and then move it, this way other process never read a half written file
+		file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+
+		with os.fdopen(file_descriptor, "w") as file:
+			json.dump(tree, file)
+
+		os.replace(temporary_path, path)
+
+	def clear(self) -> None:
+		shutil.rmtree(self.directory, ignore_errors=True)
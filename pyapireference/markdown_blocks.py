@@ -0,0 +1,49 @@
+"""Split the API reference into the top level blocks of the preview (ui/markdown_previewer.py), without Qt.
+The preview only replaces the blocks that changed since the last update instead of loading the whole page again.
+Example:
+	blocks = markdown_to_blocks(markdown_text) # HTML of each paragraph, list, heading...
+	operations = get_block_operations([hash(block) for block in old_blocks], blocks) # What patchBlocks must change
+"""
+import difflib
+import commonmark
+
+from pyapireference.tree_to_html import write_tree_html_body
+
+
+def markdown_to_blocks(text: str, tree: dict=None) -> list:
+	"""Return the HTML of each top level block of the body.
+	If tree is not None (the tree text was generated from) it's converted straight to HTML instead of parsing text.
+	"""
+	blocks = []
+
+	if tree is not None:
+		fragments = []
+
+		def end_block():
+			blocks.append("".join(fragments))
+			fragments.clear()
+
+		write_tree_html_body(fragments.append, tree, end_block)
+	else:
+		renderer = commonmark.HtmlRenderer()
+		block = commonmark.Parser().parse(text).first_child
+
+		while block is not None:
+			blocks.append(renderer.render(block))
+			block = block.nxt
+
+	return blocks
+
+def get_block_operations(old_hashes: list, blocks: list) -> list:
+	"""Return the operations that turn the blocks with old_hashes (hash of each block) into blocks, 
+	as [start, delete count, [HTML of the new blocks]] sorted from the end so the indexes of the next ones are still valid.
+	"""
+	operations = []
+
+	for tag, old_start, old_end, new_start, new_end in difflib.SequenceMatcher(None, old_hashes, [hash(block) for block in blocks]).get_opcodes():
+		if tag != "equal":
+			operations.append([old_start, old_end - old_start, blocks[new_start:new_end]])
+
+	operations.reverse()
+
+	return operations
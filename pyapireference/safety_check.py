@@ -0,0 +1,154 @@
+"""Check if a module calls its functions (or imported ones) when it is imported, which can be unsafe when inspecting it.
+The module is parsed with ast in a single pass (its code is never run) and the results are cached by the hash of the file.
+"""
+import ast
+import hashlib
+from importlib.util import decode_source
+
+from pyapireference.inspect_source import is_name_main_condition
+
+# The hash of the files already checked and their result
+CHECK_FILE_CACHE = {}
+
+
+class SafetyChecker(ast.NodeVisitor):
+	"""Visit the code executed when a module is imported (not the body of functions nor the if __name__ == "__main__" block)
+	finding the calls to the names defined or imported in the module, or to names assigned from them.
+	"""
+	def __init__(self):
+		self.known_names = set()
+		self.not_safe_lines = set()
+		self.name_main = False
+
+	def visit_FunctionDef(self, node: ast.FunctionDef):
+		# Decorators, defaults and annotations are executed when defining the function, not the body
+		for decorator in node.decorator_list:
+			self.visit(decorator)
+
+		self.visit(node.args)
+
+		if node.returns is not None:
+			self.visit(node.returns)
+
+		self.known_names.add(node.name)
+
+	visit_AsyncFunctionDef = visit_FunctionDef
+
+	def visit_Lambda(self, node: ast.Lambda):
+		self.visit(node.args)
+
+	def visit_ClassDef(self, node: ast.ClassDef):
+		for expression in (*node.decorator_list, *node.bases, *node.keywords):
+			self.visit(expression)
+
+		# The body of a class is executed
+		for statement in node.body:
+			self.visit(statement)
+
+		self.known_names.add(node.name)
+
+	def visit_Import(self, node: ast.Import):
+		for alias in node.names:
+			self.known_names.add(alias.asname if alias.asname is not None else alias.name.split(".")[0])
+
+	def visit_ImportFrom(self, node: ast.ImportFrom):
+		for alias in node.names:
+			if alias.name != "*":
+				self.known_names.add(alias.asname if alias.asname is not None else alias.name)
+
+	def visit_If(self, node: ast.If):
+		if is_name_main_condition(node.test): # Anything inside name main is safe
+			self.name_main = True
+			return
+
+		self.generic_visit(node)
+
+	def visit_Assign(self, node: ast.Assign):
+		self.generic_visit(node)
+
+		# Reassignment (x = test, x = Test(), x = test.attribute), calling x is calling test
+		if node.value is not None and get_root_name(node.value) in self.known_names:
+			for target in (node.targets if isinstance(node, ast.Assign) else (node.target, )):
+				for name_node in ast.walk(target):
+					if isinstance(name_node, ast.Name):
+						self.known_names.add(name_node.id)
+
+	visit_AnnAssign = visit_Assign
+
+	def visit_Call(self, node: ast.Call):
+		if get_root_name(node.func) in self.known_names:
+			self.not_safe_lines.add(node.lineno)
+
+		self.generic_visit(node)
+
+
+def get_root_name(expression: ast.AST) -> str:
+	"""Return the name an expression starts with, e.g.: test -> test, x.y.z -> x, Test().run -> Test, a[0]() -> a.
+	None if it doesn't start with a name.
+	"""
+	while isinstance(expression, (ast.Attribute, ast.Call, ast.Subscript)):
+		expression = expression.func if isinstance(expression, ast.Call) else expression.value
+
+	return expression.id if isinstance(expression, ast.Name) else None
+
+def check_source(source: bytes):
+	"""Same as check_file but given the source code of the module.
+	"""
+	try:
+		module_node = ast.parse(source)
+	except (SyntaxError, ValueError): # Importing it will fail and show the error
+		return [], False
+
+	safety_checker = SafetyChecker()
+	safety_checker.visit(module_node)
+
+	lines = decode_source(source).splitlines()
+
+	return [(index, lines[index - 1]) for index in sorted(safety_checker.not_safe_lines)], safety_checker.name_main
+
+def check_file(path: str):
+	"""Return (not_safe_lines, name_main), not_safe_lines is a list of (line number, line) with the calls executed
+	when importing the module and name_main if the module has an if __name__ == "__main__" condition.
+	Non-Safe Test Cases (add more as you think of some)
+	normal call:
+		test()
+
+	inside loop
+		for...
+			test()
+	reassignment:
+		x = test
+		x()
+
+	nested reassignment:
+		x = test
+		y = x
+		y()
+
+	classes:
+		class Test:
+			def test(self)
+				...
+
+		t = Test()
+		t.run()
+
+	Imports:
+		from file import test
+		test()
+
+		Normal Import:
+			import test
+			test.run()
+	"""
+	with open(path, "rb") as file:
+		source = file.read()
+
+	file_hash = hashlib.sha256(source).hexdigest()
+
+	if file_hash not in CHECK_FILE_CACHE:
+		CHECK_FILE_CACHE[file_hash] = check_source(source)
+
+	not_safe_lines, name_main = CHECK_FILE_CACHE[file_hash]
+
+	return list(not_safe_lines), name_main
@@ -0,0 +1,402 @@
+"""Inspect a module in a child interpreter, so a module that loops forever, allocates too much memory, calls sys.exit or crashes
+only stops the child and not the application.
+The parent sends the inspection settings as JSON through stdin and the child writes the inspection events (see inspect_object.iter_object_events)
+as JSON lines (see export.JSONLinesWriter) through stdout, anything the module prints goes to stderr.
+Run by iter_sandboxed_events as:
+	python -m pyapireference.sandbox
+Or by InspectionServer as a long-lived server (only where os.fork exists) that keeps the dependencies of the inspected modules imported
+and forks a child for each request, so inspecting a module again only imports the module itself:
+	python -m pyapireference.sandbox --server
+"""
+import os
+import sys
+import ast
+import time
+import json
+import atexit
+import signal
+import tempfile
+import importlib
+import threading
+import traceback
+import subprocess
+from importlib.util import find_spec
+
+try:
+	import resource # Only available on Unix
+except ImportError:
+	resource = None
+
+from pyapireference.inspect_object import iter_object_events, get_module_from_path, interpret_type, InspectEvents, InspectionCancelled, MAX_DEPTH
+from pyapireference.inspect_source import iter_statements
+from pyapireference.export import JSONLinesWriter
+
+# Directory that must be in sys.path to import pyapireference in the child
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# When frozen (e.g.: PyInstaller) sys.executable is the application, not a Python interpreter
+SANDBOX_AVAILABLE = not getattr(sys, "frozen", False)
+SERVER_AVAILABLE = SANDBOX_AVAILABLE and hasattr(os, "fork")
+# Seconds between the checks of the watchdog (see watch_child), the maximum time cancelling an inspection takes
+WATCHDOG_INTERVAL = 0.02
+
+
+class SandboxError(Exception):
+	"""The module could not be inspected in the child, the message is the traceback or the reason the child stopped.
+	"""
+
+
+class InspectionServer:
+	"""Client of the inspection server (python -m pyapireference.sandbox --server), started when the first module is inspected.
+	The server imports the dependencies of each module (except the modules in the same directory, they may be edited) before forking the child that inspects it,
+	the next children are forked with them already imported.
+	Protocol, for each request (a JSON line with the same keys iter_sandboxed_events sends) the server writes:
+		{"pid": pid of the child}
+		the events or an {"error": ...} line (written by the child)
+		{"end": exit code of the child}
+	"""
+	def __init__(self):
+		self.process = None
+		self.lock = threading.Lock()
+
+		atexit.register(self.stop)
+
+	def start(self) -> None:
+		environment = dict(os.environ)
+		environment["PYTHONPATH"] = os.pathsep.join(filter(None, (PACKAGE_ROOT, environment.get("PYTHONPATH"))))
+
+		self.process = subprocess.Popen(
+			[sys.executable, "-m", "pyapireference.sandbox", "--server"],
+			stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+			encoding="utf-8", env=environment
+		)
+
+	def stop(self) -> None:
+		"""Stop the server, the dependencies will be imported again by the next one (e.g.: after updating them).
+		"""
+		# Also called by read_line when the server stops, which may happen (at exit) while atexit calls it
+		process, self.process = self.process, None
+
+		if process is None:
+			return
+
+		if process.poll() is None:
+			process.kill()
+			process.wait()
+
+		process.stdin.close()
+		process.stdout.close()
+
+	def read_line(self) -> dict:
+		line = self.process.stdout.readline()
+
+		if line == "": # Means the server stopped
+			self.stop()
+			raise SandboxError("The inspection server stopped unexpectedly.")
+
+		return json.loads(line)
+
+	def iter_events(self, path: str, exclude_types: tuple=("types.ModuleType", ), include_imported_members: bool=False, max_depth: int=MAX_DEPTH, timeout: float=0, memory_limit: int=0, cancel_event: threading.Event=None):
+		"""Same as iter_sandboxed_events but inspecting the module in a child of the server.
+		"""
+		request = {
+			"path": os.path.abspath(path),
+			"exclude_types": list(exclude_types),
+			"include_imported_members": include_imported_members,
+			"max_depth": max_depth,
+			"memory_limit": memory_limit,
+		}
+
+		with self.lock:
+			if self.process is None or self.process.poll() is not None:
+				self.start()
+
+			process = self.process
+			child_pid = None
+
+			def stop_child():
+				if child_pid is None: # The server is still importing the dependencies
+					process.kill()
+				else:
+					kill_process(child_pid)
+
+			finished, timed_out = watch_child(stop_child, timeout, cancel_event)
+			tree_events = TreeEvents()
+			returncode = None
+			error = None
+
+			try:
+				self.process.stdin.write(json.dumps(request) + "\n")
+				self.process.stdin.flush()
+
+				child_pid = self.read_line()["pid"]
+
+				while returncode is None:
+					data = self.read_line()
+
+					if "end" in data:
+						returncode = data["end"]
+					elif "error" in data: # Keep reading until the end so the next request starts in the right line
+						error = data["error"]
+					elif error is None:
+						yield tree_events.add(data)
+			except SandboxError: # The server was killed by the watchdog
+				if not (timed_out.is_set() or is_cancelled(cancel_event)):
+					raise
+			finally:
+				finished.set()
+
+				if returncode is None and child_pid is not None and self.process is not None: # The events were not consumed until the end
+					kill_process(child_pid)
+
+					while "end" not in self.read_line():
+						pass
+
+		if is_cancelled(cancel_event):
+			raise InspectionCancelled()
+
+		if timed_out.is_set():
+			raise SandboxError(f"The inspection took more than {timeout} seconds, the worker was stopped (you can change the timeout on settings).")
+
+		if error is not None:
+			raise SandboxError(error)
+
+		if returncode != 0 or not tree_events.complete:
+			raise SandboxError(f"The worker stopped unexpectedly (exit code {returncode}).")
+
+
+class TreeEvents:
+	"""Convert the events received from the child and keep whether the whole tree was received,
+	the child may stop (e.g.: os._exit(0)) before writing it without an error.
+	"""
+	def __init__(self):
+		self.depth = 0
+		self.complete = False
+
+	def add(self, data: dict) -> tuple:
+		event = InspectEvents(data["event"])
+
+		if event == InspectEvents.ENTER_OBJECT:
+			self.depth += 1
+		elif event == InspectEvents.LEAVE_OBJECT:
+			self.depth -= 1
+			self.complete = self.depth == 0
+
+		return event, data["name"], data["value"]
+
+
+def kill_process(pid: int) -> None:
+	try:
+		os.kill(pid, signal.SIGKILL)
+	except ProcessLookupError: # Already finished
+		pass
+
+def is_cancelled(cancel_event: threading.Event) -> bool:
+	return cancel_event is not None and cancel_event.is_set()
+
+def watch_child(stop_child: callable, timeout: float=0, cancel_event: threading.Event=None):
+	"""Call stop_child from another thread when the child takes longer than timeout seconds (0 means no limit) or cancel_event is set,
+	so the child is stopped even while the parent is blocked reading it.
+	Return (finished, timed_out), set finished when the child ends to stop watching, timed_out is set if the child was stopped because of the timeout.
+	"""
+	finished = threading.Event()
+	timed_out = threading.Event()
+
+	if timeout <= 0 and cancel_event is None:
+		return finished, timed_out
+
+	deadline = time.monotonic() + timeout if timeout > 0 else None
+
+	def watch():
+		while not finished.wait(WATCHDOG_INTERVAL):
+			if is_cancelled(cancel_event):
+				stop_child()
+				return
+
+			if deadline is not None and time.monotonic() > deadline:
+				timed_out.set()
+				stop_child()
+				return
+
+	threading.Thread(target=watch, daemon=True).start()
+
+	return finished, timed_out
+
+def iter_sandboxed_events(path: str, exclude_types: tuple=("types.ModuleType", ), include_imported_members: bool=False, max_depth: int=MAX_DEPTH, timeout: float=0, memory_limit: int=0, cancel_event: threading.Event=None, module_name: str=None, root: str=None):
+	"""Inspect the module at path in a child interpreter yielding the events while they are received.
+	exclude_types are the names of the types (see inspect_object.interpret_type).
+	timeout is the maximum number of seconds the child can take and memory_limit the maximum megabytes of memory it can use (only on Unix), 0 means no limit.
+	A module of a package is imported by it's dotted module_name with root in sys.path (see inspect_package.find_package_modules), so it's relative imports work.
+	Setting cancel_event (from another thread) stops the child and raises InspectionCancelled.
+	Raises SandboxError if the module cannot be loaded, raises an exception while inspected, the child takes longer than timeout or stops unexpectedly.
+	"""
+	request = {
+		"path": os.path.abspath(path),
+		"exclude_types": list(exclude_types),
+		"include_imported_members": include_imported_members,
+		"max_depth": max_depth,
+		"memory_limit": memory_limit,
+		"module_name": module_name,
+		"root": root,
+	}
+
+	environment = dict(os.environ)
+	environment["PYTHONPATH"] = os.pathsep.join(filter(None, (PACKAGE_ROOT, environment.get("PYTHONPATH"))))
+
+	# stderr goes to a file because nobody reads it while the child runs, a pipe could fill and block the child
+	with tempfile.TemporaryFile("w+", encoding="utf-8", errors="replace") as stderr_file:
+		process = subprocess.Popen(
+			[sys.executable, "-m", "pyapireference.sandbox"],
+			stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr_file,
+			encoding="utf-8", env=environment
+		)
+		finished, timed_out = watch_child(process.kill, timeout, cancel_event)
+		tree_events = TreeEvents()
+
+		try:
+			process.stdin.write(json.dumps(request))
+			process.stdin.close()
+
+			for line in process.stdout:
+				data = json.loads(line)
+
+				if "error" in data:
+					raise SandboxError(data["error"])
+
+				yield tree_events.add(data)
+
+			process.wait()
+		finally:
+			finished.set()
+
+			if process.poll() is None: # The events were not consumed until the end
+				process.kill()
+				process.wait()
+
+			process.stdout.close()
+
+		if is_cancelled(cancel_event):
+			raise InspectionCancelled()
+
+		if timed_out.is_set():
+			raise SandboxError(f"The inspection took more than {timeout} seconds, the worker was stopped (you can change the timeout on settings).")
+
+		if process.returncode != 0 or not tree_events.complete: # os._exit(0) stops the child without an error
+			stderr_file.seek(0)
+			raise SandboxError(f"The worker stopped unexpectedly (exit code {process.returncode}).\n{stderr_file.read()[-2000:]}")
+
+def preload_imports(path: str) -> None:
+	"""Import the modules imported by the module at path (the top-level imports, not relative ones)
+	except the ones in the same directory, which may be edited between inspections.
+	"""
+	try:
+		with open(path, "rb") as file:
+			module_node = ast.parse(file.read())
+	except (OSError, SyntaxError, ValueError): # The child will report it
+		return
+
+	directory = os.path.dirname(os.path.abspath(path))
+
+	for statement in iter_statements(module_node.body):
+		if isinstance(statement, ast.Import):
+			module_names = [alias.name for alias in statement.names]
+		elif isinstance(statement, ast.ImportFrom) and statement.level == 0 and statement.module is not None:
+			module_names = [statement.module]
+		else:
+			continue
+
+		for module_name in module_names:
+			if module_name in sys.modules:
+				continue
+
+			try:
+				spec = find_spec(module_name.split(".")[0])
+
+				if spec is None or (spec.has_location and os.path.abspath(spec.origin).startswith(directory + os.sep)):
+					continue
+
+				importlib.import_module(module_name)
+			except BaseException: # A dependency that cannot be imported is imported (and reported) by the child
+				continue
+
+def serve(events_file) -> int:
+	"""Read requests (JSON lines) from stdin and inspect each one in a forked child, see InspectionServer.
+	"""
+	for line in sys.stdin:
+		request = json.loads(line)
+		preload_imports(request["path"])
+
+		# The child waits until the server writes it's pid, so it's the first line of the response
+		read_fd, write_fd = os.pipe()
+		child_pid = os.fork()
+
+		if child_pid == 0: # Child
+			os.close(write_fd)
+			os.read(read_fd, 1)
+			os.close(read_fd)
+
+			returncode = 1
+
+			try:
+				returncode = run_request(request, events_file)
+			finally:
+				os._exit(returncode)
+
+		os.close(read_fd)
+		events_file.write(json.dumps({"pid": child_pid}) + "\n")
+		events_file.flush()
+		os.write(write_fd, b"1")
+		os.close(write_fd)
+
+		_, status = os.waitpid(child_pid, 0)
+		events_file.write(json.dumps({"end": os.waitstatus_to_exitcode(status)}) + "\n")
+		events_file.flush()
+
+	return 0
+
+def run_request(request: dict, events_file) -> int:
+	"""Inspect the module of request writing the events into events_file, return the exit code.
+	"""
+	json_lines_writer = JSONLinesWriter(events_file)
+
+	if request["memory_limit"] > 0 and resource is not None:
+		memory_limit = request["memory_limit"] * 1024 ** 2
+		resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+	try:
+		if request.get("module_name") is not None: # A module of a package
+			sys.path.insert(0, request["root"])
+			module = importlib.import_module(request["module_name"])
+		else:
+			module, error = get_module_from_path(request["path"])
+
+			if module is None: # Means exception
+				raise SandboxError(error)
+
+		exclude_types = tuple(interpret_type(type_) for type_ in request["exclude_types"])
+
+		for event in iter_object_events(module, exclude_types=exclude_types, include_imported_members=request["include_imported_members"], max_depth=request["max_depth"]):
+			json_lines_writer.handle_event(*event)
+
+	except BaseException as error: # Including SystemExit and KeyboardInterrupt raised by the module
+		events_file.write(json.dumps({"error": str(error) if isinstance(error, SandboxError) else traceback.format_exc()}) + "\n")
+		return 1
+
+	finally:
+		events_file.flush()
+
+	return 0
+
+def main(argv: list=None) -> int:
+	argv = sys.argv[1:] if argv is None else argv
+
+	# Keep stdout for the events, anything the modules print (even from C code) goes to stderr
+	events_file = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+	os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+	if "--server" in argv:
+		return serve(events_file)
+
+	return run_request(json.load(sys.stdin), events_file)
+
+if __name__ == "__main__":
+	sys.exit(main())
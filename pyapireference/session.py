@@ -0,0 +1,165 @@
+"""Session state (the Markdown being edited, the tree of the module and the state of it's rows) stored in a SQLite database,
+separated from the settings so the prefs file stays small.
+Values are kept in memory and written by a background thread once they stop changing during COMMIT_DELAY seconds,
+so editing a big API reference never waits for the disk. SQLite's write-ahead log is compacted every COMPACT_INTERVAL commits.
+Example:
+	session = SessionStore("Prefs/session.sqlite")
+	session.set("current_markdown", "# example")
+	session.get("current_markdown") # "# example"
+	session.close() # Writes the pending values
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+
+COMMIT_DELAY = 1 # Seconds without changes before writing them
+COMPACT_INTERVAL = 20 # Commits between compactions
+
+
+class SessionStore:
+	def __init__(self, path: str):
+		self.path = path
+		self.values = {}
+		self.pending = {} # Values set since the last commit
+		self.last_change = 0
+		self.flushing = False
+		self.closing = False
+		self.writing = False
+		self.commits = 0
+		self.attempts = 0 # Commits started, successful or not
+		self.failed_attempt = 0 # The last commit that failed
+		self.condition = threading.Condition()
+
+		os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+		try:
+			self.connection = self.connect()
+		except sqlite3.DatabaseError: # A corrupted file, start a new session
+			self.values = {}
+			os.remove(path)
+			self.connection = self.connect()
+
+		self.thread = threading.Thread(target=self.write_values, name="SessionStore", daemon=True)
+		self.thread.start()
+
+	def connect(self) -> sqlite3.Connection:
+		"""Open the database (only used by the writer thread after this) and read the stored values.
+		"""
+		connection = sqlite3.connect(self.path, check_same_thread=False)
+
+		try:
+			connection.execute("PRAGMA auto_vacuum = INCREMENTAL") # Only applies to new databases, before creating the table
+			connection.execute("PRAGMA journal_mode = WAL") # Commits append to the log instead of rewriting the database
+			connection.execute("CREATE TABLE IF NOT EXISTS session (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+			for key, value in connection.execute("SELECT key, value FROM session"):
+				try:
+					self.values[key] = json.loads(value)
+				except ValueError: # A corrupted value, it's default is used
+					pass
+		except sqlite3.DatabaseError:
+			connection.close()
+			raise
+
+		return connection
+
+	def get(self, key: str, default: any=None) -> any:
+		return self.values.get(key, default)
+
+	def set(self, key: str, value: any) -> None:
+		"""Store value (must be JSON serializable and not modified after this) in memory, it's written later in the background.
+		"""
+		self.values[key] = value
+
+		with self.condition:
+			self.pending[key] = value
+			self.last_change = time.monotonic()
+			self.condition.notify()
+
+	def flush(self) -> None:
+		"""Write the pending values now and wait until they are written, or until a commit started after calling it fails
+		(they are still pending, written by the next flush or after COMMIT_DELAY seconds).
+		"""
+		with self.condition:
+			self.flushing = True
+			self.condition.notify()
+			attempts = self.attempts
+
+			while (self.pending or self.writing) and self.failed_attempt <= attempts:
+				self.condition.wait()
+
+			self.flushing = False
+
+	def close(self) -> None:
+		self.flush()
+
+		with self.condition:
+			self.closing = True
+			self.condition.notify()
+
+		self.thread.join()
+		self.connection.close()
+
+	def write_values(self) -> None:
+		"""Writer thread, commits the pending values once they stop changing during COMMIT_DELAY seconds (or when flushing).
+		If the commit fails the values stay pending (unless they were set again meanwhile) and it's tried again after COMMIT_DELAY seconds,
+		when closing it's only tried once more.
+		"""
+		while True:
+			with self.condition:
+				while not self.pending and not self.closing:
+					self.condition.wait()
+
+				while self.pending and not self.flushing and not self.closing:
+					remaining = self.last_change + COMMIT_DELAY - time.monotonic()
+
+					if remaining <= 0:
+						break
+
+					self.condition.wait(remaining)
+
+				if not self.pending: # Means it's closing
+					return
+
+				pending, self.pending = self.pending, {}
+				self.writing = True
+				self.attempts += 1
+				attempt = self.attempts
+
+			try:
+				self.commit(pending)
+				failed = False
+			except sqlite3.Error as error:
+				print(f"Couldn't save the session: {error}")
+				failed = True
+
+			with self.condition:
+				if failed:
+					self.failed_attempt = attempt
+					self.flushing = False # The flush waiting for it returns, don't try again until COMMIT_DELAY
+
+					if not self.closing:
+						self.pending = {**pending, **self.pending} # The values set while writing are newer
+						self.last_change = time.monotonic()
+
+				self.writing = False
+				self.condition.notify_all()
+
+	def commit(self, values: dict) -> None:
+		rows = [(key, json.dumps(value)) for key, value in values.items()]
+
+		with self.connection:
+			self.connection.executemany("INSERT OR REPLACE INTO session (key, value) VALUES (?, ?)", rows)
+
+		self.commits += 1
+
+		if self.commits % COMPACT_INTERVAL == 0:
+			self.compact()
+
+	def compact(self) -> None:
+		"""Free the pages left by previous values and move the write-ahead log into the database, truncating it.
+		"""
+		self.connection.execute("PRAGMA incremental_vacuum").fetchall() # Frees a page each step, the changes go to the log
+		self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
@@ -0,0 +1,144 @@
+"""Convert inspection trees straight to HTML, without converting them to Markdown and parsing it (see tree_to_markdown).
+The document is the same as the Markdown one with the GitHub style (ui/github_markdown_style.py) and an anchor with the qualified name of each object
+(e.g.: <h4 id="example.Person.__init__">), docstrings are paragraphs of plain text instead of Markdown.
+Example:
+	convert_tree_to_html(inspect_object(example)) # As a string
+
+	with open("example.html", "w") as file:
+		write_tree_html(inspect_object(example), file)
+"""
+import re
+from html import escape
+
+from pyapireference.tree_to_markdown import parameter_to_text
+from pyapireference.ui.github_markdown_style import GITHUB_MARKDOWN_STYLE
+
+FOOTER = "<hr>\n<p><em>Created using <strong>PyAPIReference</strong>.</em></p>\n"
+BLANK_LINES = re.compile(r"\n\s*\n") # Separate the paragraphs of a docstring
+
+
+def docstring_to_html(docstring: str) -> str:
+	return "".join(f"<p>{escape(paragraph.strip())}</p>\n" for paragraph in BLANK_LINES.split(docstring.strip()) if paragraph.strip())
+
+def parameters_to_html(parameters: dict) -> str:
+	if len(parameters) == 0:
+		return ""
+
+	items = "".join(f"<li><code>{escape(parameter_to_text(parameter_name, parameter_props))}</code></li>\n" for parameter_name, parameter_props in parameters.items())
+
+	return f"<h4>Parameters</h4>\n<ul>\n{items}</ul>\n"
+
+def member_heading_to_html(level: int, qualified_name: str, member_name: str, title: str, member_props: dict) -> str:
+	"""Return the heading of a member with it's anchor and it's docstring (or the member it's the same as).
+	"""
+	if "value" in member_props: # Means it's a variable so the docstring would be a description of the variable type
+		level = 4
+		title += f" = {member_props['value']}"
+		docstring_html = f"<p>{escape(member_name)} has no description.</p>\n"
+	elif "reference" in member_props: # Means it was already inspected with other name
+		docstring_html = f"<p>Same as <code>{escape(member_props['reference'].replace('/', '.'))}</code>.</p>\n"
+	elif member_props["docstring"] is not None:
+		docstring_html = docstring_to_html(member_props["docstring"])
+	else:
+		docstring_html = f"<p>{escape(member_name)} has no description.</p>\n"
+
+	return f'<h{level} id="{escape(qualified_name)}"><code>{escape(title)}</code></h{level}>\n{docstring_html}'
+
+def write_class_html(write: callable, qualified_name: str, class_name: str, class_dict: dict) -> None:
+	if "inherits" in class_dict and len(class_dict["inherits"]) > 0:
+		write(f"<p>Inherits: <code>{escape(', '.join(class_dict['inherits']))}</code>.</p>\n")
+
+	for member_name, member_props in class_dict.get("content", {}).items():
+		member_type = "method" if member_props["type"] == "function" else member_props["type"]
+		member_qualified_name = f"{qualified_name}.{member_name}"
+
+		write(member_heading_to_html(4, member_qualified_name, member_name, f"{class_name}.{member_name} ({member_type})", member_props))
+
+		if "parameters" in member_props:
+			write(parameters_to_html(member_props["parameters"]))
+		elif member_type == "class":
+			write_class_html(write, member_qualified_name, member_name, member_props)
+
+	if class_dict.get("truncated"): # Means it was nested deeper than the maximum depth
+		write(f"<p><em><code>{escape(class_name)}</code> members were not inspected (maximum depth reached).</em></p>\n")
+
+def write_content_html(write: callable, qualified_name: str, content: dict, end_block: callable=None) -> None:
+	for member_name, member_props in content.items():
+		member_type = member_props["type"]
+		member_qualified_name = f"{qualified_name}.{member_name}"
+
+		write(member_heading_to_html(3, member_qualified_name, member_name, f"{member_name} ({member_type})", member_props))
+
+		if "parameters" in member_props:
+			write(parameters_to_html(member_props["parameters"]))
+		elif member_type == "class" or member_type == "wrappertype":
+			write_class_html(write, member_qualified_name, member_name, member_props)
+
+		if end_block is not None:
+			end_block()
+
+def write_submodule_html(write: callable, qualified_name: str, submodule_name: str, submodule_props: dict, end_block: callable=None) -> None:
+	"""Given a module of a package tree (see inspect_package.py) write it's section.
+	"""
+	submodule_qualified_name = f"{qualified_name}.{submodule_name}"
+	docstring = submodule_props["docstring"]
+
+	write(f'<h2 id="{escape(submodule_qualified_name)}"><code>{escape(submodule_name)}</code></h2>\n')
+
+	if "error" in submodule_props: # Means it could not be inspected
+		write(f"<p><em><code>{escape(submodule_name)}</code> could not be inspected:</em></p>\n<pre><code>{escape(submodule_props['error'].strip())}</code></pre>\n")
+	else:
+		write(docstring_to_html(docstring) if docstring is not None else f"<p>{escape(submodule_name)} has no docstring.</p>\n")
+
+	if end_block is not None:
+		end_block()
+
+	if "content" in submodule_props:
+		write_content_html(write, submodule_qualified_name, submodule_props["content"], end_block)
+
+def write_tree_html_body(write: callable, tree: dict, end_block: callable=None) -> None:
+	"""Pass the HTML of the body of the document to write in fragments (e.g.: file.write, list.append).
+	If end_block is given it's called at the end of each top level block: the heading and docstring of the module (or submodule), each member of it and the footer
+	(used by markdown_blocks so the preview only updates the blocks that changed).
+	"""
+	module_name = tuple(tree)[0]
+	module_content = tree[module_name]
+
+	write(f'<h2 id="{escape(module_name)}">{escape(module_name)}</h2>\n')
+
+	for property_name, property_val in module_content.items():
+		if isinstance(property_val, dict) and module_content["type"] == "package": # Means the content are the modules of the package
+			for submodule_name, submodule_props in property_val.items():
+				write_submodule_html(write, module_name, submodule_name, submodule_props, end_block)
+
+		elif isinstance(property_val, dict):
+			write_content_html(write, module_name, property_val, end_block)
+
+		elif property_name == "docstring":
+			write(docstring_to_html(property_val) if property_val is not None else f"<p>{escape(module_name)} has no docstring.</p>\n")
+
+			if end_block is not None:
+				end_block()
+
+	write(FOOTER)
+
+	if end_block is not None:
+		end_block()
+
+def write_html_document(write: callable, tree: dict) -> None:
+	write(f'<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>{escape(tuple(tree)[0])}</title>\n<style>{GITHUB_MARKDOWN_STYLE}</style>\n</head>\n<body>\n')
+	write_tree_html_body(write, tree)
+	write("</body>\n</html>\n")
+
+def write_tree_html(tree: dict, file) -> None:
+	"""Write the HTML document of a tree generated by inspect_object into file (an opened text file or anything with a write method).
+	"""
+	write_html_document(file.write, tree)
+
+def convert_tree_to_html(tree: dict) -> str:
+	"""Same as write_tree_html but returning the HTML.
+	"""
+	fragments = []
+	write_html_document(fragments.append, tree)
+
+	return "".join(fragments)
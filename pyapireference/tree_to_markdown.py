@@ -1,113 +1,318 @@
+"""Convert inspection trees to Markdown.
+The Markdown is written in fragments with a MarkdownStream (into a list or straight into a file), so the time is linear in the size of the document.
+Example:
+	convert_tree_to_markdown(inspect_object(example)) # As a string
+
+	with open("example.md", "w") as file:
+		write_tree_markdown(inspect_object(example), file)
+"""
+from pyapireference.inspect_object import InspectEvents, TreeBuilder
+
 BACKSLASH = "\\"
-def convert_tree_to_markdown(tree: dict):
-	def parameters_to_markdown(parameters: dict):
-		empty = True
-		markdown_text = "#### Parameters\n"
-		
-		for parameter_name, parameter_props in parameters.items():
-			empty = False
+FOOTER = "***\n_Created using **PyAPIReference**._" # https://patitotective.github.io/PyAPIReference/
 
-			parameter_text = f"`{parameter_name}"
+def parameter_to_text(parameter_name: str, parameter_props: dict) -> str:
+	"""Return the name of a parameter with it's annotation and default value, e.g.: "age (int=0)".
+	"""
+	if parameter_props["annotation"] is not None and parameter_props["default"] is not None:
+		return f"{parameter_name} ({parameter_props['annotation']}={parameter_props['default']})"
+	elif parameter_props["annotation"] is not None:
+		return f"{parameter_name} ({parameter_props['annotation']})"
+	elif parameter_props["default"] is not None:
+		return f"{parameter_name}={parameter_props['default']}"
 
-			if parameter_props["annotation"] is not None and parameter_props["default"] is not None:
-				parameter_text += f" ({parameter_props['annotation']}={parameter_props['default']})`"
-			elif parameter_props["annotation"] is not None and parameter_props["default"] is None:
-				parameter_text += f" ({parameter_props['annotation']})`"
+	return parameter_name
 
-			elif parameter_props["default"] is not None:
-				parameter_text += f"={parameter_props['default']}`"
-			else:
-				parameter_text += "`"
+def parameters_to_markdown(parameters: dict):
+	empty = True
+	markdown_text = "#### Parameters\n"
+	
+	for parameter_name, parameter_props in parameters.items():
+		empty = False
+		markdown_text += f"- `{parameter_to_text(parameter_name, parameter_props)}`\n"
 
-			markdown_text += f"- {parameter_text}\n"
+	return markdown_text if not empty else None
 
-		return markdown_text if not empty else None
+class MarkdownStream:
+	"""Pass the Markdown fragments to write (e.g.: file.write, list.append) as they are generated.
+	The last fragment is kept until something else is written, so a section can end as if it was stripped (see end_section)
+	without building it as a string.
+	"""
+	def __init__(self, write: callable):
+		self.write_function = write
+		self.last = "" # Last fragment written, with the whitespace written after it
+		self.fragments = 0 # Fragments written with something other than whitespace
 
-	def class_to_markdown(class_name: str, class_dict: dict):
-		def class_content_to_markdown(content: dict):
-			markdown_text = ""
+	def write(self, text: str) -> None:
+		if not text or text.isspace():
+			self.last += text
+			return
 
-			for member_name, member_props in content.items():
-				member_type = member_props["type"]
-				member_docstring = member_props["docstring"]
+		self.write_function(self.last)
+		self.last = text
+		self.fragments += 1
 
-				if member_type == "function":
-					member_type = "method"
+	def start_section(self) -> tuple:
+		return self.fragments, len(self.last)
 
-				if "value" in member_props: # Means it's a variable so the docstring will be a description of the variable type
-					member_docstring = None
-					markdown_text += f"#### `{class_name}.{member_name} ({member_type}) = {member_props['value']}`\n"
-				else:
-					markdown_text += f"#### `{class_name}.{member_name} ({member_type})`\n"
-				
-				markdown_text += f"{member_docstring if member_docstring is not None else f'{member_name} has no description.'}".strip() + "\n\n"
+	def end_section(self, start: tuple, end: str, empty_end: str=None) -> None:
+		"""End the text written since start_section returned start as section_text.strip() + end, 
+		or with empty_end instead of end if the section is empty (start_section must be called after writing the text before it).
+		"""
+		fragments, last_length = start
 
-				if "parameters" in member_props:
-					parameter_text = parameters_to_markdown(member_props["parameters"])
-					markdown_text += parameter_text.strip() + "\n\n" if parameter_text is not None else "" 
+		if self.fragments > fragments:
+			self.last = self.last.rstrip() + end
+		else:
+			self.last = self.last[:last_length] + (end if empty_end is None else empty_end)
 
-				elif member_type == "class":
-					class_text = class_to_markdown(member_name, member_props)					
-					markdown_text += class_text.strip() + "\n\n" if class_text is not None else "" 
+	def close(self) -> None:
+		self.write_function(self.last)
+		self.last = ""
 
-			return markdown_text
 
-		markdown_text = ""
+def write_class_member_markdown(stream: MarkdownStream, class_name: str, member_name: str, member_props: dict, cache=None) -> None:
+	member_type = member_props["type"]
+	member_docstring = member_props["docstring"]
 
-		if "inherits" in class_dict and len(class_dict["inherits"]) > 0:
-			markdown_text += f"Inherits: `{', '.join(class_dict['inherits'])}`.\n"
+	if member_type == "function":
+		member_type = "method"
 
-		markdown_text += class_content_to_markdown(class_dict["content"]) if "content" in class_dict else ""
+	if "reference" in member_props: # Means it was already inspected with other name
+		member_docstring = f"Same as `{member_props['reference'].replace('/', '.')}`."
 
-		return markdown_text
+	if "value" in member_props: # Means it's a variable so the docstring will be a description of the variable type
+		member_docstring = None
+		markdown_text = f"#### `{class_name}.{member_name} ({member_type}) = {member_props['value']}`\n"
+	else:
+		markdown_text = f"#### `{class_name}.{member_name} ({member_type})`\n"
+	
+	markdown_text += f"{member_docstring if member_docstring is not None else f'{member_name} has no description.'}".strip() + "\n\n"
 
-	def content_to_markdown(content: dict) -> str:
-		"""
-		Parameters:
-			change_members_type (dict={}): You can pass a dictionary with the key being the type to change for the value.
-		Example:
-			change_members_type={"function": "method"}
-		"""
-		markdown_text = ""
+	if "parameters" in member_props:
+		parameter_text = parameters_to_markdown(member_props["parameters"])
+		markdown_text += parameter_text.strip() + "\n\n" if parameter_text is not None else ""
+
+	stream.write(markdown_text) # The member's own text is small, only the classes are written in fragments
+
+	if "parameters" not in member_props and member_type == "class":
+		class_section = stream.start_section()
+		write_class_markdown(stream, member_name, member_props, cache)
+		stream.end_section(class_section, "\n\n")
+
+def write_class_markdown(stream: MarkdownStream, class_name: str, class_dict: dict, cache=None) -> None:
+	if "inherits" in class_dict and len(class_dict["inherits"]) > 0:
+		stream.write(f"Inherits: `{', '.join(class_dict['inherits'])}`.\n")
+
+	for member_name, member_props in class_dict.get("content", {}).items():
+		if cache is None:
+			write_class_member_markdown(stream, class_name, member_name, member_props)
+		else:
+			stream.write(cache.get_fragment(member_props, (class_name, member_name), write_class_member_markdown))
+
+	if class_dict.get("truncated"): # Means it was nested deeper than the maximum depth
+		stream.write(f"_`{class_name}` members were not inspected (maximum depth reached)._\n")
+
+def write_member_markdown(stream: MarkdownStream, member_name: str, member_props: dict, cache=None) -> None:
+	member_type = member_props["type"]
+	member_docstring = member_props["docstring"]
+
+	if "reference" in member_props: # Means it was already inspected with other name
+		member_docstring = f"Same as `{member_props['reference'].replace('/', '.')}`."
 
-		for member_name, member_props in content.items():
-			member_type = member_props["type"]
-			member_docstring = member_props["docstring"]
+	if "value" in member_props: # Means it's a variable so the docstring will be a description of the variable type
+		member_docstring = None			
+		markdown_text = f"#### `{member_name} ({member_type}) = {member_props['value']}`\n"
+	else:
+		markdown_text = f"### `{member_name} ({member_type})`\n"
+	
+	markdown_text += f"{member_docstring if member_docstring is not None else f'{member_name} has no description.'}".strip() + "\n\n"
 
-			if "value" in member_props: # Means it's a variable so the docstring will be a description of the variable type
-				member_docstring = None			
-				markdown_text += f"#### `{member_name} ({member_type}) = {member_props['value']}`\n"
-			else:
-				markdown_text += f"### `{member_name} ({member_type})`\n"
-			
-			markdown_text += f"{member_docstring if member_docstring is not None else f'{member_name} has no description.'}".strip() + "\n\n"
+	if "parameters" in member_props:
+		parameter_text = parameters_to_markdown(member_props["parameters"])
+		markdown_text += parameter_text.strip() + "\n\n" if parameter_text is not None else ""
 
-			if "parameters" in member_props:
-				parameter_text = parameters_to_markdown(member_props["parameters"])
-				markdown_text += parameter_text.strip() + "\n\n" if parameter_text is not None else "" 
+	stream.write(markdown_text) # The member's own text is small, only the classes are written in fragments
 
-			elif member_type == "class" or member_type == "wrappertype":
-				class_text = class_to_markdown(member_name, member_props)					
-				markdown_text += class_text.strip() + "\n\n" if class_text is not None and not class_text == "" else "" 
+	if "parameters" not in member_props and (member_type == "class" or member_type == "wrappertype"):
+		class_section = stream.start_section()
+		write_class_markdown(stream, member_name, member_props, cache)
+		stream.end_section(class_section, "\n\n", empty_end="")
 
-		return markdown_text
+def write_content_markdown(stream: MarkdownStream, content: dict, cache=None) -> None:
+	for member_name, member_props in content.items():
+		if cache is None:
+			write_member_markdown(stream, member_name, member_props)
+		else:
+			stream.write(cache.get_fragment(member_props, (member_name, ), write_member_markdown))
 
-	# print(PREFS.convert_to_prefs(tree))
+def write_submodule_markdown(stream: MarkdownStream, submodule_name: str, submodule_props: dict, cache=None) -> None:
+	"""Given a module of a package tree (see inspect_package.py) write it's section.
+	"""
+	if "error" in submodule_props: # Means it could not be inspected
+		stream.write(f"## `{submodule_name}`\n_`{submodule_name}` could not be inspected:_\n```\n{submodule_props['error'].strip()}\n```\n\n")
+		return
 
+	stream.write(f"## `{submodule_name}`\n" + f"{submodule_props['docstring'] if submodule_props['docstring'] is not None else f'{submodule_name} has no docstring.'}".strip() + "\n\n")
+
+	if "content" in submodule_props:
+		write_content_markdown(stream, submodule_props["content"], cache)
+
+def docstring_to_markdown(module_name: str, docstring: str) -> str:
+	return f"{docstring if docstring is not None else f'{module_name} has no docstring.'}".strip() + "\n\n"
+
+def write_tree_markdown(tree: dict, file, cache=None) -> None:
+	"""Write the Markdown of a tree generated by inspect_object into file (an opened text file or anything with a write method).
+	If cache is a MarkdownCache the members not modified since the last conversion with it are not converted again.
+	"""
+	write_tree(MarkdownStream(file.write), tree, cache)
+
+def write_tree(stream: MarkdownStream, tree: dict, cache=None) -> None:
 	# object is the main object on the tree
 	module_name = tuple(tree)[0]
 	module_content = tree[module_name]
 
-	markdown_text = f"{module_name}\n---\n"
+	document = stream.start_section()
+	stream.write(f"{module_name}\n---\n")
 
 	for property_name, property_val in module_content.items():
-		if isinstance(property_val, dict):
-			markdown_text += content_to_markdown(property_val)
+		if isinstance(property_val, dict) and module_content["type"] == "package": # Means the content are the modules of the package
+			for submodule_name, submodule_props in property_val.items():
+				if cache is None:
+					write_submodule_markdown(stream, submodule_name, submodule_props)
+				else:
+					stream.write(cache.get_fragment(submodule_props, (submodule_name, ), write_submodule_markdown))
+
+		elif isinstance(property_val, dict):
+			write_content_markdown(stream, property_val, cache)
 
 		elif property_name == "docstring":
-			markdown_text += f"{property_val if property_val is not None else f'{module_name} has no docstring.'}".strip() + "\n\n"
+			stream.write(docstring_to_markdown(module_name, property_val))
 			continue
 
-	markdown_text += "***\n_Created using **PyAPIReference**._" # https://patitotective.github.io/PyAPIReference/
+	stream.write(FOOTER)
+	stream.end_section(document, "\n") # This way it only lefts one line at the end
+	stream.close()
+
+	if cache is not None:
+		cache.clear_unused()
+
+def convert_tree_to_markdown(tree: dict, cache=None) -> str:
+	"""Same as write_tree_markdown but returning the Markdown.
+	"""
+	fragments = []
+	write_tree(MarkdownStream(fragments.append), tree, cache)
+
+	return "".join(fragments)
+
+
+class MarkdownCache:
+	"""Markdown of the members converted by write_tree_markdown, by the identity of their dictionary.
+	TreeModel.filter_tree only copies the dictionaries from the module to the members that changed, the others are the same objects as the last time,
+	so only the changed members (and the classes containing them) are converted again. The trees converted with it must not be modified.
+	"""
+	def __init__(self):
+		# (id of the member dictionary, names) -> (member dictionary, markdown, keys of the members converted inside it),
+		# the dictionary is kept so it's id is not reused
+		self.fragments = {}
+		self.used_fragments = {}
+		self.converting = [] # Keys of the members converted inside each fragment being converted
+
+	def get_fragment(self, member_props: dict, names: tuple, write_markdown: callable) -> str:
+		"""Return the Markdown written by write_markdown(stream, *names, member_props, self), only calling it if the member was not converted the last time.
+		"""
+		key = (id(member_props), names)
+
+		if self.converting:
+			self.converting[-1].append(key)
+
+		if key in self.fragments:
+			self.keep_fragment(key)
+			return self.fragments[key][1]
+
+		fragments = []
+		stream = MarkdownStream(fragments.append)
+		self.converting.append([])
+
+		try:
+			write_markdown(stream, *names, member_props, self)
+			stream.close()
+		finally:
+			member_keys = tuple(self.converting.pop())
+
+		fragment = "".join(fragments)
+		self.used_fragments[key] = (member_props, fragment, member_keys)
+
+		return fragment
+
+	def keep_fragment(self, key: tuple) -> None:
+		"""Mark the fragment of key as used with the fragments of the members inside it, which are not requested when it's reused
+		but are needed when one of their siblings changes.
+		"""
+		keys = [key]
+
+		while keys:
+			key = keys.pop()
+
+			if key in self.used_fragments or key not in self.fragments:
+				continue
+
+			self.used_fragments[key] = self.fragments[key]
+			keys.extend(self.fragments[key][2])
+
+	def clear_unused(self) -> None:
+		"""Remove the fragments not used since the last call (the members removed or changed).
+		"""
+		self.fragments = self.used_fragments
+		self.used_fragments = {}
+
+
+class MarkdownWriter:
+	"""Sink that writes the markdown of the events of inspect_object.iter_object_events into file while they are generated.
+	Only one member of the module is kept in memory at a time, the result is the same as convert_tree_to_markdown.
+	"""
+	def __init__(self, file):
+		self.stream = MarkdownStream(file.write)
+		self.document = self.stream.start_section()
+		self.depth = 0
+		self.module_name = None
+		self.module_type = None
+		self.member_builder = None
+
+	def handle_event(self, event: InspectEvents, name: str, value: any) -> None:
+		if event == InspectEvents.ENTER_OBJECT:
+			self.depth += 1
+
+		if self.depth == 1: # The module itself
+			if event == InspectEvents.ENTER_OBJECT:
+				self.module_name = name
+				self.stream.write(f"{name}\n---\n")
+
+			elif event == InspectEvents.PROPERTY and name == "type":
+				self.module_type = value
+
+			elif event == InspectEvents.PROPERTY and name == "docstring":
+				self.stream.write(docstring_to_markdown(self.module_name, value))
+
+		else: # A member of the module, build it's tree and write it when leaving it
+			if event == InspectEvents.ENTER_OBJECT and self.depth == 2:
+				self.member_builder = TreeBuilder()
+
+			self.member_builder.handle_event(event, name, value)
+
+			if event == InspectEvents.LEAVE_OBJECT and self.depth == 2:
+				member_name, member_props = next(iter(self.member_builder.tree.items()))
+				self.member_builder = None
+
+				if self.module_type == "package":
+					write_submodule_markdown(self.stream, member_name, member_props)
+				else:
+					write_member_markdown(self.stream, member_name, member_props)
+
+		if event == InspectEvents.LEAVE_OBJECT:
+			self.depth -= 1
 
-	return markdown_text.strip() + "\n" # This way it only lefts one line at the end
+	def close(self) -> None:
+		self.stream.write(FOOTER)
+		self.stream.end_section(self.document, "\n")
+		self.stream.close()
@@ -0,0 +1,184 @@
+"""Convert inspection trees straight to reStructuredText, without converting them to Markdown and then with m2r2.
+Each member is a Sphinx directive (py:class, py:function, py:method, py:data or py:attribute) with it's signature and :param:, :type: and :rtype: fields,
+docstrings are written as they are (reStructuredText, as in most Python projects). The document is written in fragments in a single pass.
+Example:
+	with open("example.rst", "w") as file:
+		write_tree_rst(inspect_object(example), file)
+"""
+import re
+import inspect
+
+INDENT = "   " # Sphinx directives content is indented with 3 spaces
+FOOTER = "*Created using* **PyAPIReference**.\n"
+CLASS_TYPES = ("class", "wrappertype")
+# Characters with a meaning in reStructuredText inline markup
+INLINE_MARKUP = re.compile(r"([\\*`_|])")
+
+
+def escape(text: str) -> str:
+	return INLINE_MARKUP.sub(r"\\\1", text)
+
+def indent(text: str, level: int) -> str:
+	"""Indent each line of text (except empty ones) level times.
+	"""
+	prefix = INDENT * level
+
+	return "".join(prefix + line if line.strip() else "\n" for line in text.splitlines(keepends=True))
+
+def title_to_rst(title: str, underline: str) -> str:
+	title = escape(title)
+
+	return f"{title}\n{underline * len(title)}\n\n"
+
+def docstring_to_rst(docstring: str, level: int) -> str:
+	"""Indent docstring level times, it's raw __doc__ so the indentation of the source is removed first.
+	"""
+	docstring = inspect.cleandoc(docstring)
+
+	return indent(docstring, level) + "\n\n" if docstring else ""
+
+def get_signature(parameters: dict, return_annotation: any) -> str:
+	"""Return the signature of a callable as in Python code, e.g.: (name: str, *args, age: int = 0) -> str.
+	"""
+	signature = []
+	previous_kind = None
+
+	for parameter_name, parameter_props in parameters.items():
+		kind = parameter_props["kind"]
+
+		if previous_kind == "positional-only" and kind != "positional-only":
+			signature.append("/")
+
+		if kind == "keyword-only" and previous_kind not in ("keyword-only", "variadic positional"):
+			signature.append("*")
+
+		if kind == "variadic positional":
+			parameter_name = f"*{parameter_name}"
+		elif kind == "variadic keyword":
+			parameter_name = f"**{parameter_name}"
+
+		if parameter_props["annotation"] is not None:
+			parameter_name += f": {parameter_props['annotation']}"
+
+		if parameter_props["default"] is not None:
+			parameter_name += f" = {parameter_props['default']}" if parameter_props["annotation"] is not None else f"={parameter_props['default']}"
+
+		signature.append(parameter_name)
+		previous_kind = kind
+
+	if previous_kind == "positional-only":
+		signature.append("/")
+
+	return_annotation = get_return_annotation(return_annotation)
+
+	return f"({', '.join(signature)})" + (f" -> {return_annotation}" if return_annotation is not None else "")
+
+def get_return_annotation(return_annotation: any) -> str:
+	"""Return annotations are a string or a list of them (see inspect_object.get_object_attributes).
+	"""
+	if isinstance(return_annotation, (list, tuple)):
+		return f"tuple[{', '.join(str(annotation) for annotation in return_annotation)}]" if len(return_annotation) > 0 else None
+
+	return return_annotation
+
+def parameters_to_rst(parameters: dict, return_annotation: any, level: int) -> str:
+	fields = ""
+
+	for parameter_name, parameter_props in parameters.items():
+		if parameter_name in ("self", "cls"):
+			continue
+
+		fields += f":param {escape(parameter_name)}:\n"
+
+		if parameter_props["annotation"] is not None:
+			fields += f":type {escape(parameter_name)}: {escape(parameter_props['annotation'])}\n"
+
+	return_annotation = get_return_annotation(return_annotation)
+
+	if return_annotation is not None:
+		fields += f":rtype: {escape(return_annotation)}\n"
+
+	return indent(fields, level) + "\n" if fields else ""
+
+def write_member_rst(write: callable, member_name: str, member_props: dict, level: int, in_class: bool) -> None:
+	"""Write the directive of a member of a module (in_class False) or a class and it's content, level is the indentation of the directive.
+	"""
+	member_type = member_props["type"]
+
+	if "parameters" in member_props:
+		directive = "py:method" if in_class else "py:function"
+		signature = get_signature(member_props["parameters"], member_props.get("return_annotation"))
+	elif member_type in CLASS_TYPES or "content" in member_props:
+		directive = "py:class"
+		signature = ""
+	else:
+		directive = "py:attribute" if in_class else "py:data"
+		signature = ""
+
+	write(indent(f".. {directive}:: {member_name}{signature}\n", level))
+
+	if "value" in member_props: # Means it's a variable so the docstring would be a description of the variable type
+		write(indent(f":type: {member_type}\n:value: {' '.join(member_props['value'].splitlines())}\n", level + 1))
+
+	write("\n")
+
+	if "reference" in member_props: # Means it was already inspected with other name
+		write(indent(f"Same as :py:obj:`{member_props['reference'].replace('/', '.')}`.\n\n", level + 1))
+	elif member_props["docstring"] is not None and "value" not in member_props:
+		write(docstring_to_rst(member_props["docstring"], level + 1))
+	else:
+		write(indent(f"{escape(member_name)} has no description.\n\n", level + 1))
+
+	if "parameters" in member_props:
+		write(parameters_to_rst(member_props["parameters"], member_props.get("return_annotation"), level + 1))
+
+	elif directive == "py:class":
+		if len(member_props.get("inherits", ())) > 0:
+			write(indent(f"Inherits: {', '.join(f':py:class:`{class_name}`' for class_name in member_props['inherits'])}.\n\n", level + 1))
+
+		for class_member_name, class_member_props in member_props.get("content", {}).items():
+			write_member_rst(write, class_member_name, class_member_props, level + 1, True)
+
+		if member_props.get("truncated"): # Means it was nested deeper than the maximum depth
+			write(indent(f"*{escape(member_name)} members were not inspected (maximum depth reached).*\n\n", level + 1))
+
+def write_module_rst(write: callable, module_name: str, module_props: dict, underline: str) -> None:
+	write(title_to_rst(module_name, underline))
+
+	if "error" in module_props: # Means it could not be inspected (a module of a package, see inspect_package.py)
+		write(f"*{escape(module_name)} could not be inspected:*\n\n::\n\n{indent(module_props['error'].strip(), 1)}\n\n")
+		return
+
+	write(f".. py:module:: {module_name}\n\n")
+	write(docstring_to_rst(module_props["docstring"], 0) if module_props["docstring"] is not None else f"{escape(module_name)} has no docstring.\n\n")
+
+	for member_name, member_props in module_props.get("content", {}).items():
+		write_member_rst(write, member_name, member_props, 0, False)
+
+def write_rst_document(write: callable, tree: dict) -> None:
+	module_name = tuple(tree)[0]
+	module_props = tree[module_name]
+
+	if module_props["type"] == "package": # Means the content are the modules of the package (their names are their qualified names)
+		write(title_to_rst(module_name, "="))
+		write(docstring_to_rst(module_props["docstring"], 0) if module_props["docstring"] is not None else f"{escape(module_name)} has no docstring.\n\n")
+
+		for submodule_name, submodule_props in module_props.get("content", {}).items():
+			write_module_rst(write, submodule_name, submodule_props, "-")
+	else:
+		write_module_rst(write, module_name, module_props, "=")
+
+	write(FOOTER)
+
+def write_tree_rst(tree: dict, file) -> None:
+	"""Write the reStructuredText of a tree generated by inspect_object into file (an opened text file or anything with a write method).
+	"""
+	write_rst_document(file.write, tree)
+
+def convert_tree_to_rst(tree: dict) -> str:
+	"""Same as write_tree_rst but returning the reStructuredText.
+	"""
+	fragments = []
+	write_rst_document(fragments.append, tree)
+
+	return "".join(fragments)
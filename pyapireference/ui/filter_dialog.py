@@ -9,7 +9,8 @@ else:
 	from pyapireference.ui.formlayout import FormLayout
 	from pyapireference.ui.scrollarea import ScrollArea
 	from pyapireference.ui.warning_dialog import WarningDialog
-	from pyapireference.extra import get_text_size, remove_key_from_dict, interpret_type
+	from pyapireference.extra import get_text_size, remove_key_from_dict
+	from pyapireference.inspect_object import interpret_type
 	# from pyapireference.ui import resources # Qt resources GUI/resources.qrc
 
 class FilterDialog(QDialog):
@@ -1,8 +1,9 @@
 import sys
-import commonmark
+import json
+import threading
 
 from PyQt5.QtWidgets import QWidget, QApplication, QVBoxLayout, QTextBrowser
-from PyQt5.QtCore import Qt, QEvent, pyqtSignal
+from PyQt5.QtCore import Qt, QEvent, QObject, QThread, pyqtSignal
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtGui import QCursor
 
@@ -11,14 +12,94 @@ if __name__ == "__main__":
 else:
     from pyapireference.ui.github_markdown_style import GITHUB_MARKDOWN_STYLE
     from pyapireference.extra import create_menu
+    from pyapireference.markdown_blocks import markdown_to_blocks, get_block_operations
+
+# Loaded once with the page, blocks[i] are the nodes of the i-th top level block of the body.
+# patchBlocks receives the operations of markdown_blocks.get_block_operations.
+PATCH_SCRIPT = """
+var blocks = [];
+
+function patchBlocks(operations) {
+    operations.forEach(function (operation) {
+        var start = operation[0], end = operation[0] + operation[1];
+        var next = null;
+
+        for (var i = end; i < blocks.length && next === null; i++) {
+            next = blocks[i].length > 0 ? blocks[i][0] : null;
+        }
+
+        for (var i = start; i < end; i++) {
+            blocks[i].forEach(function (node) { node.remove(); });
+        }
+
+        var created = operation[2].map(function (html) {
+            var template = document.createElement("template");
+            template.innerHTML = html;
+            var nodes = Array.from(template.content.childNodes);
+            document.body.insertBefore(template.content, next);
+
+            return nodes;
+        });
+
+        blocks = blocks.slice(0, start).concat(created, blocks.slice(end));
+    });
+}
+"""
+
+class MarkdownConverter(QObject):
+    """Convert Markdown to the blocks of MarkdownPreviewer in it's own thread, so typing in a big document doesn't wait for the conversion.
+    Only the latest request is converted: the ones made while converting are replaced by the newest and never converted.
+    Call stop before the application quits.
+    """
+    converted = pyqtSignal(int, object) # Request id, HTML of each top level block (see markdown_to_blocks)
+    requested = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+
+        self.lock = threading.Lock()
+        self.latest_request = None # (request id, text, tree) not converted yet
+        self.last_request_id = 0
+
+        self.thread = QThread()
+        self.moveToThread(self.thread)
+        self.requested.connect(self.convert) # Queued, convert runs in the thread
+        self.thread.start()
+
+    def request(self, text: str, tree: dict=None) -> int:
+        """Ask to convert text (or tree, see markdown_to_blocks), return the id converted will be emitted with.
+        """
+        with self.lock:
+            self.last_request_id += 1
+            self.latest_request = (self.last_request_id, text, tree)
+
+        self.requested.emit()
+
+        return self.last_request_id
+
+    def convert(self):
+        with self.lock:
+            latest_request, self.latest_request = self.latest_request, None
+
+        if latest_request is None: # Means it was converted when a previous signal was handled
+            return
+
+        request_id, text, tree = latest_request
+        self.converted.emit(request_id, markdown_to_blocks(text, tree))
+
+    def stop(self):
+        self.thread.quit()
+        self.thread.wait()
 
 class MarkdownPreviewer(QWebEngineView):    
     stop = pyqtSignal()
 
-    def __init__(self, prefs, initial_md_text="", title="Markdown Preview", scroll_link=None, parent=None, *args, **kwargs):
+    def __init__(self, prefs, initial_md_text="", title="Markdown Preview", scroll_link=None, tree=None, converter=None, parent=None, *args, **kwargs):
         """
         Parameters:
             scroll_link=None: A scrollbar to synchronize with (only y not x).
+            tree=None: The tree initial_md_text was generated from, if it was not edited (see markdown_to_blocks).
+            converter=None: A MarkdownConverter to convert the Markdown in it's thread, if None it's converted in the GUI thread.
         """
         super().__init__(*args, **kwargs)
 
@@ -27,10 +108,21 @@ class MarkdownPreviewer(QWebEngineView):
         self.scroll_link = scroll_link
         self.mouse_hover = False
 
+        self.converter = converter
+        self.request_id = None # Of the last conversion requested to converter, the previous ones are outdated
+        self.block_hashes = None # Hashes of the blocks in the page, None until it's loaded
+        self.pending_blocks = None # Blocks to show once the page is loaded
+
+        if self.converter is not None:
+            self.converter.converted.connect(self.blocks_converted)
+
         self.installEventFilter(self)
         self.setAttribute(Qt.WA_Hover, True)
 
-        self.setHtml(self.markdown_to_html(initial_md_text))
+        # The page (and the style) is loaded only once, then only the blocks that changed are replaced (see update_markdown)
+        self.loadFinished.connect(self.page_loaded)
+        self.setHtml(f"<head><style>{GITHUB_MARKDOWN_STYLE}</style><script>{PATCH_SCRIPT}</script></head><body></body>")
+        self.update_markdown(initial_md_text, tree)
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self.open_context_menu)
 
@@ -76,11 +168,38 @@ class MarkdownPreviewer(QWebEngineView):
         self.scroll_link[0].valueChanged.connect(scrollbar_changed_x)
         self.scroll_link[1].valueChanged.connect(scrollbar_changed_y)
 
-    def update_markdown(self, md_text):
-        self.setHtml(self.markdown_to_html(md_text))
+    def page_loaded(self, ok: bool):
+        if ok and self.block_hashes is None:
+            self.block_hashes = []
+
+            if self.pending_blocks is not None:
+                self.patch_blocks(self.pending_blocks)
+                self.pending_blocks = None
+
+    def update_markdown(self, md_text, tree=None):
+        """Replace only the blocks of the page that changed, keeping the scroll position.
+        With a converter the page is updated when the conversion finishes (if it's still the last one requested).
+        """
+        if self.converter is not None:
+            self.request_id = self.converter.request(md_text, tree)
+        else:
+            self.show_blocks(markdown_to_blocks(md_text, tree))
+
+    def blocks_converted(self, request_id: int, blocks: list):
+        if request_id == self.request_id: # Otherwise it's outdated or was requested by other previewer
+            self.show_blocks(blocks)
+
+    def show_blocks(self, blocks: list):
+        if self.block_hashes is None: # Means the page is still loading
+            self.pending_blocks = blocks
+        else:
+            self.patch_blocks(blocks)
+
+    def patch_blocks(self, blocks: list):
+        operations = get_block_operations(self.block_hashes, blocks)
 
-    def markdown_to_html(self, text: str) -> str:
-        text = f"<head><style>{GITHUB_MARKDOWN_STYLE}</style></head><body>{commonmark.commonmark(text)}</body>"
+        if len(operations) > 0:
+            self.page().runJavaScript(f"patchBlocks({json.dumps(operations)});")
 
-        return text
+        self.block_hashes = [hash(block) for block in blocks]
 
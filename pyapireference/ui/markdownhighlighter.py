@@ -26,52 +26,95 @@ Highlight Markdown text
 
 import sys
 import re
+import time
+import functools
 import PREFS
-from PyQt5.QtGui import QBrush, QSyntaxHighlighter, QTextCharFormat, QColor, QPalette, QFont, QTextCursor, QTextLayout
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QBrush, QSyntaxHighlighter, QTextCharFormat, QColor, QPalette, QFont, QTextLayout
+from PyQt5.QtCore import Qt, QTimer, QPoint
 from PyQt5.QtWidgets import QTextEdit, QMainWindow, QApplication
 
-class MarkdownHighlighter(QSyntaxHighlighter):
+HIGHLIGHT_TIME_SLICE = 0.01 # Maximum seconds highlighting blocks each time the event loop runs, the rest are highlighted when it's idle
+TOKENS_CACHE_SIZE = 4096 # Lines whose tokens are cached (see tokenize)
+IN_CODE_BLOCK = 1 # State of the blocks inside a ``` code block, the rest are 0
+
+CODE_FENCE_REGEX = re.compile(r'\s*```') # ```py
+
+# Elements at the start of a line, a block quote or a list can be followed by other ones (e.g.: > - Element 1)
+LINE_START_REGEX = re.compile(r"""
+    (?P<HeaderAtx>\#{1,6}.*) # ## Header
+    |(?P<HR>(\s*(\*|-)\s*){3,}$) # --- or ***
+    |(?P<eHR>(\s*(\*|=)\s*){3,}$) # ===
+    |(?P<BlockQuote>\s*>+\s*) # > This is a quote
+    |(?P<UnorderedList>\s*(\*\ |\+\ |-\ )+\s*) # - Element 1\n+ Element 2
+    |(?P<OrderedList>\s*(\d+\.\ )\s*) # 1. First element\n2. Second element
+""", re.VERBOSE)
+
+# Inline elements in a single alternation, where two of them start at the same character the first one wins
+INLINE_REGEX = re.compile(r"""
+    (?P<CodeSpan>(?P<ticks>`+).+?(?P=ticks)) # `This is a inline code block`
+    |(?P<HTML><.+?>) # This is an html tag
+    |(?P<Image>!\[.*?\]\(.+?\)) # ![Image alt text](Image)
+    |(?P<Link>\[.*?\]\(.*?\)) # [Link alt text](Link)
+    |(?P<Bold>\*\*.+?\*\*) # **Bold**
+    |(?P<uBold>__[^_]{2,}__) # __uBold__
+    |(?P<Italic>\*[^*]{2,}\*) # *Italic*
+    |(?P<uItalic>_[^_]+_) # _uItalic_
+""", re.VERBOSE)
+# Length of the delimiters of the elements that can contain other ones (e.g.: _Created using **PyAPIReference**._)
+EMPHASIS_DELIMITERS = {'Bold': 2, 'uBold': 2, 'Italic': 1, 'uItalic': 1}
+
+
+@functools.lru_cache(maxsize=TOKENS_CACHE_SIZE)
+def tokenize(text: str) -> tuple:
+    """Return the (start, length, format name) of the Markdown elements of a line (outside code blocks) in a single pass,
+    the text between them is 'Default'. Cached by the text of the line since generated API references repeat many of them (e.g.: #### Parameters).
+    """
+    tokens = []
+    position = 0
+
+    while True:
+        mo = LINE_START_REGEX.match(text, position)
+
+        if mo is None:
+            break
+
+        tokens.append((mo.start(), mo.end() - mo.start(), mo.lastgroup))
+        position = mo.end()
+
+        if mo.lastgroup in ("HeaderAtx", "HR", "eHR"): # The rest of the line
+            return tuple(tokens)
+
+    tokenize_inline(text, position, len(text), 'Default', tokens)
+
+    return tuple(tokens)
+
+def tokenize_inline(text: str, start: int, end: int, format_name: str, tokens: list):
+    """Add the inline elements of text[start:end] to tokens, the text between them is format_name.
+    """
+    position = start
+
+    for mo in INLINE_REGEX.finditer(text, start, end):
+        if mo.start() > position:
+            tokens.append((position, mo.start() - position, format_name))
+
+        delimiter = EMPHASIS_DELIMITERS.get(mo.lastgroup)
+
+        if delimiter is None:
+            tokens.append((mo.start(), mo.end() - mo.start(), mo.lastgroup))
+        else:
+            tokens.append((mo.start(), delimiter, mo.lastgroup))
+            tokenize_inline(text, mo.start() + delimiter, mo.end() - delimiter, mo.lastgroup, tokens)
+            tokens.append((mo.end() - delimiter, delimiter, mo.lastgroup))
+
+        position = mo.end()
 
-    MARKDOWN_KEYS_REGEX = {
-        'Bold' : re.compile(u'(?P<delim>\*\*)(?P<text>.+)(?P=delim)'), # **Bold**
-       
-        'uBold': re.compile(u'(?P<delim>__)(?P<text>[^_]{2,})(?P=delim)'), # __uBold__
-       
-        'Italic': re.compile(u'(?P<delim>\*)(?P<text>[^*]{2,})(?P=delim)'), # *Italic*
-       
-        'uItalic': re.compile(u'(?P<delim>_)(?P<text>[^_]+)(?P=delim)'), # _uItalic_
-       
-        'Link': re.compile(u'(?u)\[.*?\]\(.*\)'), #u'(?u)(^|(?P<pre>[^!]))\[.*?\]:?[ \t]*\(?[^)]+\)?'), # [Link alt text](Link)
-       
-        'Image': re.compile(u'(?u)!\[.*?\]\(.+?\)'), # ![Image alt text](Image)
-       
-        'HeaderAtx': re.compile(u'(?u)^\#{1,6}(.*?)\#*(\n|$)'), # ## Header
-       
-        'Header': re.compile(u'^(.+)[ \t]*\n(=+|-+)[ \t]*\n+'), # Header level 1\n=============== or Header level 2\n---------------
-       
-        'CodeBlock': re.compile(u'(?P<delim>\`\`\`\n)(?P<text>.+)(?P=delim)'), # ```This is a\nmultiline\ncode block```
-       
-        'CodeBlockTab': re.compile(u'^([ ]{4,}|\t).*'), #\tThis is also a\n\tmultiline code block using\n\ttabs
-       
-        'UnorderedList': re.compile(u'(?u)^\s*(\* |\+ |- )+\s*'), # - Element 1\n+ Element 2
-       
-        'UnorderedListStar': re.compile(u'^\s*(\* )+\s*'), # * Element 2
-       
-        'OrderedList': re.compile(u'(?u)^\s*(\d+\. )\s*'), # 1. First element\n2. Second element
-       
-        'BlockQuote': re.compile(u'(?u)^\s*>+\s*'), # > This is a quote
-       
-        'BlockQuoteCount': re.compile(u'^[ \t]*>[ \t]?'), # 
-       
-        'CodeSpan': re.compile(u'(?P<delim>`+).+?(?P=delim)'), # `This is a inline code block`
-       
-        'HR': re.compile(u'(?u)^(\s*(\*|-)\s*){3,}$'), # --- or ***
-       
-        'eHR': re.compile(u'(?u)^(\s*(\*|=)\s*){3,}$'), # 
-       
-        'Html': re.compile(u'<.+?>') # This is an html tag
-    }
+    if position < end:
+        tokens.append((position, end - position, format_name))
+
+class MarkdownHighlighter(QSyntaxHighlighter):
+    """Highlight the blocks changed each time the event loop runs during at most HIGHLIGHT_TIME_SLICE seconds,
+    the rest (e.g.: when loading a big document or changing the theme) are highlighted when the event loop is idle, the visible ones first.
+    """
 
     def __init__(self, parent, THEME, current_theme="dark"):
         super().__init__(parent)
@@ -79,6 +122,21 @@ class MarkdownHighlighter(QSyntaxHighlighter):
         parent.setTabStopWidth(parent.fontMetrics().width(' ') * 4)
 
 
+        self.slice_deadline = None # Blocks highlighted after it are deferred, None until a block is highlighted since the event loop ran
+        self.deferred_block_number = None # First block deferred, None if there are none
+        self.rehighlight_all = False # Means all the blocks from deferred_block_number are highlighted again (e.g.: the theme changed), not only the deferred ones
+
+        self.slice_timer = QTimer(self)
+        self.slice_timer.setSingleShot(True)
+        self.slice_timer.timeout.connect(self.endSlice)
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.timeout.connect(self.highlightDeferredBlocks)
+
+        self.document().contentsChange.connect(self.contentsChanged)
+        parent.verticalScrollBar().valueChanged.connect(self.highlightVisibleBlocks)
+
         self.defaultTheme = THEME[current_theme]["markdown_highlighter"]
 
         self.setTheme(self.defaultTheme)
@@ -87,6 +145,10 @@ class MarkdownHighlighter(QSyntaxHighlighter):
         self.theme = theme
         self.MARKDOWN_KWS_FORMAT = {}
 
+        text_char_format = QTextCharFormat()
+        text_char_format.setForeground(QBrush(QColor(theme['color'])))
+        self.MARKDOWN_KWS_FORMAT['Default'] = text_char_format
+
         pal = self.parent.palette()
         pal.setColor(QPalette.Base, QColor(theme['background-color']))
         self.parent.setPalette(pal)
@@ -194,186 +256,144 @@ class MarkdownHighlighter(QSyntaxHighlighter):
         text_char_format.setFontItalic(True if theme['html']['font-style']=='italic' else False)
         self.MARKDOWN_KWS_FORMAT['HTML'] = text_char_format
 
-        self.rehighlight()
+        self.rehighlightInIdleTime()
+
+    def rehighlightInIdleTime(self):
+        """Same as rehighlight but only the visible blocks are highlighted now.
+        """
+        self.deferred_block_number = 0
+        self.rehighlight_all = True
+
+        self.highlightVisibleBlocks()
+        self.idle_timer.start(0)
 
     def highlightBlock(self, text):
         text = str(text)
-        self.highlightMarkdown(text,0)
-        self.highlightHtml(text)
-
-    def highlightMarkdown(self, text, strt):
-        cursor = QTextCursor(self.document())
-        bf = cursor.blockFormat()
-        self.setFormat(0, len(text), QColor(self.theme['color']))
-        #bf.clearBackground()
-        #cursor.movePosition(QTextCursor.End)
-        #cursor.setBlockFormat(bf)
-
-        #Block quotes can contain all elements so process it first
-        self.highlightBlockQuote(text, cursor, bf, strt)
-
-        #If empty line no need to check for below elements just return
-        if self.highlightEmptyLine(text, cursor, bf, strt):
+
+        in_code_block = self.previousBlockState() == IN_CODE_BLOCK
+        code_fence = CODE_FENCE_REGEX.match(text) is not None
+        # The state is always set, even when deferred, so the next blocks know if they are in a code block
+        self.setCurrentBlockState(IN_CODE_BLOCK if in_code_block != code_fence else 0)
+
+        if self.isSliceOver():
+            self.deferBlock(self.currentBlock())
             return
 
-        #If horizontal line, look at pevious line to see if its a header, process and return
-        if self.highlightHorizontalLine(text, cursor, bf, strt):
+        for start, length, format_name in self.getFormats(text, in_code_block or code_fence):
+            self.setFormat(start, length, self.MARKDOWN_KWS_FORMAT[format_name])
+
+            if format_name in ('HR', 'eHR'):
+                self.highlightSetextHeader(self.currentBlock())
+
+    def getFormats(self, text: str, code_block: bool) -> tuple:
+        if code_block:
+            return ((0, len(text), 'CodeBlock'), ) if len(text) > 0 else ()
+
+        return tokenize(text)
+
+    def highlightSetextHeader(self, block):
+        """If the line before block is not empty it's a header (Header level 1\n=============== or Header level 2\n---------------).
+        """
+        prevBlock = block.previous()
+        prev = prevBlock.text()
+        prevAscii = str(prev.replace(u'\u2029','\n'))
+        if prevAscii.strip():
+            formatRange = QTextLayout.FormatRange()
+            formatRange.format = self.MARKDOWN_KWS_FORMAT['Header']
+            formatRange.length = prevBlock.length()
+            formatRange.start = 0
+            prevBlock.layout().setAdditionalFormats([formatRange])
+
+    def isSliceOver(self) -> bool:
+        now = time.perf_counter()
+
+        if self.slice_deadline is None:
+            self.slice_deadline = now + HIGHLIGHT_TIME_SLICE
+            self.slice_timer.start(0) # Once the event loop runs
+
+        return now > self.slice_deadline
+
+    def endSlice(self):
+        self.slice_deadline = None
+
+        if self.deferred_block_number is not None:
+            self.highlightVisibleBlocks()
+            self.idle_timer.start(0)
+
+    def deferBlock(self, block):
+        if self.deferred_block_number is None or block.blockNumber() < self.deferred_block_number:
+            self.deferred_block_number = block.blockNumber()
+
+    def contentsChanged(self, position, chars_removed, chars_added):
+        """Lines added or removed change the numbers of the next blocks, continue from the changed one.
+        """
+        if self.deferred_block_number is not None:
+            self.deferred_block_number = min(self.deferred_block_number, self.document().findBlock(position).blockNumber())
+
+    def highlightDeferredBlocks(self):
+        """Highlight the deferred blocks in the event loop, blocking it at most HIGHLIGHT_TIME_SLICE seconds each time.
+        """
+        if self.deferred_block_number is None:
             return
 
-        if self.highlightAtxHeader(text, cursor, bf, strt):
+        deadline = time.perf_counter() + HIGHLIGHT_TIME_SLICE
+        block = self.document().findBlockByNumber(self.deferred_block_number)
+        last_block = self.highlightDeferredRange(block, lambda block: time.perf_counter() < deadline)
+
+        if last_block.next().isValid():
+            self.deferred_block_number = last_block.next().blockNumber()
+            self.idle_timer.start(0)
+        else:
+            self.deferred_block_number = None
+            self.rehighlight_all = False
+
+    def highlightVisibleBlocks(self, value=None):
+        if self.deferred_block_number is None:
             return
 
-        self.highlightList(text, cursor, bf, strt)
+        block = self.parent.cursorForPosition(QPoint(0, 0)).block()
+        last_block_number = self.parent.cursorForPosition(QPoint(0, self.parent.viewport().height())).block().blockNumber()
 
-        self.highlightLink(text, cursor, bf, strt)
+        if block.blockNumber() < self.deferred_block_number:
+            block = self.document().findBlockByNumber(self.deferred_block_number)
 
-        self.highlightImage(text, cursor, bf, strt)
+        if block.isValid() and block.blockNumber() <= last_block_number:
+            self.highlightDeferredRange(block, lambda block: block.blockNumber() <= last_block_number)
 
-        self.highlightCodeSpan(text, cursor, bf, strt)
+    def highlightDeferredRange(self, block, keep_going: callable):
+        """Highlight the deferred blocks from block while keep_going(next block) and return the last one.
+        Instead of rehighlightBlock (which makes the text edit layout the document each time) the formats are set to the layout of each block
+        and the document is layout once.
+        """
+        first_position = block.position()
 
-        self.highlightEmphasis(text, cursor, bf, strt)
+        while True:
+            # A deferred block has no formats, highlighted blocks have at least the default one (except empty ones)
+            if self.rehighlight_all or (block.length() > 1 and len(block.layout().formats()) == 0):
+                text = block.text()
+                code_block = block.previous().userState() == IN_CODE_BLOCK or CODE_FENCE_REGEX.match(text) is not None
+                formats = []
 
-        self.highlightBold(text, cursor, bf, strt)
+                for start, length, format_name in self.getFormats(text, code_block):
+                    formatRange = QTextLayout.FormatRange()
+                    formatRange.format = self.MARKDOWN_KWS_FORMAT[format_name]
+                    formatRange.start = start
+                    formatRange.length = length
+                    formats.append(formatRange)
 
-        self.highlightCodeBlock(text, cursor, bf, strt)
+                block.layout().setFormats(formats)
 
-    def highlightBlockQuote(self, text, cursor, bf, strt):
-        found = False
-        mo = re.search(self.MARKDOWN_KEYS_REGEX['BlockQuote'],text)
-        if mo:
-            self.setFormat(mo.start(), mo.end() - mo.start(), self.MARKDOWN_KWS_FORMAT['BlockQuote'])
-            unquote = re.sub(self.MARKDOWN_KEYS_REGEX['BlockQuoteCount'],'',text)
-            spcs = re.match(self.MARKDOWN_KEYS_REGEX['BlockQuoteCount'],text)
-            spcslen = 0
-            if spcs:
-                spcslen = len(spcs.group(0))
-            self.highlightMarkdown(unquote,spcslen)
-            found = True
-        return found
+                if len(formats) > 0 and format_name in ('HR', 'eHR'):
+                    self.highlightSetextHeader(block)
 
-    def highlightEmptyLine(self, text, cursor, bf, strt):
-        textAscii = str(text.replace(u'\u2029','\n'))
-        if textAscii.strip():
-            return False
-        else:
-            return True
-
-    def highlightHorizontalLine(self, text, cursor, bf, strt):
-        found = False
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['HR'],text):
-            prevBlock = self.currentBlock().previous()
-            prevCursor = QTextCursor(prevBlock)
-            prev = prevBlock.text()
-            prevAscii = str(prev.replace(u'\u2029','\n'))
-            if prevAscii.strip():
-                #print "Its a header"
-                prevCursor.select(QTextCursor.LineUnderCursor)
-                #prevCursor.setCharFormat(self.MARKDOWN_KWS_FORMAT['Header'])
-                formatRange = QTextLayout.FormatRange()
-                formatRange.text_char_format = self.MARKDOWN_KWS_FORMAT['Header']
-                formatRange.length = prevCursor.block().length()
-                formatRange.start = 0
-                prevCursor.block().layout().setAdditionalFormats([formatRange])
-            self.setFormat(mo.start()+strt, mo.end() - mo.start(), self.MARKDOWN_KWS_FORMAT['HR'])
-
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['eHR'],text):
-            prevBlock = self.currentBlock().previous()
-            prevCursor = QTextCursor(prevBlock)
-            prev = prevBlock.text()
-            prevAscii = str(prev.replace(u'\u2029','\n'))
-            if prevAscii.strip():
-                #print "Its a header"
-                prevCursor.select(QTextCursor.LineUnderCursor)
-                #prevCursor.setCharFormat(self.MARKDOWN_KWS_FORMAT['Header'])
-                formatRange = QTextLayout.FormatRange()
-                formatRange.text_char_format = self.MARKDOWN_KWS_FORMAT['Header']
-                formatRange.length = prevCursor.block().length()
-                formatRange.start = 0
-                prevCursor.block().layout().setAdditionalFormats([formatRange])
-            self.setFormat(mo.start()+strt, mo.end() - mo.start(), self.MARKDOWN_KWS_FORMAT['HR'])
-        return found
-
-    def highlightAtxHeader(self, text, cursor, bf, strt):
-        found = False
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['HeaderAtx'],text):
-            #bf.setBackground(QBrush(QColor(7,54,65)))
-            #cursor.movePosition(QTextCursor.End)
-            #cursor.mergeBlockFormat(bf)
-            self.setFormat(mo.start()+strt, mo.end() - mo.start(), self.MARKDOWN_KWS_FORMAT['HeaderAtx'])
-            found = True
-        return found
-
-    def highlightList(self, text, cursor, bf, strt):
-        found = False
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['UnorderedList'],text):
-            self.setFormat(mo.start()+strt, mo.end() - mo.start()-strt, self.MARKDOWN_KWS_FORMAT['UnorderedList'])
-            found = True
-
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['OrderedList'],text):
-            self.setFormat(mo.start()+strt, mo.end() - mo.start()-strt, self.MARKDOWN_KWS_FORMAT['OrderedList'])
-            found = True
-        return found
-
-    def highlightLink(self, text, cursor, bf, strt):
-        found = False
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['Link'],text):
-            self.setFormat(mo.start()+strt, mo.end() - mo.start()-strt, self.MARKDOWN_KWS_FORMAT['Link'])
-            found = True
-        return found
-
-    def highlightImage(self, text, cursor, bf, strt):
-        found = False
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['Image'],text):
-            self.setFormat(mo.start()+strt, mo.end() - mo.start()-strt, self.MARKDOWN_KWS_FORMAT['Image'])
-            found = True
-        return found
-
-    def highlightCodeSpan(self, text, cursor, bf, strt):
-        found = False
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['CodeSpan'],text):
-            self.setFormat(mo.start()+strt, mo.end() - mo.start()-strt, self.MARKDOWN_KWS_FORMAT['CodeSpan'])
-            found = True
-        return found
-
-    def highlightBold(self, text, cursor, bf, strt):
-        found = False
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['Bold'],text):
-            self.setFormat(mo.start()+strt, mo.end() - mo.start()-strt, self.MARKDOWN_KWS_FORMAT['Bold'])
-            found = True
-
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['uBold'],text):
-            self.setFormat(mo.start()+strt, mo.end() - mo.start()-strt, self.MARKDOWN_KWS_FORMAT['uBold'])
-            found = True
-        return found
-
-    def highlightEmphasis(self, text, cursor, bf, strt):
-        found = False
-        unlist = re.sub(self.MARKDOWN_KEYS_REGEX['UnorderedListStar'],'',text)
-        spcs = re.match(self.MARKDOWN_KEYS_REGEX['UnorderedListStar'],text)
-        spcslen = 0
-        if spcs:
-            spcslen = len(spcs.group(0))
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['Italic'],unlist):
-            self.setFormat(mo.start()+strt+spcslen, mo.end() - mo.start()-strt, self.MARKDOWN_KWS_FORMAT['Italic'])
-            found = True
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['uItalic'],text):
-            self.setFormat(mo.start()+strt, mo.end() - mo.start()-strt, self.MARKDOWN_KWS_FORMAT['uItalic'])
-            found = True
-        return found
-
-    def highlightCodeBlock(self, text, cursor, bf, strt):
-        found = False
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['CodeBlock'], text):
-            stripped = text.lstrip()
-            if stripped[0] not in ('*','-','+','>'):
-                self.setFormat(mo.start() + strt, mo.end() - mo.start(), self.MARKDOWN_KWS_FORMAT['CodeBlock'])
-                found = True
-        
-        return found
-
-    def highlightHtml(self, text):
-        for mo in re.finditer(self.MARKDOWN_KEYS_REGEX['Html'], text):
-            self.setFormat(mo.start(), mo.end() - mo.start(), self.MARKDOWN_KWS_FORMAT['HTML'])
+            if not block.next().isValid() or not keep_going(block.next()):
+                break
+
+            block = block.next()
+
+        self.document().markContentsDirty(first_position, block.position() + block.length() - first_position)
+
+        return block
 
 class MainWindow(QMainWindow):
     def __init__(self, *args, **kwargs):
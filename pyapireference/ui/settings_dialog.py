@@ -20,7 +20,8 @@ else:
 	from pyapireference.ui.scrollarea import ScrollArea
 	from pyapireference.ui.formlayout import FormLayout
 	from pyapireference.ui.warning_dialog import WarningDialog
-	from pyapireference.extra import to_sentence_case, get_text_size, stylesheet_to_dict, remove_key_from_dict, interpret_type
+	from pyapireference.extra import to_sentence_case, get_text_size, stylesheet_to_dict, remove_key_from_dict
+	from pyapireference.inspect_object import interpret_type
 
 class SettingsDialog(QDialog):
 	def __init__(self, prefs, *args, title="Settings", parent=None, **kwargs):
@@ -32,10 +33,38 @@ class SettingsDialog(QDialog):
 
 		self.default_settings = {
 			"inspect_module": {
-				"recursion_limit": {
-					"tooltip": "Recursion limit when inspecting module (when large modules it should be bigger).", 
-					"value": 10 ** 6, 
-					"min_val": 1500, 
+				"max_depth": {
+					"tooltip": "Maximum depth of nested classes inspected, deeper classes are marked as truncated and their members are not inspected.", 
+					"value": 100, 
+					"min_val": 1, 
+				}, 
+				"static_inspection": {
+					"tooltip": "Parse the module's source code instead of importing it (faster and the module's code is never run, but values are not evaluated).", 
+					"value": False, 
+				}, 
+				"sandbox_inspection": {
+					"tooltip": "Import and inspect modules in a separate process, if the module freezes, uses too much memory or crashes the application keeps working.", 
+					"value": True, 
+				}, 
+				"timeout": {
+					"tooltip": "Maximum seconds a module can take to be inspected in a separate process (0 means no limit).", 
+					"value": 60, 
+				}, 
+				"memory_limit": {
+					"tooltip": "Maximum megabytes of memory a module can use when inspected in a separate process, only on Linux and macOS (0 means no limit).", 
+					"value": 4096, 
+				}, 
+				"warm_server": {
+					"tooltip": "Keep the dependencies of the inspected modules imported in a background process, inspecting a module again only imports the module itself (needs sandbox inspection, only on Linux and macOS).", 
+					"value": True, 
+				}, 
+				"workers": {
+					"tooltip": "Number of processes used to inspect the modules of a package (0 means one per CPU core).", 
+					"value": 0, 
+				}, 
+				"cache_inspections": {
+					"tooltip": "Store inspected modules in a cache, unchanged modules are not inspected again.", 
+					"value": True, 
 				}, 
 			}, 
 			"preview_markdown": {
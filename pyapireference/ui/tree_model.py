@@ -0,0 +1,546 @@
+"""Model and view of the Tree tab.
+A QTreeView only paints the visible rows, so big modules don't create a widget (and labels) per member, parameter and docstring as CollapsibleWidget did.
+Each row is a TreeItem, either a collapsible row (a member or a property like content, parameters, docstring, etc.) that can be expanded and most of them checked,
+or a value row (a property like "type: function" or a line of a list or docstring).
+"""
+import time
+
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QCursor
+from PyQt5.QtWidgets import QTreeView, QAbstractItemView
+
+from pyapireference.extra import create_menu
+
+# Collapsible properties without checkbox (always included in the Markdown)
+PROPERTIES_WITHOUT_CHECKBOX = ("docstring", "inherits")
+PROPERTIES_DISABLED_BY_DEFAULT = ("self", )
+# Keys of the trees stored by previous versions to restore the state of the rows, they are not properties
+STATE_KEYS = ("collapsed", "checked")
+# Maximum seconds TreeView.restore_expanded blocks the event loop each time
+RESTORE_TIME_SLICE = 0.01
+
+
+class TreeItem:
+	"""A row of TreeModel, checked is None if the row has no checkbox and qualified_name the names from the module to the row (None for value rows).
+	The children of collapsible rows are created when they are expanded the first time (see TreeModel.fetchMore), until then value is the property they are created from.
+	"""
+	__slots__ = ("title", "color", "tooltip", "checked", "collapsed", "is_value", "parent", "children", "row", "value", "fetched", "qualified_name")
+
+	def __init__(self, title: str, color: str=None, tooltip: str=None, checked: bool=None, collapsed: bool=True, is_value: bool=False, parent=None, value: any=None, qualified_name: tuple=None):
+		self.title = title
+		self.color = color
+		self.tooltip = tooltip
+		self.checked = checked
+		self.collapsed = collapsed
+		self.is_value = is_value
+		self.parent = parent
+		self.children = []
+		self.row = 0
+		self.value = value
+		self.fetched = is_value # Value rows have no children
+		self.qualified_name = qualified_name
+
+
+class TreeModel(QAbstractItemModel):
+	"""Model of a tree generated by inspect_object (with the collapsed and checked keys of the trees stored by previous versions, if any).
+	get_type_color is called with the type of each member and returns it's color, font_color is the color of the other rows
+	and code_block a dictionary with the background_color and font_color of the value rows.
+	The state of the rows is kept in state, a dictionary {qualified name: {"collapsed": ..., "checked": ...}} of the rows that are expanded or unchecked (see needs_state),
+	the qualified name is a tuple of the names from the module to the row, e.g.: ("example", "content", "Person"). The other rows are collapsed and checked.
+	Toggling a row only updates it's entry so dump_state and filter_tree don't walk the rows nor the tree, and only the module and the expanded rows have their children created.
+	state (returned by dump_state) replaces the state from the collapsed and checked keys of the tree, state_changed is emitted when an entry changes.
+	"""
+	state_changed = pyqtSignal()
+
+	def __init__(self, tree: dict, get_type_color: callable, font_color: str, code_block: dict, root_tooltip: str=None, state: list=None, parent=None):
+		super().__init__(parent)
+
+		self.get_type_color = get_type_color
+		self.font_color = font_color
+		self.code_block = code_block
+		self.colors = {} # QColor by name, they are requested on every paint
+		self.tree, self.state = split_tree_state(tree)
+
+		if state is not None:
+			self.state = {tuple(qualified_name): row_state for qualified_name, row_state in state}
+		# The dictionaries copied by filter_tree by qualified name (() is the tree), None until it's called
+		self.filtered_copies = None
+		self.checked_changed = set() # Rows checked or unchecked since the last filter_tree
+
+		object_name = tuple(self.tree)[0]
+		object_properties = self.tree[object_name]
+
+		# The module has no checkbox and it's always expanded
+		module_item = TreeItem(object_name, self.get_type_color(object_properties["type"]), root_tooltip, collapsed=False, value=object_properties, qualified_name=(object_name, ))
+		module_item.children = self.create_children(module_item)
+		module_item.fetched = True
+
+		self.root_item = TreeItem(None, value={}) # Invisible, the module is it's only child
+		self.root_item.children = [module_item]
+		self.root_item.fetched = True
+		module_item.parent = self.root_item
+
+	def create_children(self, item: TreeItem) -> list:
+		"""Create the rows below item from it's value (the properties of an object, a list or a multiple line string).
+		"""
+		children = []
+
+		if isinstance(item.value, dict):
+			for property_name, property_value in item.value.items():
+				if is_collapsible(property_value):
+					if property_value: # Not empty
+						children.append(self.create_property_item(property_name, property_value, item))
+					continue
+
+				if isinstance(property_value, bool):
+					property_value = str(property_value)
+
+				children.append(TreeItem(f"{property_name}: {property_value if isinstance(property_value, str) else None}", is_value=True, parent=item))
+
+		elif isinstance(item.value, str):
+			children.append(TreeItem(item.value.strip(), is_value=True, parent=item))
+
+		else:
+			for nested_property_value in item.value:
+				if not nested_property_value: # Means empty
+					continue
+
+				children.append(TreeItem(str(nested_property_value), is_value=True, parent=item))
+
+		for row, child in enumerate(children):
+			child.row = row
+
+		return children
+
+	def create_property_item(self, property_name: str, property_value: any, parent_item: TreeItem) -> TreeItem:
+		"""Create the collapsible row of a property (a member, content, parameters, a parameter, a multiple line docstring, etc.).
+		"""
+		is_dict = isinstance(property_value, dict)
+
+		if is_dict and "type" in property_value: # Means a member (classes, functions, etc.)
+			color = self.get_type_color(property_value["type"])
+			tooltip = f"{property_name} {property_value['type']}"
+		elif is_dict and "annotation" in property_value: # Means a parameter
+			color = self.font_color
+			tooltip = property_name
+
+			if property_value["annotation"] is not None and property_value["default"] is not None:
+				tooltip += f" ({property_value['annotation']}={property_value['default']})"
+			elif property_value["annotation"] is not None:
+				tooltip += f" ({property_value['annotation']})"
+			elif property_value["default"] is not None:
+				tooltip += f"={property_value['default']}"
+		else:
+			color = self.font_color
+			tooltip = f"{parent_item.title}'s {'inheritance' if property_name == 'inherits' else property_name}"
+
+		qualified_name = parent_item.qualified_name + (property_name, )
+		checked, collapsed = get_property_state(property_name, property_value) # The default state, self.tree has no collapsed and checked keys
+		row_state = self.state.get(qualified_name)
+
+		if row_state is not None:
+			collapsed = row_state["collapsed"]
+			checked = row_state.get("checked", checked)
+
+		return TreeItem(property_name, color, tooltip, checked, collapsed, parent=parent_item, value=property_value, qualified_name=qualified_name)
+
+	def get_item(self, index: QModelIndex) -> TreeItem:
+		return index.internalPointer() if index.isValid() else self.root_item
+
+	def get_index(self, item: TreeItem) -> QModelIndex:
+		if item is self.root_item:
+			return QModelIndex()
+
+		return self.createIndex(item.row, 0, item)
+
+	def get_color(self, color: str) -> QColor:
+		if color not in self.colors:
+			self.colors[color] = QColor(color)
+
+		return self.colors[color]
+
+	def index(self, row: int, column: int, parent: QModelIndex=QModelIndex()) -> QModelIndex:
+		parent_item = self.get_item(parent)
+
+		if column != 0 or not 0 <= row < len(parent_item.children):
+			return QModelIndex()
+
+		return self.createIndex(row, column, parent_item.children[row])
+
+	def parent(self, index: QModelIndex) -> QModelIndex:
+		if not index.isValid():
+			return QModelIndex()
+
+		return self.get_index(index.internalPointer().parent)
+
+	def rowCount(self, parent: QModelIndex=QModelIndex()) -> int:
+		return len(self.get_item(parent).children)
+
+	def columnCount(self, parent: QModelIndex=QModelIndex()) -> int:
+		return 1
+
+	def hasChildren(self, parent: QModelIndex=QModelIndex()) -> bool:
+		item = self.get_item(parent)
+
+		if item.fetched:
+			return len(item.children) > 0
+
+		return True # Collapsible rows are only created for properties that are not empty
+
+	def canFetchMore(self, parent: QModelIndex) -> bool:
+		return not self.get_item(parent).fetched
+
+	def fetchMore(self, parent: QModelIndex) -> None:
+		item = self.get_item(parent)
+
+		if item.fetched:
+			return
+
+		children = self.create_children(item)
+
+		if len(children) > 0:
+			self.beginInsertRows(parent, 0, len(children) - 1)
+			item.children = children
+			self.endInsertRows()
+
+		item.fetched = True
+		item.value = None
+
+	def data(self, index: QModelIndex, role: int=Qt.DisplayRole):
+		if not index.isValid():
+			return None
+
+		item = index.internalPointer()
+
+		if role == Qt.DisplayRole:
+			return item.title
+		elif role == Qt.ToolTipRole:
+			return item.tooltip
+		elif role == Qt.CheckStateRole and item.checked is not None:
+			return Qt.Checked if item.checked else Qt.Unchecked
+		elif role == Qt.ForegroundRole:
+			color = self.code_block["font_color"] if item.is_value else item.color
+			return self.get_color(color) if color is not None else None
+		elif role == Qt.BackgroundRole and item.is_value:
+			return self.get_color(self.code_block["background_color"])
+
+		return None
+
+	def setData(self, index: QModelIndex, value: any, role: int=Qt.EditRole) -> bool:
+		if not index.isValid() or role != Qt.CheckStateRole or index.internalPointer().checked is None:
+			return False
+
+		item = index.internalPointer()
+		item.checked = value == Qt.Checked
+		self.set_state(item.qualified_name, item.collapsed, item.checked)
+		self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+
+		return True
+
+	def flags(self, index: QModelIndex):
+		if not index.isValid():
+			return Qt.NoItemFlags
+
+		flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+		if index.internalPointer().checked is not None:
+			flags |= Qt.ItemIsUserCheckable
+
+		return flags
+
+	def set_state(self, qualified_name: tuple, collapsed: bool, checked: bool) -> None:
+		"""Update the entry of a row in state, checked is None if the row has no checkbox.
+		"""
+		if len(qualified_name) == 1: # The module is always expanded
+			return
+
+		if (self.state.get(qualified_name, {}).get("checked") is False) != (checked is False):
+			self.checked_changed.add(qualified_name)
+
+		if not needs_state(qualified_name[-1], collapsed, checked):
+			if self.state.pop(qualified_name, None) is not None:
+				self.state_changed.emit()
+			return
+
+		row_state = {"collapsed": collapsed}
+
+		if checked is not None:
+			row_state["checked"] = checked
+
+		if self.state.get(qualified_name) != row_state:
+			self.state[qualified_name] = row_state # A new dictionary, the ones returned by dump_state are never modified
+			self.state_changed.emit()
+
+	def set_collapsed(self, index: QModelIndex, collapsed: bool) -> None:
+		item = self.get_item(index)
+		item.collapsed = collapsed
+		self.set_state(item.qualified_name, item.collapsed, item.checked)
+
+	def set_all_checked(self, index: QModelIndex, checked: bool) -> None:
+		"""Check or uncheck the row at index and all the rows below it with a checkbox (the ones not created yet only in state).
+		"""
+		stack = [self.get_item(index)]
+
+		while stack:
+			item = stack.pop()
+
+			if item.checked is not None:
+				item.checked = checked
+				self.set_state(item.qualified_name, item.collapsed, item.checked)
+
+			if not item.fetched:
+				self.set_properties_checked(item.qualified_name, item.value, checked)
+				continue
+
+			children = [child for child in item.children if child.checked is not None]
+
+			if len(children) > 0:
+				self.dataChanged.emit(self.get_index(item.children[0]), self.get_index(item.children[-1]), [Qt.CheckStateRole])
+
+			stack.extend(children)
+
+		self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+
+	def set_properties_checked(self, qualified_name: tuple, property_value: any, checked: bool) -> None:
+		"""Check or uncheck the rows with a checkbox the property at qualified_name would have below it, without creating them.
+		"""
+		if not isinstance(property_value, dict): # Lists and multiple line strings only have value rows
+			return
+
+		# Each item is (qualified name, properties)
+		stack = [(qualified_name, property_value)]
+
+		while stack:
+			qualified_name, object_properties = stack.pop()
+
+			for property_name, property_value in object_properties.items():
+				if not is_collapsible(property_value) or not property_value:
+					continue
+
+				property_qualified_name = qualified_name + (property_name, )
+
+				if property_name not in PROPERTIES_WITHOUT_CHECKBOX:
+					self.set_state(property_qualified_name, self.state.get(property_qualified_name, {"collapsed": True})["collapsed"], checked)
+
+				if isinstance(property_value, dict):
+					stack.append((property_qualified_name, property_value))
+
+	def iter_items(self):
+		"""Yield all the items created (except the invisible root) parents first.
+		"""
+		stack = list(reversed(self.root_item.children))
+
+		while stack:
+			item = stack.pop()
+			yield item
+			stack.extend(reversed(item.children))
+
+	def dump_state(self) -> list:
+		"""Return state as a JSON serializable list of [qualified name, {"collapsed": ..., "checked": ...}], to restore it later without the tree.
+		"""
+		return [[list(qualified_name), row_state] for qualified_name, row_state in self.state.items()]
+
+	def filter_tree(self) -> dict:
+		"""Return the tree without the unchecked rows (what is exported and converted to Markdown).
+		Only the dictionaries from the module to them are copied, the rest is shared with self.tree so it must not be modified.
+		The copies are kept and only the ones above the rows checked or unchecked since the last call are copied again,
+		so the members that didn't change are the same objects as the last time (see tree_to_markdown.MarkdownCache).
+		"""
+		if self.filtered_copies is None:
+			self.filtered_copies = {}
+			changed = [qualified_name for qualified_name, row_state in self.state.items() if row_state.get("checked") is False]
+		else:
+			changed = self.checked_changed
+
+		self.checked_changed = set()
+
+		# Children first, so their parents are copied with their new copy
+		for qualified_name in sorted({name[:depth] for name in changed for depth in range(len(name))}, key=len, reverse=True):
+			properties = self.tree
+
+			for name in qualified_name:
+				properties = properties[name]
+
+			self.filtered_copies[qualified_name] = {
+				property_name: self.filtered_copies.get(qualified_name + (property_name, ), property_value) 
+				for property_name, property_value in properties.items()
+				if self.state.get(qualified_name + (property_name, ), {}).get("checked") is not False
+			}
+
+		return self.filtered_copies.get((), self.tree)
+
+
+def is_collapsible(property_value: any) -> bool:
+	"""Whether a property is shown as a collapsible row (with the property in the rows below) or a value row.
+	"""
+	return isinstance(property_value, (list, tuple, dict)) or (isinstance(property_value, str) and "\n" in property_value)
+
+def get_property_state(property_name: str, property_value: any):
+	"""Return (checked, collapsed) of the collapsible row of a property from the collapsed and checked keys (see STATE_KEYS), checked is None if it has no checkbox.
+	"""
+	is_dict = isinstance(property_value, dict)
+	checked = None
+
+	if property_name not in PROPERTIES_WITHOUT_CHECKBOX:
+		checked = property_value.get("checked", True) if is_dict else True
+
+		if property_name in PROPERTIES_DISABLED_BY_DEFAULT and not (is_dict and "checked" in property_value):
+			checked = False
+
+	collapsed = property_value.get("collapsed", True) if is_dict else True
+
+	return checked, collapsed
+
+def needs_state(property_name: str, collapsed: bool, checked: bool) -> bool:
+	"""Whether the state of a row is kept in TreeModel.state, if it's expanded, unchecked or checked when it's unchecked by default.
+	"""
+	return not collapsed or checked is False or (checked is True and property_name in PROPERTIES_DISABLED_BY_DEFAULT)
+
+def split_tree_state(tree: dict):
+	"""Return (tree without the collapsed and checked keys, state of the expanded or unchecked rows by qualified name), see TreeModel.
+	The tree is copied (only the dictionaries), it's not modified.
+	"""
+	object_name = tuple(tree)[0]
+	result = {object_name: {}}
+	state = {}
+	# Each item is (properties, qualified name, dictionary where they are copied)
+	stack = [(tree[object_name], (object_name, ), result[object_name])]
+
+	while stack:
+		object_properties, qualified_name, content = stack.pop()
+
+		for property_name, property_value in object_properties.items():
+			if property_name in STATE_KEYS:
+				continue
+
+			property_qualified_name = qualified_name + (property_name, )
+
+			if is_collapsible(property_value) and property_value:
+				checked, collapsed = get_property_state(property_name, property_value)
+
+				if needs_state(property_name, collapsed, checked):
+					state[property_qualified_name] = {"collapsed": collapsed} if checked is None else {"collapsed": collapsed, "checked": checked}
+
+			if isinstance(property_value, dict):
+				content[property_name] = {}
+				stack.append((property_value, property_qualified_name, content[property_name]))
+				continue
+
+			content[property_name] = property_value
+
+	return result, state
+
+
+class TreeView(QTreeView):
+	"""Tree tab, the expanded rows are stored in the model (see TreeModel.state) and right clicking a collapsible row shows the same actions as CollapsibleWidget.
+	"""
+	restore_progress = pyqtSignal(int, int) # Rows expanded, rows to expand
+	restore_finished = pyqtSignal()
+
+	def __init__(self, model: TreeModel, parent=None):
+		super().__init__(parent=parent)
+
+		self.setModel(model)
+		self.setHeaderHidden(True)
+		self.setUniformRowHeights(False) # Docstrings have multiple lines
+		self.setWordWrap(True)
+		self.setSelectionMode(QAbstractItemView.NoSelection)
+		self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+
+		self.expanded.connect(self.item_expanded)
+		self.collapsed.connect(lambda index: model.set_collapsed(index, True))
+
+		# Owned by the view so it stops if the view is deleted while restoring
+		self.restore_timer = QTimer(self)
+		self.restore_timer.setSingleShot(True)
+		self.restore_timer.timeout.connect(self.restore_step)
+
+		self.restore_expanded()
+
+		self.setContextMenuPolicy(Qt.CustomContextMenu)
+		self.customContextMenuRequested.connect(self.context_menu)
+
+	def item_expanded(self, index: QModelIndex) -> None:
+		self.model().set_collapsed(index, False)
+
+		# The view only fetches the rows when it's laid out, not when expanding them from code (restore_expanded, set_children_expanded)
+		if self.model().canFetchMore(index):
+			self.model().fetchMore(index)
+
+	def restore_expanded(self) -> None:
+		"""Expand the rows stored as expanded in the event loop, blocking it at most RESTORE_TIME_SLICE seconds each time (a big module can have thousands of them).
+		Emits restore_progress after each step and restore_finished at the end, starts once the event loop runs so they can be connected after creating the view.
+		"""
+		self.rows_to_expand = 1 + sum(not row_state["collapsed"] for row_state in self.model().state.values()) # The module is always expanded
+		self.rows_expanded = 0
+		self.items_to_restore = self.model().iter_items()
+
+		self.restore_timer.start(0)
+
+	def restore_step(self) -> None:
+		deadline = time.perf_counter() + RESTORE_TIME_SLICE
+
+		for item in self.items_to_restore:
+			if item.is_value or item.collapsed:
+				continue
+
+			index = self.model().get_index(item)
+
+			# Inserting the rows before expanding is faster than inserting them into an expanded row
+			if self.model().canFetchMore(index):
+				self.model().fetchMore(index)
+
+			self.setExpanded(index, True)
+			self.rows_expanded += 1
+
+			if time.perf_counter() > deadline:
+				self.restore_progress.emit(self.rows_expanded, self.rows_to_expand)
+				self.restore_timer.start(0)
+				return
+
+		self.restore_progress.emit(self.rows_to_expand, self.rows_to_expand)
+		self.restore_finished.emit()
+
+	def context_menu(self, point) -> None:
+		index = self.indexAt(point)
+
+		if not index.isValid() or index.internalPointer().is_value:
+			return
+
+		menu = create_menu(
+			{
+				"Fold": {
+					"callback": lambda: self.collapse(index),
+				},
+				"Unfold": {
+					"callback": lambda: self.expand(index),
+				},
+				"Fold all": {
+					"callback": lambda: self.set_children_expanded(index, False),
+				},
+				"Unfold all": {
+					"callback": lambda: self.set_children_expanded(index, True),
+				},
+				"Check all": {
+					"callback": lambda: self.model().set_all_checked(index, True),
+				},
+				"Uncheck all": {
+					"callback": lambda: self.model().set_all_checked(index, False),
+				},
+			},
+			parent=self
+		)
+
+		menu.exec_(QCursor.pos())
+
+	def set_children_expanded(self, index: QModelIndex, expanded: bool) -> None:
+		"""Expand or collapse the collapsible rows right below index, expanding them also expands index.
+		"""
+		if expanded:
+			self.expand(index) # Creates the rows below index if they were not (see item_expanded)
+
+		for row in range(self.model().rowCount(index)):
+			child_index = self.model().index(row, 0, index)
+
+			if not child_index.internalPointer().is_value:
+				self.setExpanded(child_index, expanded)
@@ -43,5 +43,8 @@ setup(
   license="MIT", 
   packages=find_packages(),
   install_requires=requirements, 
+  entry_points={
+    "console_scripts": ["pyapireference=pyapireference.cli:main"]
+  }, 
   long_description_content_type="text/markdown"
 )
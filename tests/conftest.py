@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+from pyapireference.inspect_object import inspect_object, get_module_from_path, build_tree as build_tree_from_events
+
+EXAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "example.py")
+
+
+@pytest.fixture
+def example_path() -> str:
+	return EXAMPLE_PATH
+
+@pytest.fixture
+def example_module(example_path):
+	module, error = get_module_from_path(example_path)
+	assert error is None
+
+	return module
+
+@pytest.fixture
+def example_tree(example_module) -> dict:
+	return inspect_object(example_module)
+
+@pytest.fixture
+def build_tree() -> callable:
+	"""Build the tree (as inspect_object returns it) from the events of iter_object_events, iter_sandboxed_events, etc.
+	"""
+	return build_tree_from_events
@@ -0,0 +1,52 @@
+import os
+import json
+
+from pyapireference.cli import main
+from pyapireference.tree_to_markdown import convert_tree_to_markdown
+
+
+def read(path: str) -> str:
+	with open(path) as file:
+		return file.read()
+
+def test_export_formats(example_path, example_tree, tmp_path, capsys):
+	assert main([example_path, "-f", "json", "md", "html", "rst", "-o", str(tmp_path)]) == 0
+
+	paths = capsys.readouterr().out.splitlines()
+	assert paths == [str(tmp_path / f"example.{format_}") for format_ in ("json", "md", "html", "rst")]
+
+	assert json.loads(read(paths[0])) == example_tree
+	assert read(paths[1]) == convert_tree_to_markdown(example_tree)
+	assert read(paths[2]).startswith("<!DOCTYPE html>")
+	assert "example" in read(paths[3])
+
+def test_static_equals_dynamic(example_path, tmp_path):
+	assert main([example_path, "-f", "json", "-o", str(tmp_path / "dynamic")]) == 0
+	assert main([example_path, "-f", "json", "--static", "-o", str(tmp_path / "static")]) == 0
+
+	assert read(tmp_path / "static" / "example.json") == read(tmp_path / "dynamic" / "example.json")
+
+def test_cache(example_path, tmp_path):
+	args = [example_path, "-f", "md", "-o", str(tmp_path), "--cache-dir", str(tmp_path / "cache")]
+
+	assert main(args) == 0
+	first_markdown = read(tmp_path / "example.md")
+	assert os.listdir(tmp_path / "cache")
+
+	assert main(args) == 0 # From the cache
+	assert read(tmp_path / "example.md") == first_markdown
+
+def test_missing_path(tmp_path, capsys):
+	assert main([str(tmp_path / "missing.py"), "-o", str(tmp_path)]) == 1
+	assert "no such file or directory" in capsys.readouterr().err
+
+def test_broken_module(tmp_path, capsys):
+	path = tmp_path / "broken.py"
+	path.write_text("raise ValueError('broken')\n")
+
+	assert main([str(path), "-o", str(tmp_path)]) == 1
+	assert "ValueError" in capsys.readouterr().err
+	assert not (tmp_path / "broken.md").exists()
+
+def test_invalid_exclude_type(example_path, tmp_path):
+	assert main([example_path, "--exclude", "types.NotAType", "-o", str(tmp_path)]) == 2
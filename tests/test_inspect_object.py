@@ -0,0 +1,125 @@
+import os
+import sys
+import types
+import inspect
+import threading
+
+import pytest
+
+from pyapireference.inspect_object import inspect_object, get_object_content, iter_object_events, iter_tree_events, get_module_from_path, resolve_reference, ModuleOwnership, ProgressThrottle, InspectionCancelled
+
+
+def test_events_equal_inspect_object(example_module, example_tree, build_tree):
+	assert build_tree(iter_object_events(example_module)) == example_tree
+	assert build_tree(iter_tree_events(example_tree)) == example_tree
+
+def create_nested_module(module_name: str, depth: int) -> types.ModuleType:
+	"""Return a module with a class nested depth times: Class_0.Class_1...
+	"""
+	module = types.ModuleType(module_name)
+	parent = module
+
+	for index in range(depth):
+		class_ = type(f"Class_{index}", (), {"__module__": module_name})
+		setattr(parent, class_.__name__, class_)
+		parent = class_
+
+	return module
+
+def test_max_depth(monkeypatch):
+	module = create_nested_module("nested", 5)
+	monkeypatch.setitem(sys.modules, "nested", module)
+
+	tree = inspect_object(module, max_depth=2)
+	class_0 = tree["nested"]["content"]["Class_0"]
+
+	assert tuple(class_0["content"]) == ("Class_1", )
+	assert class_0["content"]["Class_1"]["truncated"] is True
+	assert "content" not in class_0["content"]["Class_1"]
+	assert get_object_content(module, max_depth=2) == tree["nested"]["content"] # Same depth
+
+def test_deep_nesting(monkeypatch):
+	depth = sys.getrecursionlimit() * 2
+	module = create_nested_module("nested", depth)
+	monkeypatch.setitem(sys.modules, "nested", module)
+
+	properties = inspect_object(module, max_depth=depth + 1)["nested"]
+
+	for index in range(depth):
+		properties = properties["content"][f"Class_{index}"]
+
+	assert properties["content"] == {}
+
+def test_references(tmp_path):
+	path = tmp_path / "references.py"
+	path.write_text("class Node:\n\tpass\n\nNode.parent = Node\n\ndef function():\n\tpass\n\nalias = function\n")
+	module, error = get_module_from_path(str(path))
+	assert error is None
+
+	tree = inspect_object(module)
+	content = tree["references"]["content"]
+
+	assert content["Node"]["content"]["parent"] == {"type": "class", "docstring": None, "reference": "references/Node"}
+	assert content["alias"] == {"type": "function", "docstring": None, "reference": "references/function"}
+	assert resolve_reference(tree, content["alias"]["reference"]) is content["function"]
+	assert resolve_reference(tree, content["Node"]["content"]["parent"]["reference"]) is content["Node"]
+
+def test_module_ownership(example_module):
+	module_ownership = ModuleOwnership()
+	members = [
+		example_module, os, os.path.join, len, 1, "text", None, example_module.Person, example_module.Person("name", "last name", 1),
+		test_module_ownership.__code__, sys._getframe(), *vars(example_module).values()
+	]
+
+	for member in members:
+		expected_module = inspect.getmodule(member)
+		assert module_ownership.get_module_name(member) == (expected_module.__name__ if expected_module is not None else None), member
+
+def test_build_tree_progress(example_module, example_tree, build_tree):
+	members_entered = []
+	tree = build_tree(iter_object_events(example_module), member_entered=lambda *args: members_entered.append(args))
+
+	def get_qualified_names(content: dict, prefix: str="") -> list:
+		result = []
+
+		for member_name, member_props in content.items():
+			result.append(prefix + member_name)
+			result += get_qualified_names(member_props.get("content", {}), f"{prefix}{member_name}.")
+
+		return result
+
+	assert tree == example_tree
+	assert members_entered == list(enumerate(get_qualified_names(example_tree), start=1))
+	assert (4, "example.Person") in members_entered
+
+def test_build_tree_cancel(example_module, build_tree):
+	cancel_event = threading.Event()
+	events = iter_object_events(example_module)
+	members_entered = []
+
+	def member_entered(members_inspected: int, qualified_name: str):
+		members_entered.append(qualified_name)
+
+		if members_inspected == 3:
+			cancel_event.set()
+
+	with pytest.raises(InspectionCancelled):
+		build_tree(events, cancel_event, member_entered)
+
+	assert len(members_entered) == 3 # Stopped at the next event
+	assert events.gi_frame is None # Closed
+
+def test_progress_throttle():
+	now = 0
+	calls = []
+	throttle = ProgressThrottle(lambda *args: calls.append(args), 1, clock=lambda: now)
+
+	for now, members_inspected in ((0, 1), (0.5, 2), (1, 3), (1.5, 4), (3, 5)):
+		throttle(members_inspected, "name")
+
+	assert calls == [(1, "name", 0), (3, "name", 1), (5, "name", 3)]
+
+	now = 10
+	throttle.start()
+	throttle(1, "other")
+	assert calls[-1] == (1, "other", 0) # Never dropped after start
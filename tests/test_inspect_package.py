@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from pyapireference.cli import main
+from pyapireference.inspect_package import inspect_package, find_package_modules
+
+MODULES = {
+	"__init__.py": '"""Package docstring."""\n',
+	"good.py": "def function(a: int=1):\n\tpass\n",
+	"relative.py": "from .good import function\n\nclass Class:\n\tpass\n",
+	"loop.py": "while True:\n\tpass\n",
+	"exiting.py": "import sys\nsys.exit(1)\n",
+	"crash.py": "import os\nos._exit(1)\n",
+	"raising.py": "raise ValueError('raising')\n",
+}
+FAILING = ("package.crash", "package.exiting", "package.loop", "package.raising")
+
+
+@pytest.fixture
+def package_path(tmp_path):
+	path = tmp_path / "package"
+	path.mkdir()
+
+	for filename, source in MODULES.items():
+		(path / filename).write_text(source)
+
+	return str(path)
+
+def test_find_package_modules(package_path, tmp_path):
+	modules, root = find_package_modules(package_path)
+
+	assert root == str(tmp_path)
+	assert [module_name for module_name, _ in modules] == ["package", "package.crash", "package.exiting", "package.good", "package.loop", "package.raising", "package.relative"]
+
+def test_failing_modules(package_path):
+	start = time.perf_counter()
+	tree = inspect_package(package_path, max_workers=2, timeout=2)
+	assert time.perf_counter() - start < 20
+
+	content = tree["package"]["content"]
+	assert tuple(content) == ("package", "package.crash", "package.exiting", "package.good", "package.loop", "package.raising", "package.relative")
+
+	for module_name in FAILING:
+		assert content[module_name]["error"], module_name
+
+	assert "ValueError" in content["package.raising"]["error"]
+	assert content["package.good"]["content"]["function"]["parameters"]["a"]["default"] == "1"
+	assert tuple(content["package.relative"]["content"]) == ("Class", )
+
+def test_static(package_path):
+	content = inspect_package(package_path, static=True, max_workers=2)["package"]["content"]
+
+	assert not any("error" in module_props for module_props in content.values())
+	assert content["package"]["docstring"] == "Package docstring."
+
+def test_cli_reports_failing_modules(package_path, tmp_path, capsys):
+	assert main([package_path, "-f", "md", "--timeout", "2", "-j", "2", "-o", str(tmp_path / "output")]) == 1
+
+	error = capsys.readouterr().err
+	for module_name in FAILING:
+		assert f"couldn't inspect {module_name}" in error
+
+	with open(tmp_path / "output" / "package.md") as file:
+		assert "could not be inspected" in file.read()
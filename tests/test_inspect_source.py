@@ -0,0 +1,82 @@
+import pytest
+
+from pyapireference.inspect_source import inspect_source, inspect_source_code
+
+SOURCE = '''"""Module docstring."""
+import os
+from os import path
+
+A, B = 1, "b"
+SIZE: int = 3
+ANNOTATED: str
+square = lambda x: x * x
+
+class Base:
+	"""Base docstring."""
+	def method(self, a: int, /, b: str="x", *args, c=None, **kwargs) -> bool:
+		pass
+
+class Left(Base):
+	pass
+
+class Right(Base):
+	pass
+
+class Child(Left, Right):
+	@staticmethod
+	def create():
+		pass
+
+if __name__ == "__main__":
+	MAIN = True
+'''
+
+
+def test_example_equals_inspect_object(example_path, example_tree):
+	assert inspect_source(example_path) == example_tree
+
+def test_members():
+	content = inspect_source_code(SOURCE, "module")["module"]["content"]
+
+	assert tuple(content) == ("A", "B", "SIZE", "square", "Base", "Left", "Right", "Child")
+	assert content["A"] == {"type": "int", "docstring": None, "value": "1"}
+	assert content["B"] == {"type": "str", "docstring": None, "value": "'b'"}
+	assert content["square"]["type"] == "function"
+	assert content["Child"]["content"]["create"]["type"] == "staticmethod"
+
+def test_imported_members():
+	content = inspect_source_code(SOURCE, "module", include_imported_members=True)["module"]["content"]
+	assert content["path"] == {"type": "import", "docstring": None, "value": "from os import path"}
+	assert "os" not in content # types.ModuleType is excluded
+
+	content = inspect_source_code(SOURCE, "module", exclude_types=(), include_imported_members=True)["module"]["content"]
+	assert content["os"]["type"] == "module"
+
+def test_parameters():
+	method = inspect_source_code(SOURCE, "module")["module"]["content"]["Base"]["content"]["method"]
+
+	assert {name: parameter["kind"] for name, parameter in method["parameters"].items()} == {
+		"self": "positional-only",
+		"a": "positional-only",
+		"b": "positional or keyword",
+		"args": "variadic positional",
+		"c": "keyword-only",
+		"kwargs": "variadic keyword",
+	}
+	assert method["parameters"]["a"]["annotation"] == "int"
+	assert method["parameters"]["b"]["default"] == "x"
+	assert method["return_annotation"] == "bool"
+
+def test_inheritance_order():
+	content = inspect_source_code(SOURCE, "module")["module"]["content"]
+	assert content["Child"]["inherits"] == ["Left", "Right", "Base"] # Same as Child.__mro__
+
+def test_module_is_not_executed(tmp_path):
+	path = tmp_path / "exiting.py"
+	path.write_text("import sys\nsys.exit(1)\n\ndef function():\n\tpass\n")
+
+	assert tuple(inspect_source(str(path))["exiting"]["content"]) == ("function", )
+
+def test_syntax_error():
+	with pytest.raises(SyntaxError):
+		inspect_source_code("def function(:\n", "module")
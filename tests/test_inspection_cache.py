@@ -0,0 +1,67 @@
+import os
+import shutil
+import types
+
+from pyapireference.cli import main
+from pyapireference.inspection_cache import InspectionCache, get_inspection_settings
+from pyapireference.tree_to_markdown import convert_tree_to_markdown
+
+
+def test_get_set(tmp_path):
+	module_path = tmp_path / "module.py"
+	module_path.write_text("A = 1\n")
+	cache = InspectionCache(str(tmp_path / "cache"))
+	key = cache.get_key(str(module_path), get_inspection_settings("module", types.ModuleType))
+	tree = {"module": {"type": "module", "docstring": None, "content": {}}}
+
+	assert cache.get(key) is None
+
+	cache.set(key, tree)
+	assert cache.get(key) == tree
+	assert [path for path in os.listdir(os.path.dirname(cache.get_path(key))) if path.endswith(".tmp")] == []
+
+	cache.clear()
+	assert cache.get(key) is None
+
+def test_key(tmp_path):
+	module_path = tmp_path / "module.py"
+	module_path.write_text("A = 1\n")
+	cache = InspectionCache(str(tmp_path / "cache"))
+	settings = get_inspection_settings("module", (types.ModuleType, types.FunctionType))
+
+	key = cache.get_key(str(module_path), settings)
+	# Types or their names, in any order
+	assert cache.get_key(str(module_path), get_inspection_settings("module", ("types.FunctionType", "types.ModuleType"))) == key
+	assert cache.get_key(str(module_path), get_inspection_settings("module", (types.ModuleType, types.FunctionType), static=True)) != key
+	assert cache.get_key(str(module_path), get_inspection_settings("module", (types.ModuleType, types.FunctionType), max_depth=1)) != key
+
+	module_path.write_text("A = 2\n")
+	assert cache.get_key(str(module_path), settings) != key
+
+def test_corrupted_file(tmp_path):
+	cache = InspectionCache(str(tmp_path / "cache"))
+	key = "ab" + "0" * 62
+	os.makedirs(os.path.dirname(cache.get_path(key)))
+
+	with open(cache.get_path(key), "w") as file:
+		file.write('{"module": ')
+
+	assert cache.get(key) is None
+
+def test_package_and_module_share_entries(example_path, example_tree, tmp_path):
+	# The modules of a package are stored like standalone modules, so both modes can read the entries of the other one
+	package_path = tmp_path / "modules"
+	package_path.mkdir()
+	shutil.copy(example_path, package_path / "example.py")
+	cache_args = ["-f", "md", "--cache-dir", str(tmp_path / "cache")]
+
+	assert main([str(package_path), "-o", str(tmp_path / "package"), *cache_args]) == 0
+	assert main([str(package_path / "example.py"), "-o", str(tmp_path / "module"), *cache_args]) == 0 # From the entry of the package
+	assert (tmp_path / "module" / "example.md").read_text() == convert_tree_to_markdown(example_tree)
+
+	package_markdown = (tmp_path / "package" / "modules.md").read_text()
+	InspectionCache(str(tmp_path / "cache")).clear()
+
+	assert main([str(package_path / "example.py"), "-o", str(tmp_path / "module"), *cache_args]) == 0
+	assert main([str(package_path), "-o", str(tmp_path / "package"), *cache_args]) == 0 # From the entry of the module
+	assert (tmp_path / "package" / "modules.md").read_text() == package_markdown
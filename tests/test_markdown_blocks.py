@@ -0,0 +1,62 @@
+import commonmark
+
+from pyapireference.tree_to_html import write_tree_html_body
+from pyapireference.markdown_blocks import markdown_to_blocks, get_block_operations
+
+TREE = {"module": {"type": "module", "docstring": "Module docstring.", "content": {
+	"function": {"type": "function", "docstring": "Function docstring.", "parameters": {}},
+	"CONSTANT": {"type": "str", "docstring": None, "value": "'text'"},
+}}}
+
+
+def test_markdown_blocks():
+	text = "module\n---\nModule docstring.\n\n- item 1\n- item 2\n\n```\ncode\n```\n\n### `function (function)`\n"
+	blocks = markdown_to_blocks(text)
+
+	assert len(blocks) == 5
+	assert "".join(blocks) == commonmark.commonmark(text)
+
+def test_tree_blocks():
+	fragments = []
+	write_tree_html_body(fragments.append, TREE)
+	blocks = markdown_to_blocks("ignored", TREE)
+
+	assert len(blocks) == 4 # Docstring, members and footer
+	assert "".join(blocks) == "".join(fragments)
+
+def replay(blocks: list, operations: list) -> list:
+	"""Apply the operations to a copy of blocks like patchBlocks in the page.
+	"""
+	blocks = list(blocks)
+
+	for start, delete_count, new_blocks in operations:
+		blocks[start:start + delete_count] = new_blocks
+
+	return blocks
+
+def get_operations(old_blocks: list, blocks: list) -> list:
+	operations = get_block_operations([hash(block) for block in old_blocks], blocks)
+	assert replay(old_blocks, operations) == blocks
+
+	return operations
+
+def test_block_operations():
+	blocks = ["<p>a</p>", "<p>b</p>", "<p>c</p>", "<p>d</p>"]
+
+	assert get_operations(blocks, blocks) == []
+	assert get_operations([], blocks) == [[0, 0, blocks]]
+	assert get_operations(blocks, []) == [[0, 4, []]]
+	# Insert, delete and replace
+	assert get_operations(blocks, ["<p>a</p>", "<p>new</p>", "<p>b</p>", "<p>c</p>", "<p>d</p>"]) == [[1, 0, ["<p>new</p>"]]]
+	assert get_operations(blocks, ["<p>a</p>", "<p>c</p>", "<p>d</p>"]) == [[1, 1, []]]
+	assert get_operations(blocks, ["<p>a</p>", "<p>B</p>", "<p>c</p>", "<p>d</p>"]) == [[1, 1, ["<p>B</p>"]]]
+
+def test_mixed_block_operations():
+	blocks = ["<p>a</p>", "<p>b</p>", "<p>c</p>", "<p>d</p>", "<p>e</p>"]
+	operations = get_operations(blocks, ["<p>new</p>", "<p>a</p>", "<p>B</p>", "<p>c</p>", "<p>e</p>", "<p>f</p>"])
+
+	assert len(operations) == 4
+	assert [operation[0] for operation in operations] == sorted((operation[0] for operation in operations), reverse=True) # From the end
+
+	old_text = "Title\n---\nDocstring.\n\n- item 1\n- item 2\n\n```\ncode\n```\n\nLast paragraph.\n"
+	get_operations(markdown_to_blocks(old_text), markdown_to_blocks(old_text.replace("- item 2\n", "- item 2\n\nNew paragraph.\n").replace("Docstring", "Edited")))
@@ -0,0 +1,33 @@
+import pytest
+
+from pyapireference.tree_to_markdown import convert_tree_to_markdown
+from pyapireference.ui.markdownhighlighter import tokenize
+
+TOKENS = {
+	"#### `Person.__init__ (method)`": ((0, 31, "HeaderAtx"), ),
+	"***": ((0, 3, "HR"), ),
+	"plain text": ((0, 10, "Default"), ),
+	"- `a (int=1)`": ((0, 2, "UnorderedList"), (2, 11, "CodeSpan")),
+	"_Created using **PyAPIReference**._": (
+		(0, 1, "uItalic"), (1, 14, "uItalic"), (15, 2, "Bold"), (17, 14, "Bold"), (31, 2, "Bold"), (33, 1, "uItalic"), (34, 1, "uItalic")
+	),
+	"> - **bold** and `code` [link](url)": (
+		(0, 2, "BlockQuote"), (2, 2, "UnorderedList"), (4, 2, "Bold"), (6, 4, "Bold"), (10, 2, "Bold"),
+		(12, 5, "Default"), (17, 6, "CodeSpan"), (23, 1, "Default"), (24, 11, "Link")
+	),
+}
+
+
+@pytest.mark.parametrize("text", TOKENS)
+def test_tokenize(text):
+	assert tokenize(text) == TOKENS[text]
+
+def test_tokens_cover_lines(example_tree):
+	for line in convert_tree_to_markdown(example_tree).splitlines():
+		position = 0
+
+		for start, length, _ in tokenize(line):
+			assert start == position, line
+			position += length
+
+		assert position == len(line), line
@@ -0,0 +1,56 @@
+import pytest
+
+from pyapireference.safety_check import check_source, check_file
+
+# Source and line numbers of the calls
+NOT_SAFE = {
+	"call": ("def test():\n\tpass\ntest()\n", [3]),
+	"loop": ("def test():\n\tpass\nfor i in range(2):\n\ttest()\n", [4]),
+	"reassignment": ("def test():\n\tpass\nx = test\nx()\n", [4]),
+	"nested reassignment": ("def test():\n\tpass\nx = test\ny = x\ny()\n", [5]),
+	"class": ("class Test:\n\tdef run(self):\n\t\tpass\nt = Test()\nt.run()\n", [4, 5]),
+	"from import": ("from file import test\ntest()\n", [2]),
+	"import": ("import test\ntest.run()\n", [2]),
+	"class body": ("def test():\n\tpass\nclass Test:\n\tvalue = test()\n", [4]),
+	"decorator": ("def test():\n\treturn print\n@test()\ndef run():\n\tpass\n", [3]),
+	"default": ("def test():\n\tpass\ndef run(value=test()):\n\tpass\n", [3]),
+}
+
+SAFE = {
+	"string": "def test():\n\tpass\ntext = 'test()'\n",
+	"comment": "def test():\n\tpass\n# test()\n",
+	"function body": "def test():\n\tpass\ndef run():\n\ttest()\n",
+	"builtin": "print('hello')\n",
+	"lambda": "def test():\n\tpass\nrun = lambda: test()\n",
+}
+
+
+@pytest.mark.parametrize("source, line_numbers", NOT_SAFE.values(), ids=NOT_SAFE.keys())
+def test_not_safe(source, line_numbers):
+	not_safe_lines, name_main = check_source(source.encode())
+
+	assert [index for index, _ in not_safe_lines] == line_numbers
+	assert not name_main
+
+@pytest.mark.parametrize("source", SAFE.values(), ids=SAFE.keys())
+def test_safe(source):
+	assert check_source(source.encode()) == ([], False)
+
+def test_name_main():
+	source = "def test():\n\tpass\nif __name__ == '__main__':\n\ttest()\n"
+	assert check_source(source.encode()) == ([], True)
+
+def test_lines():
+	source = "import test\n\ntest.run()\nx = 1\ntest.stop()\n"
+	assert check_source(source.encode()) == ([(3, "test.run()"), (5, "test.stop()")], False)
+
+def test_syntax_error():
+	assert check_source(b"def test(:\n") == ([], False)
+
+def test_check_file(tmp_path):
+	path = tmp_path / "module.py"
+	path.write_text("import test\ntest.run()\n")
+	assert check_file(str(path)) == ([(2, "test.run()")], False)
+
+	path.write_text("import test\n")
+	assert check_file(str(path)) == ([], False) # Not the cached result of the old source
@@ -0,0 +1,159 @@
+import os
+import time
+import threading
+
+import pytest
+
+from pyapireference.inspect_object import InspectionCancelled
+from pyapireference.inspect_package import inspect_package
+from pyapireference.sandbox import iter_sandboxed_events, InspectionServer, SandboxError, SERVER_AVAILABLE
+
+FAILING_MODULES = {
+	"loop": "while True:\n\tpass\n",
+	"exiting": "import sys\nsys.exit(0)\n",
+	"crash": "import os\nos._exit(0)\n",
+	"raising": "raise ValueError('raising')\n",
+}
+
+
+def write_module(directory, module_name: str, source: str) -> str:
+	path = directory / f"{module_name}.py"
+	path.write_text(source)
+
+	return str(path)
+
+def test_example_equals_inspect_object(build_tree, example_path, example_tree):
+	assert build_tree(iter_sandboxed_events(example_path)) == example_tree
+
+def test_prints(build_tree, tmp_path):
+	path = write_module(tmp_path, "printing", "import os\nprint('{}')\nos.write(1, b'not json\\n')\n\ndef function():\n\tpass\n")
+
+	assert tuple(build_tree(iter_sandboxed_events(path))["printing"]["content"]) == ("function", )
+
+@pytest.mark.parametrize("module_name", FAILING_MODULES)
+def test_failing_module(build_tree, tmp_path, module_name):
+	path = write_module(tmp_path, module_name, FAILING_MODULES[module_name])
+
+	start = time.perf_counter()
+
+	with pytest.raises(SandboxError):
+		build_tree(iter_sandboxed_events(path, timeout=2))
+
+	assert time.perf_counter() - start < 10
+
+def test_error_message(build_tree, tmp_path):
+	path = write_module(tmp_path, "raising", FAILING_MODULES["raising"])
+
+	with pytest.raises(SandboxError, match="ValueError: raising"):
+		build_tree(iter_sandboxed_events(path))
+
+	path = write_module(tmp_path, "loop", FAILING_MODULES["loop"])
+
+	with pytest.raises(SandboxError, match="more than 1 seconds"):
+		build_tree(iter_sandboxed_events(path, timeout=1))
+
+@pytest.mark.skipif(os.name != "posix", reason="memory_limit only works on Unix")
+def test_memory_limit(build_tree, tmp_path):
+	path = write_module(tmp_path, "hog", "data = bytearray(2 * 1024 ** 3)\n")
+
+	with pytest.raises(SandboxError, match="MemoryError"):
+		build_tree(iter_sandboxed_events(path, memory_limit=512))
+
+def test_cancel(build_tree, tmp_path):
+	path = write_module(tmp_path, "loop", FAILING_MODULES["loop"])
+	cancel_event = threading.Event()
+	threading.Timer(0.5, cancel_event.set).start()
+
+	start = time.perf_counter()
+
+	with pytest.raises(InspectionCancelled):
+		build_tree(iter_sandboxed_events(path, cancel_event=cancel_event))
+
+	assert time.perf_counter() - start < 5
+
+def test_cancel_between_members(build_tree, example_path):
+	cancel_event = threading.Event()
+	members_entered = []
+
+	def member_entered(members_inspected: int, qualified_name: str):
+		members_entered.append(qualified_name)
+		cancel_event.set()
+
+	with pytest.raises(InspectionCancelled):
+		build_tree(iter_sandboxed_events(example_path, cancel_event=cancel_event), cancel_event, member_entered)
+
+	assert members_entered == ["example"]
+
+def test_cancel_package(tmp_path):
+	package_path = tmp_path / "package"
+	package_path.mkdir()
+
+	for index in range(4):
+		write_module(package_path, f"loop{index}", FAILING_MODULES["loop"])
+
+	cancel_event = threading.Event()
+	threading.Timer(0.5, cancel_event.set).start()
+
+	start = time.perf_counter()
+
+	with pytest.raises(InspectionCancelled):
+		inspect_package(str(package_path), sandbox=True, max_workers=2, cancel_event=cancel_event)
+
+	assert time.perf_counter() - start < 5
+
+def test_package(tmp_path):
+	package_path = tmp_path / "package"
+	package_path.mkdir()
+	write_module(package_path, "__init__", "")
+	write_module(package_path, "good", "def function():\n\tpass\n")
+	write_module(package_path, "relative", "from .good import function\n\nclass Class:\n\tpass\n")
+
+	for module_name, source in FAILING_MODULES.items():
+		write_module(package_path, module_name, source)
+
+	content = inspect_package(str(package_path), sandbox=True, max_workers=2, timeout=2)["package"]["content"]
+
+	for module_name in FAILING_MODULES:
+		assert content[f"package.{module_name}"]["error"], module_name
+
+	assert tuple(content["package.good"]["content"]) == ("function", )
+	assert tuple(content["package.relative"]["content"]) == ("Class", )
+
+@pytest.mark.skipif(not SERVER_AVAILABLE, reason="the inspection server needs os.fork")
+def test_server(build_tree, example_path, example_tree, tmp_path):
+	inspection_server = InspectionServer()
+
+	try:
+		for _ in range(2): # The second time the dependencies are already imported
+			assert build_tree(inspection_server.iter_events(example_path)) == example_tree
+
+		for module_name, source in FAILING_MODULES.items():
+			path = write_module(tmp_path, module_name, source)
+
+			with pytest.raises(SandboxError):
+				build_tree(inspection_server.iter_events(path, timeout=2))
+
+		# Still working after the failing modules
+		assert build_tree(inspection_server.iter_events(example_path)) == example_tree
+	finally:
+		inspection_server.stop()
+
+@pytest.mark.skipif(not SERVER_AVAILABLE, reason="the inspection server needs os.fork")
+def test_server_cancel(build_tree, example_path, example_tree, tmp_path):
+	inspection_server = InspectionServer()
+	path = write_module(tmp_path, "loop", FAILING_MODULES["loop"])
+
+	try:
+		cancel_event = threading.Event()
+		threading.Timer(0.5, cancel_event.set).start()
+
+		start = time.perf_counter()
+
+		with pytest.raises(InspectionCancelled):
+			build_tree(inspection_server.iter_events(path, cancel_event=cancel_event), cancel_event)
+
+		assert time.perf_counter() - start < 5
+		# Still working after cancelling
+		assert build_tree(inspection_server.iter_events(example_path)) == example_tree
+	finally:
+		inspection_server.stop()
@@ -0,0 +1,150 @@
+import os
+import time
+import sqlite3
+
+import pytest
+
+from pyapireference import session
+from pyapireference.session import SessionStore
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+	return str(tmp_path / "Prefs" / "session.sqlite")
+
+def read_rows(path: str) -> dict:
+	connection = sqlite3.connect(path)
+
+	try:
+		return dict(connection.execute("SELECT key, value FROM session"))
+	finally:
+		connection.close()
+
+def fail_commits(session_store: SessionStore) -> list:
+	"""Make the commits of session_store fail until the returned list is emptied.
+	"""
+	failing = [True]
+	commit = session_store.commit
+
+	def failing_commit(values: dict) -> None:
+		if failing:
+			raise sqlite3.OperationalError("disk I/O error")
+
+		commit(values)
+
+	session_store.commit = failing_commit
+
+	return failing
+
+def test_close_and_reopen(path):
+	session_store = SessionStore(path)
+	session_store.set("current_markdown", "# example")
+	session_store.set("current_tree_state", [[["example", "content"], {"collapsed": False}]])
+	assert session_store.get("current_markdown") == "# example"
+	assert session_store.get("missing", "default") == "default"
+	session_store.close()
+
+	session_store = SessionStore(path)
+	assert session_store.get("current_markdown") == "# example"
+	assert session_store.get("current_tree_state") == [[["example", "content"], {"collapsed": False}]]
+	session_store.close()
+
+def test_commit_delay(path, monkeypatch):
+	monkeypatch.setattr(session, "COMMIT_DELAY", 0.3)
+	session_store = SessionStore(path)
+
+	try:
+		for index in range(5):
+			session_store.set("current_markdown", str(index))
+			time.sleep(0.05)
+
+		assert read_rows(path) == {} # Still changing
+
+		time.sleep(0.6)
+		assert read_rows(path) == {"current_markdown": '"4"'}
+		assert session_store.commits == 1 # Only the last value
+	finally:
+		session_store.close()
+
+def test_flush(path, monkeypatch):
+	monkeypatch.setattr(session, "COMMIT_DELAY", 60)
+	session_store = SessionStore(path)
+
+	try:
+		session_store.set("current_markdown", "# example")
+		session_store.flush() # Without waiting COMMIT_DELAY
+		assert read_rows(path) == {"current_markdown": '"# example"'}
+	finally:
+		session_store.close()
+
+def test_failed_commit(path, monkeypatch, capsys):
+	monkeypatch.setattr(session, "COMMIT_DELAY", 60)
+	session_store = SessionStore(path)
+	failing = fail_commits(session_store)
+
+	try:
+		session_store.set("a", 1)
+		session_store.flush() # Returns after the failed commit
+		assert session_store.pending == {"a": 1}
+		assert capsys.readouterr().out.count("disk I/O error") == 1 # Not tried again until COMMIT_DELAY
+
+		session_store.set("b", 2)
+		failing.clear()
+		session_store.flush()
+		assert session_store.pending == {}
+		assert read_rows(path) == {"a": "1", "b": "2"}
+	finally:
+		session_store.close()
+
+def test_close_with_failed_commit(path):
+	session_store = SessionStore(path)
+	fail_commits(session_store)
+	session_store.set("a", 1)
+
+	start = time.perf_counter()
+	session_store.close() # Tried once more, it doesn't wait forever
+	assert time.perf_counter() - start < 5
+	assert not session_store.thread.is_alive()
+
+def test_compact(path, monkeypatch):
+	monkeypatch.setattr(session, "COMPACT_INTERVAL", 2)
+	session_store = SessionStore(path)
+
+	try:
+		session_store.set("current_markdown", "a" * 100_000)
+		session_store.flush()
+		assert os.path.getsize(path + "-wal") > 0
+
+		session_store.set("current_markdown", "b")
+		session_store.flush() # The second commit compacts
+		assert os.path.getsize(path + "-wal") == 0
+	finally:
+		session_store.close()
+
+def test_corrupted_file(path):
+	os.makedirs(os.path.dirname(path))
+
+	with open(path, "wb") as file:
+		file.write(b"not a database" * 100)
+
+	session_store = SessionStore(path)
+	assert session_store.get("current_markdown") is None
+	session_store.set("current_markdown", "# example")
+	session_store.close()
+
+	assert read_rows(path) == {"current_markdown": '"# example"'}
+
+def test_corrupted_value(path):
+	session_store = SessionStore(path)
+	session_store.set("a", 1)
+	session_store.close()
+
+	connection = sqlite3.connect(path)
+	with connection:
+		connection.execute("INSERT INTO session (key, value) VALUES ('b', '{not json')")
+	connection.close()
+
+	session_store = SessionStore(path)
+	assert session_store.get("a") == 1
+	assert session_store.get("b", "default") == "default"
+	session_store.close()
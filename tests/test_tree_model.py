@@ -0,0 +1,175 @@
+import random
+
+from PyQt5.QtCore import Qt, QModelIndex
+
+from pyapireference.ui.tree_model import TreeModel, split_tree_state
+
+CODE_BLOCK = {"background_color": "#ffffff", "font_color": "#000000"}
+
+
+def create_model(tree: dict, state: list=None) -> TreeModel:
+	return TreeModel(tree, lambda type_: "#000000", "#000000", CODE_BLOCK, state=state)
+
+def get_index(model: TreeModel, qualified_name: tuple) -> QModelIndex:
+	"""Return the index of the row at qualified_name, creating the rows above it.
+	"""
+	index = model.index(0, 0) # The module
+
+	for name in qualified_name[1:]:
+		model.fetchMore(index)
+		item = model.get_item(index)
+		index = model.get_index(next(child for child in item.children if child.title == name))
+
+	return index
+
+def set_checked(model: TreeModel, qualified_name: tuple, checked: bool) -> None:
+	assert model.setData(get_index(model, qualified_name), Qt.Checked if checked else Qt.Unchecked, Qt.CheckStateRole)
+
+def filter_properties(properties: dict, state: dict, qualified_name: tuple) -> dict:
+	"""What TreeModel.filter_tree returns, copying the whole tree.
+	"""
+	result = {}
+
+	for property_name, property_value in properties.items():
+		property_qualified_name = qualified_name + (property_name, )
+
+		if state.get(property_qualified_name, {}).get("checked") is False:
+			continue
+
+		result[property_name] = filter_properties(property_value, state, property_qualified_name) if isinstance(property_value, dict) else property_value
+
+	return result
+
+def get_members(tree: dict) -> list:
+	"""Qualified names of the classes and their members.
+	"""
+	content = tree["example"]["content"]
+	result = []
+
+	for member_name, member_props in content.items():
+		result.append(("example", "content", member_name))
+
+		for class_member_name in member_props.get("content", {}):
+			result.append(("example", "content", member_name, "content", class_member_name))
+
+	return result
+
+def test_self_unchecked_by_default(example_tree):
+	model = create_model(example_tree)
+	filtered_tree = model.filter_tree()
+
+	assert "self" in example_tree["example"]["content"]["Person"]["content"]["__init__"]["parameters"]
+	assert "self" not in filtered_tree["example"]["content"]["Person"]["content"]["__init__"]["parameters"]
+	assert filtered_tree == filter_properties(example_tree, model.state, ())
+
+def test_filter_tree_after_toggles(example_tree):
+	model = create_model(example_tree)
+	members = get_members(example_tree)
+	random_ = random.Random(0)
+
+	model.filter_tree()
+
+	for _ in range(30):
+		qualified_name = random_.choice(members)
+		set_checked(model, qualified_name, random_.random() < 0.5)
+
+		filtered_tree = model.filter_tree()
+		assert filtered_tree == filter_properties(example_tree, model.state, ())
+		# The same as a model created with that state, without the copies of the last calls
+		assert filtered_tree == create_model(example_tree, state=model.dump_state()).filter_tree()
+
+def test_filter_tree_keeps_unchanged_members(example_tree):
+	model = create_model(example_tree)
+
+	first_content = model.filter_tree()["example"]["content"]
+	assert model.filter_tree()["example"]["content"] is first_content # Nothing changed
+
+	set_checked(model, ("example", "content", "Person", "content", "display_info"), False)
+	second_content = model.filter_tree()["example"]["content"]
+
+	assert "display_info" not in second_content["Person"]["content"]
+	assert second_content["Student"] is first_content["Student"]
+	assert second_content["Person"] is not first_content["Person"]
+
+	set_checked(model, ("example", "content", "Person", "content", "display_info"), True)
+	assert model.filter_tree()["example"]["content"] == first_content
+
+def test_set_all_checked_without_rows(example_tree):
+	model = create_model(example_tree)
+	person_index = get_index(model, ("example", "content", "Person"))
+
+	# The rows below Person are not created, only their state is changed
+	model.set_all_checked(person_index, False)
+	assert model.filter_tree()["example"]["content"].get("Person") is None
+
+	model.set_all_checked(person_index, True)
+	assert model.filter_tree() == filter_properties(example_tree, model.state, ())
+	assert "self" in model.filter_tree()["example"]["content"]["Person"]["content"]["__init__"]["parameters"]
+
+def test_state(example_tree):
+	model = create_model(example_tree)
+	changes = []
+	model.state_changed.connect(lambda: changes.append(True))
+
+	qualified_name = ("example", "content", "Person")
+	model.set_collapsed(get_index(model, qualified_name), False)
+	set_checked(model, ("example", "content", "Student"), False)
+
+	assert model.state[qualified_name] == {"collapsed": False, "checked": True}
+	assert model.state[("example", "content", "Student")] == {"collapsed": True, "checked": False}
+	assert len(changes) == 2
+
+	model.set_collapsed(get_index(model, qualified_name), True)
+	assert qualified_name not in model.state # Collapsed and checked rows are not stored
+
+	restored_model = create_model(example_tree, state=model.dump_state())
+	assert restored_model.state == model.state
+
+def test_rows_created_when_fetched(example_tree):
+	model = create_model(example_tree)
+	inserted = []
+	model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+
+	content_index = get_index(model, ("example", "content"))
+	content_item = model.get_item(content_index)
+
+	# Only the rows of the module exist until the others are expanded
+	assert model.canFetchMore(content_index) and model.hasChildren(content_index)
+	assert model.rowCount(content_index) == 0
+
+	model.fetchMore(content_index)
+
+	assert not model.canFetchMore(content_index)
+	assert [child.title for child in content_item.children] == list(example_tree["example"]["content"])
+	assert inserted == [(0, len(content_item.children) - 1)]
+	assert content_item.value is None # The properties are only kept by the children
+
+	model.fetchMore(content_index)
+	assert len(inserted) == 1
+
+def test_restored_rows(example_tree):
+	qualified_name = ("example", "content", "Person")
+	model = create_model(example_tree, state=[[list(qualified_name), {"collapsed": False, "checked": False}]])
+
+	person_item = model.get_item(get_index(model, qualified_name))
+	assert not person_item.collapsed and not person_item.checked
+
+	# Parents first, so the rows to expand can be expanded in the order they are yielded (see TreeView.restore_expanded)
+	items = list(model.iter_items())
+	assert items.index(person_item.parent) < items.index(person_item)
+	assert all(item.collapsed for item in items if item.qualified_name not in (None, ("example", ), qualified_name))
+
+def test_split_tree_state():
+	tree = {"module": {"type": "module", "docstring": "None", "collapsed": False, "content": {
+		"Class": {"type": "class", "docstring": "None", "checked": False, "collapsed": False, "content": {}},
+		"function": {"type": "function", "docstring": "None", "collapsed": True, "checked": True, "parameters": {}}
+	}}}
+
+	split_tree, state = split_tree_state(tree)
+
+	assert split_tree == {"module": {"type": "module", "docstring": "None", "content": {
+		"Class": {"type": "class", "docstring": "None", "content": {}},
+		"function": {"type": "function", "docstring": "None", "parameters": {}}
+	}}}
+	assert state == {("module", "content", "Class"): {"collapsed": False, "checked": False}}
+	assert "collapsed" in tree["module"] # Not modified
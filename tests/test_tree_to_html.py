@@ -0,0 +1,91 @@
+import io
+from html.parser import HTMLParser
+
+import markdown
+
+from pyapireference.inspect_package import get_error_properties
+from pyapireference.tree_to_markdown import convert_tree_to_markdown
+from pyapireference.tree_to_html import convert_tree_to_html, write_tree_html, write_tree_html_body
+
+
+class HeadingsParser(HTMLParser):
+	"""Collect (tag, id, text) of the headings.
+	"""
+	def __init__(self):
+		super().__init__()
+		self.headings = []
+		self.heading = None
+
+	def handle_starttag(self, tag: str, attributes: list) -> None:
+		if tag in ("h1", "h2", "h3", "h4"):
+			self.heading = [tag, dict(attributes).get("id"), ""]
+
+	def handle_data(self, data: str) -> None:
+		if self.heading is not None:
+			self.heading[2] += data
+
+	def handle_endtag(self, tag: str) -> None:
+		if self.heading is not None and tag == self.heading[0]:
+			self.headings.append(tuple(self.heading))
+			self.heading = None
+
+
+def get_headings(html_text: str) -> list:
+	parser = HeadingsParser()
+	parser.feed(html_text)
+
+	return parser.headings
+
+def test_same_headings_as_markdown(example_tree):
+	html_headings = get_headings(convert_tree_to_html(example_tree))
+	markdown_headings = get_headings(markdown.markdown(convert_tree_to_markdown(example_tree)))
+
+	assert [(tag, text) for tag, _, text in html_headings] == [(tag, text) for tag, _, text in markdown_headings]
+
+def test_anchors(example_tree):
+	headings = get_headings(convert_tree_to_html(example_tree))
+	ids = [id_ for _, id_, _ in headings if id_ is not None]
+
+	assert len(ids) == len(set(ids))
+	assert "example.Person.__init__" in ids
+	assert ("h4", "example.Person.__init__", "Person.__init__ (method)") in headings
+
+def test_escape():
+	tree = {"module": {"type": "module", "docstring": "Uses <b>tags</b> & entities.\n\nSecond paragraph.", "content": {
+		"function": {"type": "function", "docstring": None, "parameters": {
+			"a": {"annotation": "list[int]", "default": "<object>", "kind": "positional or keyword"},
+		}},
+	}}}
+	html_text = convert_tree_to_html(tree)
+
+	assert "<p>Uses &lt;b&gt;tags&lt;/b&gt; &amp; entities.</p>\n<p>Second paragraph.</p>\n" in html_text
+	assert "<li><code>a (list[int]=&lt;object&gt;)</code></li>" in html_text
+
+def test_write_tree_html(example_tree):
+	file = io.StringIO()
+	write_tree_html(example_tree, file)
+
+	assert file.getvalue() == convert_tree_to_html(example_tree)
+
+def test_end_block(example_tree):
+	blocks = []
+	fragments = []
+
+	def end_block():
+		blocks.append("".join(fragments))
+		fragments.clear()
+
+	write_tree_html_body(fragments.append, example_tree, end_block)
+
+	assert fragments == []
+	assert len(blocks) == len(example_tree["example"]["content"]) + 2 # Docstring, members and footer
+	assert blocks[1].startswith('<h4 id="example.BLACK">') # A variable
+
+def test_package_error():
+	tree = {"package": {"type": "package", "docstring": None, "content": {
+		"package.broken": get_error_properties("Traceback (most recent call last):\nValueError: <broken>"),
+	}}}
+	html_text = convert_tree_to_html(tree)
+
+	assert '<h2 id="package.package.broken"><code>package.broken</code></h2>' in html_text
+	assert "<pre><code>Traceback (most recent call last):\nValueError: &lt;broken&gt;</code></pre>" in html_text
@@ -0,0 +1,175 @@
+import io
+
+import pytest
+
+from pyapireference.inspect_object import iter_object_events, iter_tree_events
+from pyapireference.inspect_package import get_error_properties
+from pyapireference.tree_to_markdown import convert_tree_to_markdown, write_tree_markdown, MarkdownStream, MarkdownWriter, MarkdownCache
+from pyapireference.ui.tree_model import TreeModel
+
+# Empty and nested classes, a truncated class, a reference and docstrings with whitespace around them
+TREE = {"module": {"type": "module", "docstring": "  Module docstring.  \n\n", "content": {
+	"Empty": {"type": "class", "docstring": None, "inherits": [], "content": {}},
+	"Outer": {"type": "class", "docstring": "Outer.\n", "inherits": ["Base", "object"], "content": {
+		"Inner": {"type": "class", "docstring": "Inner.", "inherits": [], "content": {
+			"Deep": {"type": "class", "docstring": None, "inherits": [], "truncated": True},
+		}},
+		"value": {"type": "int", "docstring": "int doc", "value": "1"},
+		"method": {"type": "function", "docstring": "  Method.\n  ", "parameters": {
+			"self": {"annotation": None, "default": None, "kind": "positional or keyword"},
+			"a": {"annotation": "int", "default": "1", "kind": "positional or keyword"},
+		}},
+		"alias": {"type": "function", "docstring": None, "reference": "module/Outer/method"},
+	}},
+	"function": {"type": "function", "docstring": None, "parameters": {}},
+	"CONSTANT": {"type": "str", "docstring": None, "value": "'text'"},
+}}}
+# The Markdown of TREE as the text of each class was concatenated and stripped before MarkdownStream
+TREE_MARKDOWN = """module
+---
+Module docstring.
+
+### `Empty (class)`
+Empty has no description.
+
+### `Outer (class)`
+Outer.
+
+Inherits: `Base, object`.
+#### `Outer.Inner (class)`
+Inner.
+
+#### `Inner.Deep (class)`
+Deep has no description.
+
+_`Deep` members were not inspected (maximum depth reached)._
+
+#### `Outer.value (int) = 1`
+value has no description.
+
+#### `Outer.method (method)`
+Method.
+
+#### Parameters
+- `self`
+- `a (int=1)`
+
+#### `Outer.alias (method)`
+Same as `module.Outer.method`.
+
+### `function (function)`
+function has no description.
+
+#### `CONSTANT (str) = 'text'`
+CONSTANT has no description.
+
+***
+_Created using **PyAPIReference**._
+"""
+
+
+@pytest.fixture
+def package_tree(example_tree) -> dict:
+	return {"package": {"type": "package", "docstring": "Package docstring.", "content": {
+		"package.example": example_tree["example"],
+		"package.broken": get_error_properties("Traceback (most recent call last):\nValueError: broken"),
+	}}}
+
+class FragmentsFile:
+	def __init__(self):
+		self.fragments = []
+
+	def write(self, text: str) -> None:
+		self.fragments.append(text)
+
+
+def write_events(events) -> str:
+	file = io.StringIO()
+	markdown_writer = MarkdownWriter(file)
+
+	for event in events:
+		markdown_writer.handle_event(*event)
+
+	markdown_writer.close()
+
+	return file.getvalue()
+
+def test_markdown_writer(example_tree, example_module):
+	markdown_text = convert_tree_to_markdown(example_tree)
+
+	assert write_events(iter_object_events(example_module)) == markdown_text
+	assert "### `Person (class)`" in markdown_text
+
+def test_markdown_writer_package(package_tree):
+	markdown_text = convert_tree_to_markdown(package_tree)
+
+	assert write_events(iter_tree_events(package_tree)) == markdown_text
+	assert "could not be inspected" in markdown_text
+	assert "ValueError: broken" in markdown_text
+
+def convert_with_cache(tree: dict, cache: MarkdownCache) -> tuple:
+	"""Return (Markdown, names of the members converted again).
+	"""
+	old_keys = set(cache.fragments)
+	markdown_text = convert_tree_to_markdown(tree, cache)
+
+	return markdown_text, {names for _, names in set(cache.fragments) - old_keys}
+
+def test_markdown_cache(example_tree):
+	model = TreeModel(example_tree, lambda type_: "#000000", "#000000", {"background_color": "#ffffff", "font_color": "#000000"})
+	cache = MarkdownCache()
+
+	def toggle(member_name: str, class_member_name: str, checked: bool) -> set:
+		model.set_state(("example", "content", member_name, "content", class_member_name), True, checked)
+
+		markdown_text, converted = convert_with_cache(model.filter_tree(), cache)
+		assert markdown_text == convert_tree_to_markdown(model.filter_tree())
+
+		return converted
+
+	markdown_text, converted = convert_with_cache(model.filter_tree(), cache)
+	assert markdown_text == convert_tree_to_markdown(model.filter_tree())
+	assert ("Person", ) in converted and ("Person", "display_info") in converted
+
+	_, converted = convert_with_cache(model.filter_tree(), cache)
+	assert converted == set() # Nothing changed
+
+	assert toggle("Student", "display_info", False) == {("Student", )}
+	# Person was reused the last time, but the fragments of it's members are kept
+	assert toggle("Person", "display_info", False) == {("Person", )}
+	assert toggle("Person", "display_info", True) == {("Person", ), ("Person", "display_info")}
+
+def test_convert_tree_to_markdown():
+	assert convert_tree_to_markdown(TREE) == TREE_MARKDOWN
+	assert write_events(iter_tree_events(TREE)) == TREE_MARKDOWN
+
+def test_write_tree_markdown(example_tree):
+	file = io.StringIO()
+	write_tree_markdown(example_tree, file)
+
+	assert file.getvalue() == convert_tree_to_markdown(example_tree)
+
+	file = FragmentsFile()
+	write_tree_markdown(TREE, file)
+
+	assert "".join(file.fragments) == TREE_MARKDOWN
+	assert len(file.fragments) > len(TREE["module"]["content"]) # Not the whole document at once
+
+def test_markdown_stream_sections():
+	fragments = []
+	stream = MarkdownStream(fragments.append)
+
+	stream.write("title\n")
+	section = stream.start_section()
+	stream.write("  text  ")
+	stream.write("more text \n\n")
+	stream.end_section(section, "\n\n")
+
+	empty_section = stream.start_section()
+	stream.write("\n\n")
+	stream.end_section(empty_section, "\n\n", empty_end="")
+
+	stream.write("end")
+	stream.close()
+
+	assert "".join(fragments) == "title\n  text  more text\n\nend"
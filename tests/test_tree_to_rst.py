@@ -0,0 +1,82 @@
+import io
+
+import pytest
+
+from pyapireference.inspect_package import get_error_properties
+from pyapireference.tree_to_rst import convert_tree_to_rst, write_tree_rst, get_signature, docstring_to_rst
+
+SPHINX_DIRECTIVES = ("py:module", "py:class", "py:function", "py:method", "py:data", "py:attribute")
+SPHINX_ROLES = ("py:class", "py:obj")
+
+
+def parameter(kind: str, annotation: str=None, default: str=None) -> dict:
+	return {"annotation": annotation, "default": default, "kind": kind}
+
+def get_rst_errors(rst_text: str) -> list:
+	"""Parse rst_text with docutils (the Sphinx directives and roles do nothing) and return the warnings and errors.
+	"""
+	pytest.importorskip("docutils") # Not a dependency of PyAPIReference
+	from docutils import core, nodes
+	from docutils.parsers.rst import Directive, directives, roles
+
+	class SphinxDirective(Directive):
+		has_content = True
+		optional_arguments = 1
+		final_argument_whitespace = True
+		option_spec = {"type": directives.unchanged, "value": directives.unchanged}
+
+		def run(self) -> list:
+			return []
+
+	for directive_name in SPHINX_DIRECTIVES:
+		directives.register_directive(directive_name, SphinxDirective)
+
+	for role_name in SPHINX_ROLES:
+		roles.register_generic_role(role_name, nodes.literal)
+
+	warnings = io.StringIO()
+	core.publish_doctree(rst_text, settings_overrides={"warning_stream": warnings, "report_level": 2})
+
+	return warnings.getvalue().splitlines()
+
+def test_signature():
+	parameters = {
+		"a": parameter("positional-only", "int"),
+		"b": parameter("positional or keyword", default="1"),
+		"args": parameter("variadic positional"),
+		"c": parameter("keyword-only", "str", "'c'"),
+		"kwargs": parameter("variadic keyword"),
+	}
+
+	assert get_signature(parameters, "bool") == "(a: int, /, b=1, *args, c: str = 'c', **kwargs) -> bool"
+	assert get_signature({"a": parameter("positional-only")}, None) == "(a, /)"
+	assert get_signature({"a": parameter("keyword-only")}, ["int", "str"]) == "(*, a) -> tuple[int, str]"
+	assert get_signature({"a": parameter("positional-only"), "b": parameter("keyword-only")}, None) == "(a, /, *, b)"
+
+def test_docstring_indentation():
+	docstring = "Summary line.\n        Indented like the source.\n\n        Example::\n\n            code()\n    "
+
+	assert docstring_to_rst(docstring, 1) == "   Summary line.\n   Indented like the source.\n\n   Example::\n\n       code()\n\n"
+
+def test_example(example_tree):
+	rst_text = convert_tree_to_rst(example_tree)
+
+	assert rst_text.startswith("example\n=======\n\n.. py:module:: example\n\n")
+	assert ".. py:class:: Person\n" in rst_text
+	assert "   .. py:method:: __init__(self, name: str, last_name: str, age: str)\n" in rst_text
+	assert get_rst_errors(rst_text) == []
+
+def test_package_error():
+	tree = {"package": {"type": "package", "docstring": "Package docstring.", "content": {
+		"package.broken": get_error_properties("Traceback (most recent call last):\n  File \"broken.py\"\nValueError: *broken*"),
+	}}}
+	rst_text = convert_tree_to_rst(tree)
+
+	assert "*package.broken could not be inspected:*\n\n::\n\n   Traceback (most recent call last):\n     File \"broken.py\"\n   ValueError: *broken*\n\n" in rst_text
+	assert get_rst_errors(rst_text) == []
+
+def test_write_tree_rst(example_tree):
+	file = io.StringIO()
+	write_tree_rst(example_tree, file)
+
+	assert file.getvalue() == convert_tree_to_rst(example_tree)